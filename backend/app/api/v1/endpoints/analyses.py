@@ -8,6 +8,7 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks
 import logging
 
 from app.services.ai_service import enhanced_ai_service
+from app.services.rate_limiter import PRIORITY_INTERACTIVE
 
 logger = logging.getLogger(__name__)
 
@@ -341,7 +342,8 @@ Réponds de manière utile et actionnable.
         response = await enhanced_ai_service._call_openrouter(
             enhanced_ai_service.gemini_model,
             messages,
-            temperature=0.7  # More creative for conversation
+            temperature=0.7,  # More creative for conversation
+            priority=PRIORITY_INTERACTIVE
         )
 
         if not response:
@@ -11,7 +11,7 @@ import logging
 from app.services.rag_service import rag_service
 
 try:
-    from app.services.data_import_service import data_import_service
+    from app.services.data_import_service import data_import_service, IMPORT_CATEGORIES
     DATA_IMPORT_AVAILABLE = True
 except ImportError:
     DATA_IMPORT_AVAILABLE = False
@@ -273,25 +273,22 @@ async def import_database_data(
 
     This endpoint triggers a background import of all relevant
     Africa Strategy data from the database into the RAG system
-    for enhanced AI analyses.
+    for enhanced AI analyses. Returns 409 while an import is running.
     """
     if not DATA_IMPORT_AVAILABLE:
         raise HTTPException(
             status_code=503,
             detail="Data import service not available (asyncpg not installed)"
         )
+    if data_import_service.progress.get('running'):
+        raise HTTPException(
+            status_code=409,
+            detail="A database import is already running - check /api/v1/rag/health for its progress"
+        )
     try:
         # Default categories if none specified
         if not categories:
-            categories = [
-                'regulatory_data',
-                'sector_reports',
-                'esg_frameworks',
-                'market_data',
-                'best_practices',
-                'case_studies',
-                'policy_documents'
-            ]
+            categories = list(IMPORT_CATEGORIES)
 
         # Start background import
         background_tasks.add_task(
@@ -356,10 +353,13 @@ async def rag_health_check() -> Dict[str, Any]:
     Check RAG system health and status
 
     Returns comprehensive health information about the RAG system,
-    including Pinecone connection, index status, and search functionality.
+    including Pinecone connection, index status, search functionality
+    and the progress of the current database import.
     """
     try:
         health = await rag_service.health_check()
+        if DATA_IMPORT_AVAILABLE:
+            health['database_import'] = data_import_service.import_status()
 
         # Add additional context
         health.update({
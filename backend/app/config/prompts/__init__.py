@@ -8,6 +8,7 @@ from .bloc4_prompt import BLOC4_PROMPT
 from .bloc5_prompt import BLOC5_PROMPT
 from .bloc6_prompt import BLOC6_PROMPT
 from .bloc7_prompt import BLOC7_PROMPT
+from .output_schema import build_output_schema
 
 ALL_PROMPTS = {
     "BLOC1": BLOC1_PROMPT,
@@ -19,6 +20,10 @@ ALL_PROMPTS = {
     "BLOC7": BLOC7_PROMPT,
 }
 
+# Schéma de sortie de chaque bloc (sortie structurée des assistants)
+for _prompt in ALL_PROMPTS.values():
+    _prompt.setdefault("output_schema", build_output_schema(_prompt))
+
 __all__ = [
     "BLOC1_PROMPT",
     "BLOC2_PROMPT", 
@@ -28,5 +33,6 @@ __all__ = [
     "BLOC6_PROMPT",
     "BLOC7_PROMPT",
     "ALL_PROMPTS",
+    "build_output_schema",
 ]
 
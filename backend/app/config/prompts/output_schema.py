@@ -0,0 +1,104 @@
+"""
+JSON Schema de sortie des blocs
+
+Dérivé du format JSON obligatoire décrit dans chaque user_prompt_template
+(clés de premier niveau et leur type) et des validation_rules (indices
+requis, bornes des scores). Utilisé pour demander une sortie structurée
+(response_format json_schema) aux assistants dont le modèle le permet.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+# Dernier bloc ```json du prompt : le format de réponse attendu
+_FORMAT_RE = re.compile(r'```json\s*\n(.*?)\n```', re.DOTALL)
+
+# Clé et premier caractère de sa valeur, avec l'indentation de la ligne
+_KEY_LINE_RE = re.compile(r'^( *)"([^"]+)"\s*:\s*(\S)', re.MULTILINE)
+
+_VALUE_TYPES = {"{": "object", "[": "array", '"': "string"}
+
+
+def _value_type(first_char: str) -> Optional[str]:
+    if first_char in _VALUE_TYPES:
+        return _VALUE_TYPES[first_char]
+    if first_char.isdigit() or first_char == "-":
+        return "number"
+    return None
+
+
+def _template_path(template: str, key: str) -> List[str]:
+    """
+    Chemin de la première occurrence de `key` dans le gabarit, d'après
+    l'indentation (ex: ["consolidation_indices", "indices_synthese_bloc7"])
+    """
+    lines = list(_KEY_LINE_RE.finditer(template))
+    for position, match in enumerate(lines):
+        if match.group(2) != key:
+            continue
+        path: List[str] = []
+        indent = len(match.group(1))
+        for parent in reversed(lines[:position]):
+            parent_indent = len(parent.group(1))
+            if parent_indent < indent and parent.group(3) == "{":
+                path.insert(0, parent.group(2))
+                indent = parent_indent
+        return path
+    return []
+
+
+def _index_schema(score_range: Optional[List[float]]) -> Dict[str, Any]:
+    score: Dict[str, Any] = {"type": "number"}
+    if score_range:
+        score["minimum"], score["maximum"] = score_range
+    return {
+        "type": "object",
+        "properties": {
+            "score": score,
+            "interpretation": {"type": "string"}
+        },
+        "required": ["score", "interpretation"]
+    }
+
+
+def build_output_schema(prompt: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    JSON Schema (non strict) de la réponse d'un bloc, ou None si le
+    prompt ne décrit pas de format JSON.
+    """
+    formats = _FORMAT_RE.findall(prompt.get("user_prompt_template", ""))
+    if not formats:
+        return None
+    template = formats[-1]
+    rules = prompt.get("validation_rules", {})
+
+    # Clés de premier niveau (indentation de 2 espaces dans les gabarits)
+    properties: Dict[str, Any] = {}
+    for match in _KEY_LINE_RE.finditer(template):
+        if len(match.group(1)) == 2:
+            value_type = _value_type(match.group(3))
+            properties[match.group(2)] = {"type": value_type} if value_type else {}
+
+    schema: Dict[str, Any] = {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties)
+    }
+
+    # Indices requis, à l'emplacement qu'ils occupent dans le gabarit
+    required_indices = rules.get("required_indices") or []
+    if required_indices:
+        container = schema
+        for key in _template_path(template, required_indices[0]) or ["indices"]:
+            node = container["properties"].setdefault(key, {})
+            node.setdefault("type", "object")
+            node.setdefault("properties", {})
+            if key not in container.setdefault("required", []):
+                container["required"].append(key)
+            container = node
+        index = _index_schema(rules.get("score_range"))
+        for name in required_indices:
+            container["properties"][name] = index
+        container["required"] = list(required_indices)
+
+    return schema
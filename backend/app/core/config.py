@@ -3,13 +3,15 @@ Configuration settings for Africa Strategy API
 """
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
 # Trouver le répertoire racine du projet (backend/)
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 ENV_FILE = BASE_DIR / ".env"
+# Fichiers locaux (caches, index, sessions) : backend/data/, ignoré par git
+DATA_DIR = BASE_DIR / "data"
 
 
 class Settings(BaseSettings):
@@ -38,11 +40,108 @@ class Settings(BaseSettings):
     # OpenAI Assistants Configuration
     OPENAI_API_KEY: str = Field(default="", env="OPENAI_API_KEY")
     OPENAI_ASSISTANT_ID: str = Field(default="", env="OPENAI_ASSISTANT_ID")
+    OPENAI_TIMEOUT_SECONDS: float = Field(default=900.0, env="OPENAI_TIMEOUT_SECONDS")
+    OPENAI_MAX_CONNECTIONS: int = Field(default=100, env="OPENAI_MAX_CONNECTIONS")
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20, env="OPENAI_MAX_KEEPALIVE_CONNECTIONS")
+    OPENAI_RUN_STREAMING: bool = Field(default=True, env="OPENAI_RUN_STREAMING")
+    OPENAI_POLL_INITIAL_INTERVAL: float = Field(default=0.5, env="OPENAI_POLL_INITIAL_INTERVAL")
+    OPENAI_POLL_MAX_INTERVAL: float = Field(default=5.0, env="OPENAI_POLL_MAX_INTERVAL")
+    OPENAI_DELETE_THREADS_ON_COMPLETION: bool = Field(default=False, env="OPENAI_DELETE_THREADS_ON_COMPLETION")
+    # Structured outputs: json_schema for these model prefixes, json_object otherwise
+    OPENAI_STRUCTURED_OUTPUTS: bool = Field(default=True, env="OPENAI_STRUCTURED_OUTPUTS")
+    OPENAI_JSON_SCHEMA_MODELS: List[str] = Field(
+        default=["gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4"],
+        env="OPENAI_JSON_SCHEMA_MODELS"
+    )
+
+    # LLM Rate Limits (0 = unlimited)
+    OPENAI_RPM_LIMIT: int = Field(default=500, env="OPENAI_RPM_LIMIT")
+    OPENAI_TPM_LIMIT: int = Field(default=800000, env="OPENAI_TPM_LIMIT")
+    OPENAI_MAX_IN_FLIGHT: int = Field(default=20, env="OPENAI_MAX_IN_FLIGHT")
+    # Assistant runs in progress at once (a run lasts minutes; OPENAI_MAX_IN_FLIGHT only counts its start)
+    ASSISTANT_MAX_CONCURRENT_RUNS: int = Field(default=14, env="ASSISTANT_MAX_CONCURRENT_RUNS")
+    # Chat requests re-queued after an OpenAI 429 before answering 429
+    OPENAI_CHAT_MAX_RETRIES: int = Field(default=3, env="OPENAI_CHAT_MAX_RETRIES")
+    OPENROUTER_RPM_LIMIT: int = Field(default=60, env="OPENROUTER_RPM_LIMIT")
+    OPENROUTER_TPM_LIMIT: int = Field(default=0, env="OPENROUTER_TPM_LIMIT")
+    OPENROUTER_MAX_IN_FLIGHT: int = Field(default=8, env="OPENROUTER_MAX_IN_FLIGHT")
+    OPENROUTER_MAX_RETRIES: int = Field(default=3, env="OPENROUTER_MAX_RETRIES")
+    # Per-model budgets, JSON: {"openai/gpt-4o": {"rpm": 500, "tpm": 30000, "max_in_flight": 10}}
+    LLM_MODEL_RATE_LIMITS: Dict[str, Dict[str, int]] = Field(default={}, env="LLM_MODEL_RATE_LIMITS")
+    # Token estimate reserved for one assistant run (prompt + file_search + answer)
+    ASSISTANT_RUN_TOKEN_ESTIMATE: int = Field(default=20000, env="ASSISTANT_RUN_TOKEN_ESTIMATE")
+
+    # Bloc Retries and Circuit Breakers
+    BLOC_RETRY_MAX_ATTEMPTS: int = Field(default=3, env="BLOC_RETRY_MAX_ATTEMPTS")
+    BLOC_RETRY_BASE_DELAY: float = Field(default=2.0, env="BLOC_RETRY_BASE_DELAY")
+    BLOC_RETRY_MAX_DELAY: float = Field(default=30.0, env="BLOC_RETRY_MAX_DELAY")
+    ASSISTANT_BREAKER_FAILURE_THRESHOLD: int = Field(default=3, env="ASSISTANT_BREAKER_FAILURE_THRESHOLD")
+    ASSISTANT_BREAKER_RESET_SECONDS: float = Field(default=120.0, env="ASSISTANT_BREAKER_RESET_SECONDS")
+
+    # Deadlines: per-bloc budget = p95 of recent runs x multiplier, within [min, max]
+    BLOC_BUDGET_DEFAULT_SECONDS: float = Field(default=600.0, env="BLOC_BUDGET_DEFAULT_SECONDS")
+    BLOC_BUDGET_MIN_SECONDS: float = Field(default=120.0, env="BLOC_BUDGET_MIN_SECONDS")
+    BLOC_BUDGET_MAX_SECONDS: float = Field(default=900.0, env="BLOC_BUDGET_MAX_SECONDS")
+    BLOC_BUDGET_P95_MULTIPLIER: float = Field(default=1.5, env="BLOC_BUDGET_P95_MULTIPLIER")
+    SESSION_DEADLINE_SECONDS: float = Field(default=1800.0, env="SESSION_DEADLINE_SECONDS")
 
     # Pinecone Configuration
     PINECONE_API_KEY: str = Field(default="", env="PINECONE_API_KEY")
     PINECONE_ENVIRONMENT: str = Field(default="us-east-1", env="PINECONE_ENVIRONMENT")
     PINECONE_INDEX_NAME: str = Field(default="africa-strategy-rag", env="PINECONE_INDEX_NAME")
+    # Index handle and stats (dimension, vector count) are cached this long
+    PINECONE_STATS_REFRESH_SECONDS: float = Field(default=300.0, env="PINECONE_STATS_REFRESH_SECONDS")
+
+    # RAG Vector Store: "pinecone" or "local" (in-process index, no credentials needed)
+    RAG_VECTOR_BACKEND: str = Field(default="pinecone", env="RAG_VECTOR_BACKEND")
+    RAG_LOCAL_INDEX_DIR: str = Field(default=str(DATA_DIR / "rag_index"), env="RAG_LOCAL_INDEX_DIR")
+    # flat (exact) | hnsw | ivf (approximate, require faiss-cpu)
+    RAG_LOCAL_INDEX_TYPE: str = Field(default="flat", env="RAG_LOCAL_INDEX_TYPE")
+    # Concurrent vector lookups per multi-query search
+    RAG_SEARCH_CONCURRENCY: int = Field(default=8, env="RAG_SEARCH_CONCURRENCY")
+
+    # RAG Hybrid Retrieval: BM25 + vector results merged by reciprocal-rank fusion
+    RAG_HYBRID_SEARCH: bool = Field(default=True, env="RAG_HYBRID_SEARCH")
+    RAG_LEXICAL_INDEX_PATH: str = Field(default=str(DATA_DIR / "rag_lexical.db"), env="RAG_LEXICAL_INDEX_PATH")
+    RAG_RRF_K: int = Field(default=60, env="RAG_RRF_K")
+    # Lexical-only matches pass the score cutoffs only on a term found in at most this share of chunks
+    RAG_LEXICAL_RARE_TERM_RATIO: float = Field(default=0.05, env="RAG_LEXICAL_RARE_TERM_RATIO")
+    # "none" or "cross-encoder" (sentence-transformers CrossEncoder, multilingual by default)
+    RAG_RERANKER: str = Field(default="none", env="RAG_RERANKER")
+    RAG_RERANKER_MODEL: str = Field(default="cross-encoder/mmarco-mMiniLMv2-L12-H384-v1", env="RAG_RERANKER_MODEL")
+    RAG_RERANK_CANDIDATES: int = Field(default=20, env="RAG_RERANK_CANDIDATES")
+
+    # RAG Search Cache: results per (query, filters, top_k), invalidated on index writes
+    RAG_SEARCH_CACHE_ENABLED: bool = Field(default=True, env="RAG_SEARCH_CACHE_ENABLED")
+    RAG_SEARCH_CACHE_MAX_ENTRIES: int = Field(default=1000, env="RAG_SEARCH_CACHE_MAX_ENTRIES")
+    RAG_SEARCH_CACHE_TTL_SECONDS: int = Field(default=3600, env="RAG_SEARCH_CACHE_TTL_SECONDS")
+    # Share results and the invalidation counter between workers through REDIS_URL
+    RAG_SEARCH_CACHE_SHARED: bool = Field(default=False, env="RAG_SEARCH_CACHE_SHARED")
+
+    # RAG Embeddings (batched, encoded in a worker pool shared by search and ingestion)
+    RAG_EMBEDDING_MODEL: str = Field(default="all-MiniLM-L6-v2", env="RAG_EMBEDDING_MODEL")
+    RAG_EMBED_BATCH_SIZE: int = Field(default=64, env="RAG_EMBED_BATCH_SIZE")
+    # "process" (default) or "thread"; 0 workers = sized to the CPU cores
+    RAG_EMBED_EXECUTOR: str = Field(default="process", env="RAG_EMBED_EXECUTOR")
+    RAG_EMBED_WORKERS: int = Field(default=0, env="RAG_EMBED_WORKERS")
+    # Batches queued before callers wait (backpressure)
+    RAG_EMBED_MAX_PENDING: int = Field(default=16, env="RAG_EMBED_MAX_PENDING")
+    # "default", "int8" (dynamic quantization) or "onnx" (ONNX Runtime file at RAG_EMBED_ONNX_PATH, e.g. an int8 export)
+    RAG_EMBED_VARIANT: str = Field(default="default", env="RAG_EMBED_VARIANT")
+    RAG_EMBED_ONNX_PATH: str = Field(default="", env="RAG_EMBED_ONNX_PATH")
+    # Chunk embeddings keyed by (model, content hash); empty path disables the cache
+    RAG_EMBEDDING_CACHE_PATH: str = Field(default=str(DATA_DIR / "embedding_cache.db"), env="RAG_EMBEDDING_CACHE_PATH")
+    RAG_EMBEDDING_CACHE_MAX_ENTRIES: int = Field(default=100000, env="RAG_EMBEDDING_CACHE_MAX_ENTRIES")
+    # Vectors per vector store upsert request
+    RAG_UPSERT_BATCH_SIZE: int = Field(default=50, env="RAG_UPSERT_BATCH_SIZE")
+    # Database import: keyset pages (one short query each, held in memory) split into
+    # batches of RAG_IMPORT_FETCH_BATCH_SIZE rows (fetch → chunk → embed → upsert)
+    RAG_IMPORT_PAGE_SIZE: int = Field(default=1000, env="RAG_IMPORT_PAGE_SIZE")
+    RAG_IMPORT_FETCH_BATCH_SIZE: int = Field(default=200, env="RAG_IMPORT_FETCH_BATCH_SIZE")
+    # Fetched batches waiting for embedding before the fetch pauses
+    RAG_IMPORT_PIPELINE_DEPTH: int = Field(default=2, env="RAG_IMPORT_PIPELINE_DEPTH")
+    # The RAG service loads on first use; set to load it in the background at app startup
+    RAG_WARMUP_ON_STARTUP: bool = Field(default=False, env="RAG_WARMUP_ON_STARTUP")
 
     # AI Models
     GEMINI_MODEL: str = "google/gemini-2.0-flash-exp:free"  # Gemini 2.5 Flash
@@ -51,6 +150,25 @@ class Settings(BaseSettings):
     # Redis Configuration (optional)
     REDIS_URL: Optional[str] = Field(default=None, env="REDIS_URL")
 
+    # Analysis Sessions Storage (memory | sqlite | redis)
+    SESSION_STORE_BACKEND: str = Field(default="memory", env="SESSION_STORE_BACKEND")
+    SESSION_TTL_SECONDS: int = Field(default=24 * 3600, env="SESSION_TTL_SECONDS")
+    SESSION_MAX_ENTRIES: int = Field(default=1000, env="SESSION_MAX_ENTRIES")
+    SESSION_SQLITE_PATH: str = Field(default=str(DATA_DIR / "analysis_sessions.db"), env="SESSION_SQLITE_PATH")
+
+    # Bloc Results Cache (empty BLOC_CACHE_SQLITE_PATH = memory only)
+    BLOC_CACHE_ENABLED: bool = Field(default=True, env="BLOC_CACHE_ENABLED")
+    BLOC_CACHE_TTL_SECONDS: int = Field(default=7 * 24 * 3600, env="BLOC_CACHE_TTL_SECONDS")
+    BLOC_CACHE_MAX_ENTRIES: int = Field(default=256, env="BLOC_CACHE_MAX_ENTRIES")
+    BLOC_CACHE_MAX_DISK_ENTRIES: int = Field(default=5000, env="BLOC_CACHE_MAX_DISK_ENTRIES")
+    BLOC_CACHE_SQLITE_PATH: str = Field(default=str(DATA_DIR / "bloc_cache.db"), env="BLOC_CACHE_SQLITE_PATH")
+
+    # JSON Parse Failures Capture (empty PARSE_FAILURES_SPILL_DIR = memory only)
+    PARSE_FAILURES_BUFFER_SIZE: int = Field(default=50, env="PARSE_FAILURES_BUFFER_SIZE")
+    PARSE_FAILURES_MAX_CONTENT_CHARS: int = Field(default=200000, env="PARSE_FAILURES_MAX_CONTENT_CHARS")
+    PARSE_FAILURES_SPILL_DIR: str = Field(default="", env="PARSE_FAILURES_SPILL_DIR")
+    PARSE_FAILURES_MAX_SESSION_BYTES: int = Field(default=5 * 1024 * 1024, env="PARSE_FAILURES_MAX_SESSION_BYTES")
+
     # CORS Configuration
     BACKEND_CORS_ORIGINS: list = ["http://localhost:3000", "http://localhost:8000"]
     ALLOWED_HOSTS: list = ["*"]  # For development, restrict in production
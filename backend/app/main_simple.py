@@ -14,9 +14,11 @@ Auteur: Africa Strategy Platform
 Version: 2.1
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from openai import RateLimitError
 from typing import Dict, Any, List, Optional
 import logging
 import json
@@ -28,16 +30,48 @@ from datetime import datetime
 from app.services.openai_assistant_service import openai_assistant_service, BLOC_NAMES, ASSISTANT_IDS
 from app.core.config import settings
 from app.config.blocs_config import get_bloc_config, get_blocs_for_profil, get_all_blocs
+from app.services.bloc_scheduler import bloc_scheduler
+from app.services.analysis_events import analysis_events, format_sse
+from app.services.session_store import session_store
+from app.services.bloc_cache import bloc_cache
+from app.services.parse_failures import parse_failures, current_session_id
+from app.services.rate_limiter import (
+    rate_limiter, estimate_tokens, retry_after_seconds, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+)
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# STOCKAGE DES SESSIONS EN MÉMOIRE (Redis en production)
+# STOCKAGE DES SESSIONS (mémoire, SQLite ou Redis selon SESSION_STORE_BACKEND)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-ANALYSIS_SESSIONS: Dict[str, Dict[str, Any]] = {}
+# Taille de l'aperçu du texte partiel conservé dans la session
+PROGRESS_PREVIEW_CHARS = 500
+
+# Intervalle des commentaires keep-alive du flux SSE (secondes)
+SSE_KEEPALIVE_SECONDS = 15
+
+# Relecture du stockage partagé par le flux SSE : les changements faits
+# par un autre worker ne déclenchent pas le broker local (secondes)
+SSE_SHARED_STORE_REFRESH_SECONDS = 1.0
+
+# Relecture du statut d'une session partagée pour détecter une annulation
+# demandée à un autre worker (secondes)
+CANCEL_POLL_SECONDS = 2.0
+
+# Attente maximale de la fin des tâches annulées (runs.cancel inclus)
+CANCEL_WAIT_SECONDS = 10.0
+
+# Statuts de fin d'une session
+SESSION_FINAL_STATUSES = ("completed", "error", "cancelled")
+
+# Tâches asyncio des analyses en cours dans ce worker (BLOC1 puis blocs 2-7)
+SESSION_TASKS: Dict[str, asyncio.Task] = {}
+
+# Préchargement du service RAG (RAG_WARMUP_ON_STARTUP)
+RAG_WARMUP_TASK: Optional[asyncio.Task] = None
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # APPLICATION FASTAPI
@@ -59,6 +93,39 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def warm_up_rag_service():
+    """
+    Précharge le service RAG (modèle d'embeddings, index) en arrière-plan
+    si RAG_WARMUP_ON_STARTUP : le worker accepte les requêtes sans attendre
+    """
+    global RAG_WARMUP_TASK
+    if settings.RAG_WARMUP_ON_STARTUP:
+        from app.services.rag_service import rag_service
+        RAG_WARMUP_TASK = asyncio.create_task(rag_service.warm_up())
+        logger.info("🔥 Préchargement RAG lancé en arrière-plan")
+
+
+@app.on_event("shutdown")
+async def shutdown_openai_client():
+    """Annule les analyses en cours puis libère les clients HTTP, le stockage, le cache et les workers d'embeddings"""
+    from app.services.openrouter_service import openrouter_service
+    from app.services.embedding_executor import embedding_executor
+    if RAG_WARMUP_TASK and not RAG_WARMUP_TASK.done():
+        RAG_WARMUP_TASK.cancel()
+    tasks = list(SESSION_TASKS.values())
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.wait(tasks, timeout=CANCEL_WAIT_SECONDS)
+    await openai_assistant_service.aclose()
+    await session_store.close()
+    await openrouter_service.close()
+    bloc_cache.close()
+    parse_failures.close()
+    embedding_executor.close()
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # MODÈLES DE REQUÊTE
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -103,6 +170,127 @@ class ChatRequest(BaseModel):
 # CHARGEMENT PROGRESSIF - SYSTÈME OPTIMISÉ
 # ═══════════════════════════════════════════════════════════════════════════════
 
+async def _set_bloc_state(session_id: str, bloc_id: str, bloc_state: Dict[str, Any]):
+    """Écrit l'état d'un bloc dans le stockage et réveille les flux SSE"""
+    await session_store.update_bloc(session_id, bloc_id, bloc_state)
+    analysis_events.notify(session_id)
+
+
+async def _set_session_fields(session_id: str, **fields):
+    """
+    Met à jour des champs de la session et réveille les flux SSE.
+    Un statut final libère la session dans le broker (les flux relisent
+    la session, voient la fin et se terminent).
+    """
+    await session_store.update(session_id, **fields)
+    if fields.get("status") in SESSION_FINAL_STATUSES:
+        analysis_events.forget(session_id)
+    else:
+        analysis_events.notify(session_id)
+
+
+def _progress_updater(session_id: str, bloc_state: Dict[str, Any]):
+    """
+    Callback de progression : reporte dans la session le volume de texte
+    reçu en streaming et le nombre de tokens (estimé, puis réel en fin de
+    run) pour le bloc en cours.
+    
+    Les sections déjà complètes du JSON sont rangées dans "result" : le
+    stockage les sépare de l'état du bloc (comme un résultat final) et
+    elles ne sont exposées comme résultat qu'une fois le bloc terminé.
+    Le résultat partiel n'est réécrit que lorsqu'une section s'ajoute ;
+    les autres ticks n'écrivent que l'état (léger). Une nouvelle tentative
+    efface le résultat partiel de la tentative échouée.
+    """
+    async def update(bloc_id: str, progress: Dict[str, Any]):
+        sections = bloc_state.get("progress", {}).get("sections", [])
+        bloc_state["progress"] = {
+            key: value for key, value in progress.items()
+            if key not in ("partial_text", "partial_result")
+        }
+        bloc_state["progress"]["preview"] = progress.get("partial_text", "")[-PROGRESS_PREVIEW_CHARS:]
+        if "retry" in progress:
+            bloc_state.pop("result", None)
+            await _set_bloc_state(session_id, bloc_id, bloc_state)
+            return
+        if "partial_result" in progress:
+            bloc_state["result"] = progress["partial_result"]
+        if bloc_state.get("result") is not None:
+            bloc_state["progress"]["sections"] = list(bloc_state["result"])
+        if bloc_state["progress"].get("sections", []) != sections:
+            await _set_bloc_state(session_id, bloc_id, bloc_state)
+        else:
+            await session_store.update_bloc_state(session_id, bloc_id, bloc_state)
+            analysis_events.notify(session_id)
+    return update
+
+
+def _thread_recorder(session_id: str, bloc_state: Dict[str, Any]):
+    """
+    Callback de thread : conserve dans l'état du bloc les threads OpenAI
+    créés (un par tentative) pour pouvoir les supprimer ensuite.
+    """
+    async def record(bloc_id: str, thread_id: str):
+        bloc_state.setdefault("thread_ids", []).append(thread_id)
+        await session_store.update_bloc_state(session_id, bloc_id, bloc_state)
+    return record
+
+
+async def _cleanup_session_threads(session_id: str):
+    """Supprime les threads OpenAI d'une session dont les résultats sont stockés"""
+    session = await session_store.get(session_id, include_results=False)
+    if not session:
+        return
+    thread_ids = [
+        thread_id
+        for bloc_state in session["blocs"].values()
+        for thread_id in bloc_state.get("thread_ids", [])
+    ]
+    await openai_assistant_service.delete_threads(thread_ids)
+
+
+async def _watch_cancellation(session_id: str, task: asyncio.Task):
+    """
+    Stockage partagé : l'annulation peut être demandée à un autre worker,
+    qui ne voit pas la tâche. On relit le statut et on annule localement.
+    """
+    while not task.done():
+        await asyncio.sleep(CANCEL_POLL_SECONDS)
+        session = await session_store.get(session_id, include_results=False)
+        if session and session.get("status") == "cancelled":
+            task.cancel()
+            return
+
+
+def _register_session_task(session_id: str, task: asyncio.Task) -> asyncio.Task:
+    """Rattache la tâche à la session pour que DELETE puisse l'annuler"""
+    SESSION_TASKS[session_id] = task
+
+    def forget(finished: asyncio.Task):
+        if SESSION_TASKS.get(session_id) is finished:
+            del SESSION_TASKS[session_id]
+
+    task.add_done_callback(forget)
+    if not session_store.is_local:
+        watcher = asyncio.create_task(_watch_cancellation(session_id, task))
+        task.add_done_callback(lambda _: watcher.cancel())
+    return task
+
+
+async def _close_unfinished_blocs(session_id: str, status: str, error: Optional[str] = None):
+    """Passe les blocs encore en attente ou en cours au statut final donné"""
+    session = await session_store.get(session_id, include_results=False)
+    if not session:
+        return
+    for bloc_id, bloc_state in session["blocs"].items():
+        if bloc_state.get("status") in ("pending", "running"):
+            closed = {**bloc_state, "status": status}
+            closed.pop("progress", None)
+            if error:
+                closed["error"] = error
+            await session_store.update_bloc(session_id, bloc_id, closed)
+
+
 def _prepare_questionnaire_data(data: AnalyzeRequestV2) -> Dict[str, Any]:
     """Prépare les données du questionnaire pour les assistants"""
     return {
@@ -127,109 +315,136 @@ def _prepare_questionnaire_data(data: AnalyzeRequestV2) -> Dict[str, Any]:
     }
 
 
-async def _run_remaining_blocs(session_id: str):
+async def _run_remaining_blocs(session_id: str, deadline: Optional[float] = None):
     """
-    Tâche background qui exécute les blocs 2-7 après BLOC1
+    Tâche background qui exécute les blocs 2-7 après BLOC1.
+    
+    L'ordonnanceur DAG démarre chaque bloc dès que ses dépendances sont
+    terminées (BLOC5 n'attend plus BLOC3/BLOC4).
+    
+    Résultats partiels : un bloc en échec (après retries) ne bloque pas ses
+    dépendants, qui s'exécutent avec le contexte disponible.
+    
+    Échéance (time.monotonic()) : au-delà, les runs en cours sont annulés
+    côté OpenAI et la session passe en erreur. Une annulation (DELETE)
+    interrompt la tâche de la même façon.
     """
-    session = ANALYSIS_SESSIONS.get(session_id)
+    session = await session_store.get(session_id)
     if not session:
         logger.error(f"Session {session_id} not found")
         return
     
     questionnaire_data = session["questionnaire_data"]
-    bloc1_result = session["blocs"]["BLOC1"]["result"]
+    done_results = {
+        bloc_id: state["result"]
+        for bloc_id, state in session["blocs"].items()
+        if state.get("status") == "completed"
+    }
+    failed_before = [
+        bloc_id for bloc_id, state in session["blocs"].items()
+        if state.get("status") == "error"
+    ]
+    
+    async def run_with_update(bloc_id: str, context: Dict):
+        running_state = {
+            "status": "running",
+            "started_at": datetime.now().isoformat(),
+            "thread_ids": []
+        }
+        await _set_bloc_state(session_id, bloc_id, running_state)
+        started = time.monotonic()
+        try:
+            result = await openai_assistant_service._run_bloc(
+                bloc_id, questionnaire_data, context,
+                on_progress=_progress_updater(session_id, running_state),
+                priority=PRIORITY_BACKGROUND,
+                on_thread=_thread_recorder(session_id, running_state),
+                deadline=deadline
+            )
+        except asyncio.CancelledError:
+            await _set_bloc_state(session_id, bloc_id, {
+                "status": "cancelled",
+                "duration_seconds": round(time.monotonic() - started, 3),
+                "thread_ids": running_state["thread_ids"]
+            })
+            logger.warning(f"[{session_id}] 🛑 {bloc_id} annulé")
+            raise
+        except Exception as e:
+            await _set_bloc_state(session_id, bloc_id, {
+                "status": "error",
+                "error": str(e),
+                "duration_seconds": round(time.monotonic() - started, 3),
+                "thread_ids": running_state["thread_ids"]
+            })
+            logger.error(f"[{session_id}] ❌ {bloc_id} échoué: {e}")
+            raise
+        await _set_bloc_state(session_id, bloc_id, {
+            "status": "completed",
+            "result": result,
+            "completed_at": datetime.now().isoformat(),
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "thread_ids": running_state["thread_ids"]
+        })
+        logger.info(f"[{session_id}] ✅ {bloc_id} terminé")
+        return result
     
     try:
-        # ─────────────────────────────────────────────────────────────────
-        # PHASE 2 : BLOC2, BLOC3, BLOC4 en PARALLÈLE
-        # ─────────────────────────────────────────────────────────────────
-        logger.info(f"[{session_id}] 📊 Phase 2: Blocs 2, 3, 4 en parallèle")
-        
-        context_phase2 = {"BLOC1": bloc1_result}
-        
-        async def run_with_update(bloc_id: str, context: Dict):
-            try:
-                ANALYSIS_SESSIONS[session_id]["blocs"][bloc_id]["status"] = "running"
-                result = await openai_assistant_service._run_bloc(bloc_id, questionnaire_data, context)
-                ANALYSIS_SESSIONS[session_id]["blocs"][bloc_id] = {
-                    "status": "completed",
-                    "result": result,
-                    "completed_at": datetime.now().isoformat()
-                }
-                logger.info(f"[{session_id}] ✅ {bloc_id} terminé")
-                return result
-            except Exception as e:
-                ANALYSIS_SESSIONS[session_id]["blocs"][bloc_id] = {
-                    "status": "error",
-                    "error": str(e)
-                }
-                logger.error(f"[{session_id}] ❌ {bloc_id} échoué: {e}")
-                return None
-        
-        # Marquer les blocs comme en cours
-        for bloc_id in ["BLOC2", "BLOC3", "BLOC4"]:
-            ANALYSIS_SESSIONS[session_id]["blocs"][bloc_id] = {"status": "running"}
-        
-        phase2_results = await asyncio.gather(
-            run_with_update("BLOC2", context_phase2),
-            run_with_update("BLOC3", context_phase2),
-            run_with_update("BLOC4", context_phase2),
-            return_exceptions=True
+        logger.info(f"[{session_id}] 📊 Ordonnancement DAG des blocs 2 à 7")
+        schedule = bloc_scheduler.run(
+            run_with_update,
+            bloc_ids=[b for b in session["blocs"] if b not in failed_before],
+            initial_results=done_results
         )
-        
-        bloc2_result = phase2_results[0] if not isinstance(phase2_results[0], Exception) else None
-        bloc3_result = phase2_results[1] if not isinstance(phase2_results[1], Exception) else None
-        bloc4_result = phase2_results[2] if not isinstance(phase2_results[2], Exception) else None
-        
-        # ─────────────────────────────────────────────────────────────────
-        # PHASE 3 : BLOC5 (dépend de BLOC1 + BLOC2)
-        # ─────────────────────────────────────────────────────────────────
-        logger.info(f"[{session_id}] 📊 Phase 3: BLOC5")
-        ANALYSIS_SESSIONS[session_id]["blocs"]["BLOC5"] = {"status": "running"}
-        
-        context_phase3 = {"BLOC1": bloc1_result, "BLOC2": bloc2_result}
-        bloc5_result = await run_with_update("BLOC5", context_phase3)
-        
-        # ─────────────────────────────────────────────────────────────────
-        # PHASE 4 : BLOC6 (dépend de BLOC1 + BLOC2 + BLOC5)
-        # ─────────────────────────────────────────────────────────────────
-        logger.info(f"[{session_id}] 📊 Phase 4: BLOC6")
-        ANALYSIS_SESSIONS[session_id]["blocs"]["BLOC6"] = {"status": "running"}
-        
-        context_phase4 = {"BLOC1": bloc1_result, "BLOC2": bloc2_result, "BLOC5": bloc5_result}
-        bloc6_result = await run_with_update("BLOC6", context_phase4)
-        
-        # ─────────────────────────────────────────────────────────────────
-        # PHASE 5 : BLOC7 (Synthèse - tous les blocs)
-        # ─────────────────────────────────────────────────────────────────
-        logger.info(f"[{session_id}] 📊 Phase 5: BLOC7 (Synthèse)")
-        ANALYSIS_SESSIONS[session_id]["blocs"]["BLOC7"] = {"status": "running"}
-        
-        context_phase5 = {
-            "BLOC1": bloc1_result,
-            "BLOC2": bloc2_result,
-            "BLOC3": bloc3_result,
-            "BLOC4": bloc4_result,
-            "BLOC5": bloc5_result,
-            "BLOC6": bloc6_result
-        }
-        await run_with_update("BLOC7", context_phase5)
+        # Filet de sécurité : chaque run est déjà borné par l'échéance (les blocs
+        # en retard passent en erreur, résultat partiel) ; on laisse le temps
+        # aux runs.cancel de partir avant d'interrompre l'ordonnanceur
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic()) + CANCEL_WAIT_SECONDS
+        report = await asyncio.wait_for(schedule, timeout=timeout)
+        blocs_failed = failed_before + list(report["errors"])
         
         # ─────────────────────────────────────────────────────────────────
         # MARQUER LA SESSION COMME TERMINÉE
         # ─────────────────────────────────────────────────────────────────
-        ANALYSIS_SESSIONS[session_id]["status"] = "completed"
-        ANALYSIS_SESSIONS[session_id]["completed_at"] = datetime.now().isoformat()
-        logger.info(f"[{session_id}] ✅ Analyse complète terminée!")
+        await _set_session_fields(
+            session_id,
+            scheduling={
+                "timings": report["timings"],
+                "critical_path": report["critical_path"],
+                "critical_path_seconds": report["critical_path_seconds"],
+                "duration_seconds": report["duration_seconds"]
+            },
+            status="completed",
+            partial=bool(blocs_failed),
+            blocs_failed=blocs_failed,
+            completed_at=datetime.now().isoformat()
+        )
+        if blocs_failed:
+            logger.warning(f"[{session_id}] ⚠️ Analyse terminée avec des blocs en échec: {blocs_failed}")
+        else:
+            logger.info(f"[{session_id}] ✅ Analyse complète terminée!")
+        
+        if settings.OPENAI_DELETE_THREADS_ON_COMPLETION:
+            await _cleanup_session_threads(session_id)
         
+    except asyncio.CancelledError:
+        await _close_unfinished_blocs(session_id, "cancelled")
+        if await session_store.exists(session_id):
+            await _set_session_fields(session_id, status="cancelled")
+        logger.warning(f"[{session_id}] 🛑 Analyse annulée")
+        raise
+    except asyncio.TimeoutError:
+        error = "Délai de session dépassé"
+        await _close_unfinished_blocs(session_id, "error", error)
+        await _set_session_fields(session_id, status="error", error=error)
+        logger.error(f"[{session_id}] ⏱️ {error}")
     except Exception as e:
-        ANALYSIS_SESSIONS[session_id]["status"] = "error"
-        ANALYSIS_SESSIONS[session_id]["error"] = str(e)
+        await _close_unfinished_blocs(session_id, "error", str(e))
+        await _set_session_fields(session_id, status="error", error=str(e))
         logger.error(f"[{session_id}] ❌ Erreur globale: {e}")
 
 
 @app.post("/api/analyze/start")
-async def start_analysis(data: AnalyzeRequestV2, background_tasks: BackgroundTasks):
+async def start_analysis(data: AnalyzeRequestV2):
     """
     🚀 DÉMARRAGE ANALYSE PROGRESSIVE
     
@@ -238,9 +453,14 @@ async def start_analysis(data: AnalyzeRequestV2, background_tasks: BackgroundTas
     3. Lance les 6 autres blocs en background
     
     Le frontend redirige vers le dashboard dès que BLOC1 est prêt !
+    Si BLOC1 échoue malgré les retries, les autres blocs sont tout de même
+    lancés (résultat partiel) et l'erreur est renvoyée dans bloc1_error.
+    
+    L'analyse entière est bornée par SESSION_DEADLINE_SECONDS et peut être
+    annulée avec DELETE /api/analyze/{session_id}.
     """
+    session_id = str(uuid.uuid4())[:8]
     try:
-        session_id = str(uuid.uuid4())[:8]
         
         logger.info("═" * 60)
         logger.info(f"🚀 [{session_id}] Nouvelle analyse progressive")
@@ -250,18 +470,22 @@ async def start_analysis(data: AnalyzeRequestV2, background_tasks: BackgroundTas
         questionnaire_data = _prepare_questionnaire_data(data)
         
         # Créer la session
-        ANALYSIS_SESSIONS[session_id] = {
+        metadata = {
+            "profil": data.profilOrganisation,
+            "secteur": data.secteur,
+            "pays": data.paysInstallation,
+            "zone": data.zoneGeographique
+        }
+        bloc1_state = {"status": "running", "thread_ids": []}
+        deadline = time.monotonic() + settings.SESSION_DEADLINE_SECONDS
+        await session_store.create(session_id, {
             "status": "running",
             "started_at": datetime.now().isoformat(),
+            "deadline_at": datetime.fromtimestamp(time.time() + settings.SESSION_DEADLINE_SECONDS).isoformat(),
             "questionnaire_data": questionnaire_data,
-            "metadata": {
-                "profil": data.profilOrganisation,
-                "secteur": data.secteur,
-                "pays": data.paysInstallation,
-                "zone": data.zoneGeographique
-            },
+            "metadata": metadata,
             "blocs": {
-                "BLOC1": {"status": "running"},
+                "BLOC1": bloc1_state,
                 "BLOC2": {"status": "pending"},
                 "BLOC3": {"status": "pending"},
                 "BLOC4": {"status": "pending"},
@@ -269,33 +493,82 @@ async def start_analysis(data: AnalyzeRequestV2, background_tasks: BackgroundTas
                 "BLOC6": {"status": "pending"},
                 "BLOC7": {"status": "pending"}
             }
-        }
+        })
+        
+        # Les tâches créées ci-dessous héritent de la session (capture des échecs de parsing)
+        current_session_id.set(session_id)
         
         # Exécuter BLOC1 immédiatement
         logger.info(f"[{session_id}] 📊 Exécution BLOC1 (PESTEL+)...")
-        bloc1_result = await openai_assistant_service._run_bloc("BLOC1", questionnaire_data, {})
+        bloc1_started = time.monotonic()
+        bloc1_result = None
+        bloc1_error = None
+        bloc1_task = _register_session_task(session_id, asyncio.create_task(
+            openai_assistant_service._run_bloc(
+                "BLOC1", questionnaire_data, {},
+                on_progress=_progress_updater(session_id, bloc1_state),
+                on_thread=_thread_recorder(session_id, bloc1_state),
+                deadline=deadline
+            )
+        ))
+        try:
+            bloc1_result = await bloc1_task
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                raise  # la requête HTTP elle-même est annulée
+            await _close_unfinished_blocs(session_id, "cancelled")
+            await _set_session_fields(session_id, status="cancelled")
+            logger.warning(f"[{session_id}] 🛑 Analyse annulée pendant BLOC1")
+            raise HTTPException(status_code=409, detail=f"Analyse {session_id} annulée")
+        except Exception as e:
+            bloc1_error = str(e)
+            await _set_bloc_state(session_id, "BLOC1", {
+                "status": "error",
+                "error": bloc1_error,
+                "duration_seconds": round(time.monotonic() - bloc1_started, 3),
+                "thread_ids": bloc1_state["thread_ids"]
+            })
+            logger.error(f"[{session_id}] ❌ BLOC1 échoué, poursuite sans son contexte: {e}")
         
-        ANALYSIS_SESSIONS[session_id]["blocs"]["BLOC1"] = {
-            "status": "completed",
-            "result": bloc1_result,
-            "completed_at": datetime.now().isoformat()
-        }
+        if bloc1_error is None:
+            await _set_bloc_state(session_id, "BLOC1", {
+                "status": "completed",
+                "result": bloc1_result,
+                "completed_at": datetime.now().isoformat(),
+                "duration_seconds": round(time.monotonic() - bloc1_started, 3),
+                "thread_ids": bloc1_state["thread_ids"]
+            })
+            logger.info(f"[{session_id}] ✅ BLOC1 terminé, lancement des autres en background")
         
-        logger.info(f"[{session_id}] ✅ BLOC1 terminé, lancement des autres en background")
+        # Annulée par un autre worker juste après BLOC1 : rien à lancer
+        session = await session_store.get(session_id, include_results=False)
+        if session and session["status"] == "cancelled":
+            raise HTTPException(status_code=409, detail=f"Analyse {session_id} annulée")
         
         # Lancer les autres blocs en background
-        background_tasks.add_task(_run_remaining_blocs, session_id)
+        _register_session_task(
+            session_id, asyncio.create_task(_run_remaining_blocs(session_id, deadline))
+        )
         
         return {
             "success": True,
             "session_id": session_id,
-            "message": "BLOC1 terminé, autres blocs en cours de génération",
+            "message": (
+                "BLOC1 terminé, autres blocs en cours de génération" if bloc1_error is None
+                else "BLOC1 en échec, autres blocs en cours de génération"
+            ),
             "bloc1": bloc1_result,
-            "metadata": ANALYSIS_SESSIONS[session_id]["metadata"]
+            "bloc1_error": bloc1_error,
+            "metadata": metadata
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Erreur démarrage analyse: {str(e)}")
+        if await session_store.exists(session_id):
+            await session_store.update_bloc(session_id, "BLOC1", {"status": "error", "error": str(e)})
+            await _set_session_fields(session_id, status="error", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -306,30 +579,32 @@ async def get_analysis_status(session_id: str):
     
     Retourne l'état de chaque bloc :
     - pending : En attente
-    - running : En cours
+    - running : En cours (avec les sections déjà reçues dans partial_result)
     - completed : Terminé (avec résultat)
     - error : Erreur
+    - cancelled : Annulé (DELETE /api/analyze/{session_id})
     """
-    session = ANALYSIS_SESSIONS.get(session_id)
+    session = await session_store.get(session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail=f"Session {session_id} non trouvée")
     
-    # Calculer le pourcentage de completion
-    blocs_done = sum(1 for b in session["blocs"].values() if b.get("status") == "completed")
-    progress = int((blocs_done / 7) * 100)
-    
     return {
         "session_id": session_id,
         "status": session["status"],
-        "progress": progress,
-        "blocs_completed": blocs_done,
-        "blocs_total": 7,
+        "error": session.get("error"),
+        **_session_progress(session),
+        "partial": session.get("partial", False),
+        "blocs_failed": session.get("blocs_failed", []),
         "metadata": session.get("metadata", {}),
+        "scheduling": session.get("scheduling"),
         "blocs": {
             bloc_id: {
                 "status": bloc_data.get("status"),
                 "name": BLOC_NAMES.get(bloc_id),
+                "duration_seconds": bloc_data.get("duration_seconds"),
+                "progress": bloc_data.get("progress") if bloc_data.get("status") == "running" else None,
+                "partial_result": bloc_data.get("result") if bloc_data.get("status") == "running" else None,
                 "result": bloc_data.get("result") if bloc_data.get("status") == "completed" else None,
                 "error": bloc_data.get("error") if bloc_data.get("status") == "error" else None
             }
@@ -338,6 +613,166 @@ async def get_analysis_status(session_id: str):
     }
 
 
+def _bloc_event(bloc_id: str, bloc_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Payload d'un changement de statut de bloc (résultat inclus une seule fois)"""
+    status = bloc_data.get("status")
+    return {
+        "bloc_id": bloc_id,
+        "name": BLOC_NAMES.get(bloc_id),
+        "status": status,
+        "duration_seconds": bloc_data.get("duration_seconds"),
+        "result": bloc_data.get("result") if status == "completed" else None,
+        "error": bloc_data.get("error") if status == "error" else None
+    }
+
+
+def _session_progress(session: Dict[str, Any]) -> Dict[str, int]:
+    """Pourcentage de completion d'une session"""
+    blocs_done = sum(1 for b in session["blocs"].values() if b.get("status") == "completed")
+    return {
+        "progress": int((blocs_done / 7) * 100),
+        "blocs_completed": blocs_done,
+        "blocs_total": 7
+    }
+
+
+async def _session_event_stream(session_id: str, request: Request):
+    """
+    Générateur SSE : un événement par transition de statut de bloc,
+    avec uniquement le delta (le résultat du bloc qui vient de se terminer).
+    """
+    sent_status: Dict[str, str] = {}
+    sent_progress: Dict[str, Any] = {}
+    sent_sections: Dict[str, set] = {}
+    version = analysis_events.version(session_id)
+    refresh = SSE_KEEPALIVE_SECONDS if session_store.is_local else SSE_SHARED_STORE_REFRESH_SECONDS
+    last_sent = time.monotonic()
+    
+    session = await session_store.get(session_id, include_results=False)
+    yield format_sse("snapshot", {
+        "session_id": session_id,
+        "status": session["status"],
+        "metadata": session.get("metadata", {}),
+        **_session_progress(session)
+    })
+    
+    while True:
+        if await request.is_disconnected():
+            break
+        
+        # Lecture sans les résultats : seul celui du bloc qui vient de se terminer est chargé
+        session = await session_store.get(session_id, include_results=False)
+        if not session:
+            analysis_events.forget(session_id)
+            yield format_sse("error", {"session_id": session_id, "error": "Session expirée"})
+            break
+        
+        for bloc_id, bloc_data in list(session["blocs"].items()):
+            status = bloc_data.get("status")
+            if sent_status.get(bloc_id) != status:
+                sent_status[bloc_id] = status
+                if status == "completed":
+                    bloc_data = {**bloc_data, "result": await session_store.get_bloc_result(session_id, bloc_id)}
+                last_sent = time.monotonic()
+                yield format_sse("bloc", {**_bloc_event(bloc_id, bloc_data), **_session_progress(session)})
+            elif status == "running" and bloc_data.get("progress") != sent_progress.get(bloc_id):
+                progress = bloc_data.get("progress") or {}
+                sent_progress[bloc_id] = progress
+                last_sent = time.monotonic()
+                yield format_sse("progress", {"bloc_id": bloc_id, "progress": progress})
+                
+                # Sections du JSON complètes avant la fin du run
+                sent = sent_sections.setdefault(bloc_id, set())
+                if set(progress.get("sections", ())) - sent:
+                    partial = await session_store.get_bloc_result(session_id, bloc_id) or {}
+                    for key, value in partial.items():
+                        if key not in sent:
+                            sent.add(key)
+                            yield format_sse("section", {"bloc_id": bloc_id, "key": key, "value": value})
+        
+        if session["status"] in SESSION_FINAL_STATUSES:
+            yield format_sse("done", {
+                "session_id": session_id,
+                "status": session["status"],
+                "error": session.get("error"),
+                "partial": session.get("partial", False),
+                "blocs_failed": session.get("blocs_failed", []),
+                "scheduling": session.get("scheduling"),
+                **_session_progress(session)
+            })
+            break
+        
+        await analysis_events.wait(session_id, version, timeout=refresh)
+        version = analysis_events.version(session_id)
+        if time.monotonic() - last_sent >= SSE_KEEPALIVE_SECONDS:
+            last_sent = time.monotonic()
+            yield ": keep-alive\n\n"
+
+
+@app.get("/api/analyze/stream/{session_id}")
+async def stream_analysis_status(session_id: str, request: Request):
+    """
+    📡 FLUX TEMPS RÉEL DE L'ANALYSE (Server-Sent Events)
+    
+    Alternative push au polling de /api/analyze/status :
+    - snapshot : état initial de la session
+    - bloc : transition de statut d'un bloc (résultat inclus à la completion)
+    - progress : progression du streaming d'un bloc en cours
+    - section : section du JSON d'un bloc terminée avant la fin du run
+    - done : fin de l'analyse (completed, error ou cancelled)
+    """
+    if not await session_store.exists(session_id):
+        raise HTTPException(status_code=404, detail=f"Session {session_id} non trouvée")
+    
+    return StreamingResponse(
+        _session_event_stream(session_id, request),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+@app.delete("/api/analyze/{session_id}")
+async def cancel_analysis(session_id: str, purge: bool = False):
+    """
+    🛑 ANNULATION D'UNE ANALYSE
+    
+    Interrompt les blocs en cours : les runs OpenAI sont annulés
+    (runs.cancel) et les tâches asyncio de la session sont arrêtées.
+    Les blocs déjà terminés restent consultables, sauf avec purge=true
+    qui supprime aussi la session et ses threads OpenAI.
+    """
+    session = await session_store.get(session_id, include_results=False)
+    if not session:
+        raise HTTPException(status_code=404, detail=f"Session {session_id} non trouvée")
+    
+    was_running = session["status"] == "running"
+    if was_running:
+        # Visible des autres workers, qui annulent leurs propres tâches
+        await _set_session_fields(session_id, status="cancelled", cancelled_at=datetime.now().isoformat())
+        logger.info(f"[{session_id}] 🛑 Annulation demandée")
+    
+    task = SESSION_TASKS.get(session_id)
+    if task and not task.done():
+        task.cancel()
+        await asyncio.wait([task], timeout=CANCEL_WAIT_SECONDS)
+    
+    if purge:
+        await _cleanup_session_threads(session_id)
+        await session_store.delete(session_id)
+        analysis_events.forget(session_id)
+    
+    return {
+        "success": True,
+        "session_id": session_id,
+        "status": "cancelled" if was_running else session["status"],
+        "cancelled": was_running,
+        "purged": purge
+    }
+
+
 @app.get("/api/analyze/result/{session_id}")
 async def get_full_analysis_result(session_id: str):
     """
@@ -345,7 +780,7 @@ async def get_full_analysis_result(session_id: str):
     
     Retourne tous les blocs terminés.
     """
-    session = ANALYSIS_SESSIONS.get(session_id)
+    session = await session_store.get(session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail=f"Session {session_id} non trouvée")
@@ -553,22 +988,44 @@ RÈGLES DE RÉPONSE:
 5. Utilise des émojis pour structurer (📊 🎯 ⚠️ 💡)
 6. Ton professionnel mais accessible"""
 
-        # Appel API Chat Completions (rapide)
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"""CONTEXTE D'ANALYSE:
+        user_content = f"""CONTEXTE D'ANALYSE:
 {analysis_summary}
 
 QUESTION DE L'UTILISATEUR:
 {data.question}
 
-Réponds de manière claire et utile en te basant sur les données ci-dessus."""}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
+Réponds de manière claire et utile en te basant sur les données ci-dessus."""
+        
+        # Appel API Chat Completions (rapide), prioritaire sur les blocs en arrière-plan.
+        # Un 429 met le budget "openai" en pause (Retry-After) et la question
+        # reprend sa place dans la file, au lieu d'échouer.
+        for attempt in range(settings.OPENAI_CHAT_MAX_RETRIES + 1):
+            try:
+                async with rate_limiter.limit(
+                    "openai", "gpt-4o",
+                    tokens=estimate_tokens(system_prompt, user_content) + 1000,
+                    priority=PRIORITY_INTERACTIVE
+                ) as permit:
+                    response = await client.chat.completions.create(
+                        model="gpt-4o",
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_content}
+                        ],
+                        temperature=0.7,
+                        max_tokens=1000
+                    )
+                    if response.usage:
+                        permit.record_tokens(response.usage.total_tokens)
+                break
+            except RateLimitError as e:
+                if attempt == settings.OPENAI_CHAT_MAX_RETRIES:
+                    raise HTTPException(status_code=429, detail="Limite OpenAI atteinte, réessayez plus tard")
+                rate_limiter.penalize(
+                    "openai",
+                    retry_after_seconds(e.response.headers, default=2.0 ** (attempt + 1)),
+                    model="gpt-4o"
+                )
         
         answer = response.choices[0].message.content
         logger.info(f"✅ Réponse chat générée ({len(answer)} chars)")
@@ -712,6 +1169,32 @@ async def export_to_pdf(data: dict):
     }
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# ADMINISTRATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@app.get("/api/admin/parse-failures")
+async def list_parse_failures(session_id: Optional[str] = None, bloc_id: Optional[str] = None, limit: int = 20):
+    """
+    🧾 Derniers échecs de parsing JSON des blocs (sans le contenu complet)
+    """
+    return {
+        "stats": parse_failures.stats(),
+        "failures": parse_failures.list(session_id=session_id, bloc_id=bloc_id, limit=limit)
+    }
+
+
+@app.get("/api/admin/parse-failures/{failure_id}")
+async def get_parse_failure(failure_id: str):
+    """
+    🧾 Échec de parsing complet, avec le JSON tel qu'il a été tenté
+    """
+    failure = parse_failures.get(failure_id)
+    if not failure:
+        raise HTTPException(status_code=404, detail=f"Échec {failure_id} non trouvé (sorti du tampon)")
+    return failure
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # HEALTH CHECK ET INFO
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -728,7 +1211,15 @@ async def health_check():
             "status": assistant_status.get("status", "unknown"),
             "version": "2.0.0",
             "openai_configured": bool(openai_assistant_service.client),
-            "assistants": assistant_status.get("assistants", {})
+            "assistants": assistant_status.get("assistants", {}),
+            "bloc_cache": await bloc_cache.stats(),
+            "rate_limits": rate_limiter.stats(),
+            "circuit_breakers": {
+                bloc_id: breaker.stats()
+                for bloc_id, breaker in openai_assistant_service.breakers.items()
+            },
+            "bloc_budgets": openai_assistant_service.latency.stats(),
+            "parse_failures": parse_failures.stats()
         }
     except Exception as e:
         return {
@@ -759,6 +1250,10 @@ async def root():
         "endpoints": {
             "POST /api/analyze": "Analyse complète (7 blocs)",
             "POST /api/analyze/bloc": "Analyse d'un bloc spécifique",
+            "POST /api/analyze/start": "Analyse progressive (BLOC1 immédiat)",
+            "GET /api/analyze/stream/{session_id}": "Progression en temps réel (SSE)",
+            "DELETE /api/analyze/{session_id}": "Annulation d'une analyse en cours",
+            "GET /api/admin/parse-failures": "Derniers échecs de parsing JSON",
             "GET /api/blocs": "Liste des blocs disponibles",
             "GET /api/blocs/profil/{profil}": "Blocs par profil",
             "POST /api/chat": "Chatbot sur l'analyse",
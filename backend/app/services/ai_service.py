@@ -11,6 +11,9 @@ from datetime import datetime
 
 from app.core.config import settings
 from app.services.rag_service import rag_service
+from app.services.rate_limiter import (
+    rate_limiter, estimate_tokens, retry_after_seconds, PRIORITY_NORMAL
+)
 
 logger = logging.getLogger(__name__)
 
@@ -41,41 +44,67 @@ class EnhancedAIService:
             self.client = None
 
     async def _call_openrouter(self, model: str, messages: List[Dict[str, str]],
-                              temperature: float = 0.1) -> Optional[str]:
-        """Call OpenRouter API"""
+                              temperature: float = 0.1,
+                              priority: int = PRIORITY_NORMAL) -> Optional[str]:
+        """
+        Call OpenRouter API through the shared rate limiter.
+
+        A 429 pauses the "openrouter" budget for the Retry-After delay and the
+        call waits its turn again, up to OPENROUTER_MAX_RETRIES times.
+        """
         if not self.client:
             logger.error("HTTP client not initialized")
             return None
 
-        try:
-            payload = {
-                "model": model,
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": 4000
-            }
+        max_tokens = 4000
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        estimated = estimate_tokens(*(m.get("content", "") for m in messages)) + max_tokens
 
-            response = await self.client.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                json=payload
-            )
+        for attempt in range(settings.OPENROUTER_MAX_RETRIES + 1):
+            try:
+                async with rate_limiter.limit("openrouter", model, tokens=estimated,
+                                              priority=priority) as permit:
+                    response = await self.client.post(
+                        "https://openrouter.ai/api/v1/chat/completions",
+                        json=payload
+                    )
+
+                    if response.status_code == 200:
+                        result = response.json()
+                        permit.record_tokens(result.get("usage", {}).get("total_tokens"))
+                        return result["choices"][0]["message"]["content"]
+
+                if response.status_code == 429:
+                    # The body may be HTML from a proxy, or carry a plain string error
+                    try:
+                        error_data = response.json()
+                    except ValueError:
+                        error_data = {}
+                    error = error_data.get('error') if isinstance(error_data, dict) else None
+                    error_msg = error.get('message') if isinstance(error, dict) else error
+                    error_msg = error_msg or 'Rate limit exceeded'
+                    logger.warning(f"OpenRouter rate limit ({attempt + 1}): {error_msg}")
+                    rate_limiter.penalize(
+                        "openrouter",
+                        retry_after_seconds(response.headers, default=2.0 ** (attempt + 1)),
+                        model=model
+                    )
+                    continue
 
-            if response.status_code == 200:
-                result = response.json()
-                return result["choices"][0]["message"]["content"]
-            elif response.status_code == 429:
-                error_data = response.json() if response.text else {}
-                error_msg = error_data.get('error', {}).get('message', 'Rate limit exceeded')
-                logger.warning(f"OpenRouter rate limit: {error_msg}")
-                # Return a helpful message instead of None
-                return f"[Rate Limit] Le modèle est temporairement limité. Veuillez réessayer dans quelques instants. Message: {error_msg}"
-            else:
                 logger.error(f"OpenRouter API error: {response.status_code} - {response.text}")
                 return None
 
-        except Exception as e:
-            logger.error(f"Failed to call OpenRouter: {str(e)}")
-            return None
+            except Exception as e:
+                logger.error(f"Failed to call OpenRouter: {str(e)}")
+                return None
+
+        logger.error(f"OpenRouter still rate limited after {settings.OPENROUTER_MAX_RETRIES} retries")
+        return None
 
     async def _get_perplexity_context(self, query: str) -> str:
         """Get context from Perplexity for current information"""
@@ -0,0 +1,72 @@
+"""
+Notification des changements d'état des sessions d'analyse
+Utilisé par le flux SSE /api/analyze/stream/{session_id}
+"""
+
+import asyncio
+import json
+import logging
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisEventBroker:
+    """
+    Réveille les flux SSE abonnés à une session dès que son état change.
+
+    Le broker ne transporte pas les données : chaque abonné relit la session
+    et n'émet que ce qui a changé depuis son dernier envoi.
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+
+    def notify(self, session_id: str):
+        """Signale un changement d'état de la session"""
+        self._versions[session_id] = self._versions.get(session_id, 0) + 1
+        event = self._events.pop(session_id, None)
+        if event:
+            event.set()
+
+    def version(self, session_id: str) -> int:
+        """Numéro de version courant de la session"""
+        return self._versions.get(session_id, 0)
+
+    async def wait(self, session_id: str, last_version: int, timeout: float) -> bool:
+        """
+        Attend un changement postérieur à last_version.
+
+        Returns:
+            True si la session a changé, False si le délai a expiré
+        """
+        if self.version(session_id) != last_version:
+            return True
+
+        event = self._events.setdefault(session_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def forget(self, session_id: str):
+        """
+        Libère les structures associées à une session (fin, expiration ou
+        suppression) ; les abonnés en attente sont réveillés.
+        """
+        self._versions.pop(session_id, None)
+        event = self._events.pop(session_id, None)
+        if event:
+            event.set()
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Formate un événement Server-Sent Events"""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+# Instance globale
+analysis_events = AnalysisEventBroker()
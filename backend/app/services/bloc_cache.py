@@ -0,0 +1,253 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║              CACHE DES RÉSULTATS DE BLOCS - AFRICA STRATEGY                   ║
+║          Clé = empreinte (assistant + version du prompt + message)            ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Deux questionnaires qui produisent le même message utilisateur (mêmes pays,
+secteur, profil, vision...) pour le même assistant et la même version de
+prompt réutilisent le résultat déjà calculé au lieu de relancer un run.
+
+- Niveau 1 : mémoire du process, LRU borné avec TTL
+- Niveau 2 : SQLite (survit aux redémarrages, partagé entre workers)
+
+Changer la version d'un prompt (BLOCn_PROMPT["version"]) ou l'assistant
+invalide naturellement toutes les entrées concernées.
+"""
+
+import os
+import copy
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_message(message: str) -> str:
+    """
+    Forme canonique du message : Unicode NFC, espaces de fin de ligne
+    et lignes vides multiples supprimés.
+    """
+    message = unicodedata.normalize("NFC", message)
+    lines = [" ".join(line.split()) for line in message.strip().splitlines()]
+    normalized = []
+    for line in lines:
+        if line or (normalized and normalized[-1]):
+            normalized.append(line)
+    return "\n".join(normalized)
+
+
+def bloc_cache_key(assistant_id: str, prompt_version: str, user_message: str) -> str:
+    """Empreinte SHA-256 d'une exécution de bloc"""
+    payload = json.dumps({
+        "assistant_id": assistant_id,
+        "prompt_version": prompt_version,
+        "message": normalize_message(user_message)
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BlocResultCache:
+    """
+    Cache à deux niveaux des résultats de blocs
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        max_entries: int,
+        sqlite_path: Optional[str] = None,
+        max_disk_entries: int = 5000
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0
+        }
+
+        self._lock = threading.Lock()
+        self._conn = None
+        if sqlite_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(sqlite_path)), exist_ok=True)
+                self._conn = sqlite3.connect(sqlite_path, check_same_thread=False, timeout=30)
+                with self._lock:
+                    self._conn.execute("PRAGMA journal_mode=WAL")
+                    self._conn.executescript("""
+                        CREATE TABLE IF NOT EXISTS bloc_results_cache (
+                            cache_key TEXT PRIMARY KEY,
+                            bloc_id TEXT NOT NULL,
+                            result TEXT NOT NULL,
+                            created_at REAL NOT NULL,
+                            expires_at REAL NOT NULL
+                        );
+                        CREATE INDEX IF NOT EXISTS idx_bloc_results_cache_created
+                            ON bloc_results_cache (created_at);
+                    """)
+                    self._conn.commit()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"⚠️ Cache SQLite indisponible ({sqlite_path}): {e}")
+                self._conn = None
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # NIVEAU MÉMOIRE
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if not entry:
+            return None
+        expires_at, result = entry
+        if expires_at < time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return result
+
+    def _memory_set(self, key: str, result: Dict[str, Any], expires_at: float):
+        self._memory[key] = (expires_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # NIVEAU SQLITE
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    async def _run(self, fn, *args):
+        def locked():
+            with self._lock:
+                return fn(*args)
+        return await asyncio.to_thread(locked)
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        row = self._conn.execute(
+            "SELECT result, expires_at FROM bloc_results_cache WHERE cache_key = ? AND expires_at >= ?",
+            (key, time.time())
+        ).fetchone()
+        if not row:
+            return None
+        return row[1], json.loads(row[0])
+
+    def _disk_set(self, key: str, bloc_id: str, payload: str, expires_at: float):
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO bloc_results_cache (cache_key, bloc_id, result, created_at, expires_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, bloc_id, payload, now, expires_at)
+        )
+        self._conn.execute("DELETE FROM bloc_results_cache WHERE expires_at < ?", (now,))
+        # Limite de taille : on retire les entrées les plus anciennes
+        self._conn.execute(
+            "DELETE FROM bloc_results_cache WHERE cache_key IN ("
+            "  SELECT cache_key FROM bloc_results_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?"
+            ")",
+            (self.max_disk_entries,)
+        )
+        self._conn.commit()
+
+    def _disk_clear(self):
+        self._conn.execute("DELETE FROM bloc_results_cache")
+        self._conn.commit()
+
+    def _disk_count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM bloc_results_cache").fetchone()[0]
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # API
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retourne une copie du résultat en cache, ou None"""
+        result = self._memory_get(key)
+        if result is not None:
+            self._stats["memory_hits"] += 1
+            return copy.deepcopy(result)
+
+        if self._conn is not None:
+            try:
+                entry = await self._run(self._disk_get, key)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Lecture cache SQLite échouée: {e}")
+                entry = None
+            if entry is not None:
+                expires_at, result = entry
+                self._memory_set(key, result, expires_at)
+                self._stats["disk_hits"] += 1
+                return copy.deepcopy(result)
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, bloc_id: str, result: Dict[str, Any]):
+        """Enregistre le résultat d'un bloc dans les deux niveaux"""
+        expires_at = time.time() + self.ttl_seconds
+        result = copy.deepcopy(result)
+        self._memory_set(key, result, expires_at)
+        self._stats["stores"] += 1
+
+        if self._conn is not None:
+            try:
+                payload = json.dumps(result, ensure_ascii=False, default=str)
+                await self._run(self._disk_set, key, bloc_id, payload, expires_at)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Écriture cache SQLite échouée: {e}")
+
+    async def clear(self):
+        """Vide les deux niveaux du cache"""
+        self._memory.clear()
+        if self._conn is not None:
+            await self._run(self._disk_clear)
+
+    async def stats(self) -> Dict[str, Any]:
+        """Compteurs de hits/miss et taille des deux niveaux"""
+        hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+        lookups = hits + self._stats["misses"]
+        disk_entries = None
+        if self._conn is not None:
+            try:
+                disk_entries = await self._run(self._disk_count)
+            except sqlite3.Error:
+                pass
+        return {
+            **self._stats,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": disk_entries,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INSTANCE GLOBALE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+bloc_cache = BlocResultCache(
+    ttl_seconds=settings.BLOC_CACHE_TTL_SECONDS,
+    max_entries=settings.BLOC_CACHE_MAX_ENTRIES,
+    sqlite_path=settings.BLOC_CACHE_SQLITE_PATH or None,
+    max_disk_entries=settings.BLOC_CACHE_MAX_DISK_ENTRIES
+)
@@ -0,0 +1,198 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                 ORDONNANCEUR DAG DES 7 BLOCS - AFRICA STRATEGY                ║
+║          Chaque bloc démarre dès que ses dépendances sont disponibles         ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Le graphe provient de BlocConfig.dependencies (blocs_config.py) :
+- BLOC1 seul au départ
+- BLOC2, BLOC3, BLOC4 dès que BLOC1 est prêt
+- BLOC5 dès que BLOC1 + BLOC2 sont prêts (sans attendre BLOC3/BLOC4)
+- BLOC6 dès que BLOC5 est prêt
+- BLOC7 quand tout le reste est résolu
+
+Le rapport d'exécution expose les temps par bloc et le chemin critique.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Iterable
+
+from app.config.blocs_config import get_all_blocs
+
+logger = logging.getLogger(__name__)
+
+
+RunBlocFn = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class BlocScheduler:
+    """
+    Exécute un ensemble de blocs selon leur graphe de dépendances
+    """
+
+    def __init__(self, dependencies: Optional[Dict[str, List[str]]] = None):
+        if dependencies is None:
+            dependencies = {bloc.id: list(bloc.dependencies) for bloc in get_all_blocs()}
+        self.dependencies = dependencies
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # GRAPHE
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def plan(self, bloc_ids: Iterable[str]) -> List[str]:
+        """
+        Retourne les blocs dans un ordre topologique.
+        Les dépendances absentes du plan sont ignorées.
+        """
+        bloc_ids = list(bloc_ids)
+        for bloc_id in bloc_ids:
+            if bloc_id not in self.dependencies:
+                raise ValueError(f"Bloc inconnu pour l'ordonnanceur: {bloc_id}")
+
+        selected = set(bloc_ids)
+        ordered: List[str] = []
+        visiting = set()
+
+        def visit(bloc_id: str):
+            if bloc_id in ordered:
+                return
+            if bloc_id in visiting:
+                raise ValueError(f"Dépendance circulaire détectée sur {bloc_id}")
+            visiting.add(bloc_id)
+            for dep in self.dependencies.get(bloc_id, []):
+                if dep in selected:
+                    visit(dep)
+            visiting.discard(bloc_id)
+            ordered.append(bloc_id)
+
+        for bloc_id in sorted(bloc_ids):
+            visit(bloc_id)
+        return ordered
+
+    @staticmethod
+    def critical_path(
+        dependencies: Dict[str, List[str]],
+        timings: Dict[str, Dict[str, float]]
+    ) -> List[str]:
+        """
+        Reconstruit le chemin critique réel : en partant du bloc terminé en
+        dernier, on remonte à chaque fois la dépendance terminée en dernier
+        (celle qui a effectivement retardé le démarrage).
+        """
+        if not timings:
+            return []
+
+        current = max(timings, key=lambda b: timings[b]["end"])
+        path = [current]
+        while True:
+            deps = [d for d in dependencies.get(current, []) if d in timings]
+            if not deps:
+                break
+            current = max(deps, key=lambda d: timings[d]["end"])
+            path.append(current)
+        return list(reversed(path))
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # EXÉCUTION
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    async def run(
+        self,
+        run_bloc: RunBlocFn,
+        bloc_ids: Optional[Iterable[str]] = None,
+        initial_results: Optional[Dict[str, Any]] = None,
+        critical: Iterable[str] = ()
+    ) -> Dict[str, Any]:
+        """
+        Exécute les blocs dès que leurs dépendances sont résolues.
+
+        Args:
+            run_bloc: coroutine (bloc_id, context) -> résultat du bloc
+            bloc_ids: blocs à exécuter (défaut : tous)
+            initial_results: résultats déjà disponibles (ex: BLOC1 déjà calculé)
+            critical: blocs dont l'échec interrompt toute l'exécution
+
+        Returns:
+            Rapport : results, errors, timings, critical_path, duration_seconds
+        """
+        results: Dict[str, Any] = dict(initial_results or {})
+        errors: Dict[str, str] = {}
+        timings: Dict[str, Dict[str, float]] = {}
+        critical = set(critical)
+
+        if bloc_ids is None:
+            bloc_ids = list(self.dependencies.keys())
+        order = [b for b in self.plan(bloc_ids) if b not in results]
+        settled = set(results)
+        in_plan = set(order) | settled
+
+        origin = time.monotonic()
+        running: Dict[asyncio.Task, str] = {}
+        waiting = list(order)
+
+        async def execute(bloc_id: str, context: Dict[str, Any]):
+            start = time.monotonic() - origin
+            try:
+                return await run_bloc(bloc_id, context)
+            finally:
+                end = time.monotonic() - origin
+                timings[bloc_id] = {
+                    "start": round(start, 3),
+                    "end": round(end, 3),
+                    "duration": round(end - start, 3)
+                }
+
+        try:
+            while waiting or running:
+                # Démarrer tous les blocs dont les dépendances sont résolues
+                for bloc_id in list(waiting):
+                    deps = [d for d in self.dependencies.get(bloc_id, []) if d in in_plan]
+                    if all(d in settled for d in deps):
+                        context = {d: results[d] for d in deps if d in results}
+                        task = asyncio.create_task(execute(bloc_id, context))
+                        running[task] = bloc_id
+                        waiting.remove(bloc_id)
+
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    bloc_id = running.pop(task)
+                    settled.add(bloc_id)
+                    exc = task.exception()
+                    if exc is None:
+                        results[bloc_id] = task.result()
+                    else:
+                        errors[bloc_id] = str(exc)
+                        if bloc_id in critical:
+                            raise exc
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running.keys(), return_exceptions=True)
+
+        path = self.critical_path(self.dependencies, timings)
+        report = {
+            "results": results,
+            "errors": errors,
+            "timings": timings,
+            "critical_path": path,
+            "critical_path_seconds": round(sum(timings[b]["duration"] for b in path), 3),
+            "duration_seconds": round(time.monotonic() - origin, 3)
+        }
+        logger.info(
+            f"   🧭 Chemin critique: {' → '.join(path) or '-'} "
+            f"({report['critical_path_seconds']}s / {report['duration_seconds']}s)"
+        )
+        return report
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INSTANCE GLOBALE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+bloc_scheduler = BlocScheduler()
@@ -1,18 +1,25 @@
 """
 Data Import Service for Africa Strategy RAG
 Imports data from PostgreSQL database to Pinecone for RAG
+
+Rows are streamed by category (short keyset-paginated queries) into a
+bounded fetch → chunk → embed → upsert pipeline, so memory stays flat
+whatever the size of the knowledge base.
 """
 
 import os
 import json
+import time
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 try:
     import asyncpg
+    from sqlalchemy import text
     from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
     from sqlalchemy.orm import sessionmaker
     ASYNCPG_AVAILABLE = True
@@ -23,6 +30,82 @@ except ImportError:
 from app.core.config import settings
 from app.services.rag_service import rag_service
 
+IMPORT_CATEGORIES = [
+    'regulatory_data',
+    'sector_reports',
+    'esg_frameworks',
+    'market_data',
+    'best_practices',
+    'case_studies',
+    'policy_documents'
+]
+
+# Source table of each category. Rows are read in primary-key order
+# (keyset pagination on id), not by date.
+CATEGORY_SOURCES = {
+    # Regulatory frameworks and laws
+    'regulatory_data': {
+        'table': 'regulatory_documents',
+        'columns': """id, title, content, country, sector, category,
+                      created_at, updated_at, source_url, language""",
+        'where': "is_active = true"
+    },
+    # Sector analysis reports
+    'sector_reports': {
+        'table': 'sector_reports',
+        'columns': """id, title, executive_summary, full_content, sector,
+                      country, publication_year, source_organization,
+                      key_findings, recommendations""",
+        'where': "is_published = true"
+    },
+    # ESG frameworks and standards
+    'esg_frameworks': {
+        'table': 'esg_frameworks',
+        'columns': """id, framework_name, description, principles,
+                      indicators, sector_applicability, country_focus,
+                      implementing_organization, version, release_date""",
+        'where': "is_active = true"
+    },
+    # Market intelligence data
+    'market_data': {
+        'table': 'market_intelligence',
+        'columns': """id, market_segment, country, sector, market_size,
+                      growth_rate, key_players, trends, opportunities,
+                      threats, data_year, source""",
+        'where': "is_verified = true"
+    },
+    # Best practices
+    'best_practices': {
+        'table': 'best_practices',
+        'columns': """id, practice_title, sector, country, company_size,
+                      challenge_addressed, solution_implemented,
+                      outcomes, lessons_learned, implementation_time,
+                      cost_estimate, success_factors""",
+        'where': "is_verified = true AND is_public = true"
+    },
+    # Detailed case studies
+    'case_studies': {
+        'table': 'case_studies',
+        'columns': """id, company_name, sector, country, challenge,
+                      solution, implementation_steps, outcomes,
+                      metrics, timeline, budget, lessons_learned,
+                      contact_info, is_anonymized""",
+        'where': "is_published = true"
+    },
+    # Policy and strategy documents
+    'policy_documents': {
+        'table': 'policy_documents',
+        'columns': """id, document_title, country, sector, policy_type,
+                      summary, key_points, implementation_status,
+                      responsible_ministry, timeline, budget_allocated,
+                      expected_impact""",
+        'where': "is_active = true"
+    }
+}
+
+# Errors kept per category in the import summary
+MAX_CATEGORY_ERRORS = 50
+
 
 class DataImportService:
     """
@@ -34,6 +117,15 @@ class DataImportService:
         self.engine = None
         self.session_maker = None
 
+        # Pipeline sizes: rows per keyset page, rows per batch, batches queued ahead
+        self.page_size = max(1, settings.RAG_IMPORT_PAGE_SIZE)
+        self.fetch_batch_size = max(1, settings.RAG_IMPORT_FETCH_BATCH_SIZE)
+        self.pipeline_depth = max(1, settings.RAG_IMPORT_PIPELINE_DEPTH)
+
+        # Progress of the current (or last) import, reported by /rag/health
+        self.progress: Dict[str, Any] = {'running': False, 'categories': {}}
+        self._import_lock = asyncio.Lock()
+
     async def initialize_db(self):
         """Initialize database connection"""
         if not self.engine:
@@ -54,8 +146,18 @@ class DataImportService:
         Returns:
             Import summary
         """
-        logger.info("Starting Africa Strategy data import to RAG")
+        return await self.import_categories(IMPORT_CATEGORIES)
 
+    async def import_categories(self, categories: List[str]) -> Dict[str, Any]:
+        """
+        Import the given categories from PostgreSQL to the RAG system, one after the other
+
+        Args:
+            categories: Category names (see IMPORT_CATEGORIES)
+
+        Returns:
+            Import summary
+        """
         summary = {
             'start_time': datetime.now().isoformat(),
             'total_documents': 0,
@@ -65,212 +167,255 @@ class DataImportService:
             'errors': []
         }
 
-        try:
-            # Import different types of data
-            categories = [
-                'regulatory_data',
-                'sector_reports',
-                'esg_frameworks',
-                'market_data',
-                'best_practices',
-                'case_studies',
-                'policy_documents'
-            ]
-
-            for category in categories:
-                logger.info(f"Importing category: {category}")
-                category_summary = await self._import_category(category)
-                summary['categories'][category] = category_summary
-                summary['total_documents'] += category_summary['documents_count']
-                summary['successful_imports'] += category_summary['successful_imports']
-                summary['failed_imports'] += category_summary['failed_imports']
-
-                if category_summary['errors']:
-                    summary['errors'].extend(category_summary['errors'])
-
-            summary['end_time'] = datetime.now().isoformat()
-            summary['duration_seconds'] = (
-                datetime.fromisoformat(summary['end_time']) -
-                datetime.fromisoformat(summary['start_time'])
-            ).total_seconds()
-
-            logger.info(f"Data import completed: {summary['successful_imports']} successful, {summary['failed_imports']} failed")
+        if self._import_lock.locked():
+            logger.warning("Data import already running - request ignored")
+            summary['errors'].append("Import already running")
             return summary
 
+        async with self._import_lock:
+            logger.info(f"Starting Africa Strategy data import to RAG: {', '.join(categories)}")
+            self.progress = {
+                'running': True,
+                'started_at': summary['start_time'],
+                'categories': {
+                    category: {'status': 'pending', 'documents_count': 0}
+                    for category in categories
+                }
+            }
+
+            try:
+                for category in categories:
+                    logger.info(f"Importing category: {category}")
+                    category_summary = await self._import_category(category)
+                    summary['categories'][category] = category_summary
+                    summary['total_documents'] += category_summary['documents_count']
+                    summary['successful_imports'] += category_summary['successful_imports']
+                    summary['failed_imports'] += category_summary['failed_imports']
+
+                    if category_summary['errors']:
+                        summary['errors'].extend(category_summary['errors'])
+
+                summary['end_time'] = datetime.now().isoformat()
+                summary['duration_seconds'] = (
+                    datetime.fromisoformat(summary['end_time']) -
+                    datetime.fromisoformat(summary['start_time'])
+                ).total_seconds()
+
+                logger.info(f"Data import completed: {summary['successful_imports']} successful, {summary['failed_imports']} failed")
+                return summary
+
+            except Exception as e:
+                logger.error(f"Data import failed: {str(e)}")
+                summary['errors'].append(str(e))
+                return summary
+
+            finally:
+                self.progress['running'] = False
+                self.progress['finished_at'] = datetime.now().isoformat()
+
+    async def _import_categories_background(self, categories: List[str]):
+        """Background task of POST /rag/import/database (progress in /rag/health)"""
+        try:
+            await self.import_categories(categories)
         except Exception as e:
-            logger.error(f"Data import failed: {str(e)}")
-            summary['errors'].append(str(e))
-            return summary
+            logger.error(f"Background data import failed: {str(e)}")
+
+    def import_status(self) -> Dict[str, Any]:
+        """Progress of the current (or last) import, per category"""
+        return {
+            **self.progress,
+            'categories': {
+                category: {
+                    **status,
+                    'errors': status.get('errors', [])[-5:]
+                }
+                for category, status in self.progress['categories'].items()
+            }
+        }
 
     async def _import_category(self, category: str) -> Dict[str, Any]:
         """
         Import a specific category of data
 
+        Batches of rows flow through a bounded queue: the next batch is fetched
+        while the previous one is chunked, embedded and upserted, and fetching
+        waits once RAG_IMPORT_PIPELINE_DEPTH batches are queued. The vector
+        store is persisted once, when the category ends.
+
         Args:
             category: Category name
 
         Returns:
-            Category import summary
+            Category import summary (also the live progress entry)
         """
         category_summary = {
+            'status': 'running',
+            'documents_total': None,
             'documents_count': 0,
             'successful_imports': 0,
             'failed_imports': 0,
+            'batches': 0,
+            'last_id': None,
+            'documents_per_second': 0.0,
+            'started_at': datetime.now().isoformat(),
             'errors': []
         }
+        self.progress['categories'][category] = category_summary
+        started = time.perf_counter()
 
-        try:
-            # Get data from database based on category
-            documents = await self._fetch_category_data(category)
+        def record_error(message: str):
+            if len(category_summary['errors']) < MAX_CATEGORY_ERRORS:
+                category_summary['errors'].append(message)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.pipeline_depth)
+        fetch_errors: List[Exception] = []
 
-            if not documents:
+        async def produce():
+            try:
+                async for rows in self._fetch_category_data(category):
+                    await queue.put(rows)
+            except Exception as e:
+                fetch_errors.append(e)
+            await queue.put(None)
+
+        producer = None
+        try:
+            category_summary['documents_total'] = await self._count_category_rows(category)
+            producer = asyncio.create_task(produce())
+
+            while True:
+                rows = await queue.get()
+                if rows is None:
+                    break
+
+                # Convert to RAG format
+                rag_documents = []
+                for doc in rows:
+                    try:
+                        rag_doc = self._convert_to_rag_format(doc, category)
+                        if rag_doc:
+                            rag_documents.append(rag_doc)
+                    except Exception as e:
+                        logger.error(f"Failed to convert document {doc.get('id', 'unknown')}: {str(e)}")
+                        category_summary['failed_imports'] += 1
+                        record_error(f"Document {doc.get('id', 'unknown')}: {str(e)}")
+
+                # Import to RAG system (chunk → embed → upsert)
+                if rag_documents:
+                    success = await rag_service.add_documents(rag_documents, flush=False)
+                    if success:
+                        category_summary['successful_imports'] += len(rag_documents)
+                    else:
+                        category_summary['failed_imports'] += len(rag_documents)
+                        record_error(f"RAG import failed for {category} batch ending at id {rows[-1].get('id')}")
+
+                category_summary['documents_count'] += len(rows)
+                category_summary['batches'] += 1
+                category_summary['last_id'] = rows[-1].get('id')
+                category_summary['documents_per_second'] = round(
+                    category_summary['documents_count'] / max(time.perf_counter() - started, 1e-6), 1
+                )
+                logger.info(
+                    f"{category}: {category_summary['documents_count']}"
+                    f"/{category_summary['documents_total'] or '?'} documents imported"
+                )
+
+            if fetch_errors:
+                raise fetch_errors[0]
+
+            if not category_summary['documents_count']:
                 logger.warning(f"No documents found for category: {category}")
-                return category_summary
-
-            category_summary['documents_count'] = len(documents)
-
-            # Convert to RAG format
-            rag_documents = []
-            for doc in documents:
-                try:
-                    rag_doc = self._convert_to_rag_format(doc, category)
-                    if rag_doc:
-                        rag_documents.append(rag_doc)
-                except Exception as e:
-                    logger.error(f"Failed to convert document {doc.get('id', 'unknown')}: {str(e)}")
-                    category_summary['failed_imports'] += 1
-                    category_summary['errors'].append(f"Document {doc.get('id', 'unknown')}: {str(e)}")
-
-            # Import to RAG system
-            if rag_documents:
-                success = await rag_service.add_documents(rag_documents)
-                if success:
-                    category_summary['successful_imports'] = len(rag_documents)
-                    logger.info(f"Successfully imported {len(rag_documents)} documents for category: {category}")
-                else:
-                    category_summary['failed_imports'] = len(rag_documents)
-                    category_summary['errors'].append(f"RAG import failed for category: {category}")
+            else:
+                logger.info(f"Successfully imported {category_summary['successful_imports']} documents for category: {category}")
+            category_summary['status'] = 'completed'
 
         except Exception as e:
             logger.error(f"Failed to import category {category}: {str(e)}")
-            category_summary['errors'].append(str(e))
+            record_error(str(e))
+            category_summary['status'] = 'failed'
 
-        return category_summary
+        finally:
+            if producer is not None and not producer.done():
+                producer.cancel()
+            try:
+                await rag_service.flush()
+            except Exception as e:
+                logger.error(f"Failed to persist vector store after {category}: {str(e)}")
+                record_error(f"Vector store flush failed: {str(e)}")
+            category_summary['finished_at'] = datetime.now().isoformat()
 
-    async def _fetch_category_data(self, category: str) -> List[Dict[str, Any]]:
-        """
-        Fetch data for a specific category from database
+        return category_summary
 
-        Args:
-            category: Category name
+    async def _count_category_rows(self, category: str) -> Optional[int]:
+        """Number of rows to import (for progress), None if unknown"""
+        source = CATEGORY_SOURCES.get(category)
+        if source is None:
+            return None
 
-        Returns:
-            List of documents
-        """
         session = await self.get_db_session()
-
         try:
-            if category == 'regulatory_data':
-                # Import regulatory frameworks and laws
-                query = """
-                SELECT id, title, content, country, sector, category,
-                       created_at, updated_at, source_url, language
-                FROM regulatory_documents
-                WHERE is_active = true
-                ORDER BY created_at DESC
-                """
-
-            elif category == 'sector_reports':
-                # Import sector analysis reports
-                query = """
-                SELECT id, title, executive_summary, full_content, sector,
-                       country, publication_year, source_organization,
-                       key_findings, recommendations
-                FROM sector_reports
-                WHERE is_published = true
-                ORDER BY publication_year DESC
-                """
-
-            elif category == 'esg_frameworks':
-                # Import ESG frameworks and standards
-                query = """
-                SELECT id, framework_name, description, principles,
-                       indicators, sector_applicability, country_focus,
-                       implementing_organization, version, release_date
-                FROM esg_frameworks
-                WHERE is_active = true
-                ORDER BY release_date DESC
-                """
-
-            elif category == 'market_data':
-                # Import market intelligence data
-                query = """
-                SELECT id, market_segment, country, sector, market_size,
-                       growth_rate, key_players, trends, opportunities,
-                       threats, data_year, source
-                FROM market_intelligence
-                WHERE is_verified = true
-                ORDER BY data_year DESC
-                """
-
-            elif category == 'best_practices':
-                # Import best practices and case studies
-                query = """
-                SELECT id, practice_title, sector, country, company_size,
-                       challenge_addressed, solution_implemented,
-                       outcomes, lessons_learned, implementation_time,
-                       cost_estimate, success_factors
-                FROM best_practices
-                WHERE is_verified = true AND is_public = true
-                ORDER BY created_at DESC
-                """
-
-            elif category == 'case_studies':
-                # Import detailed case studies
-                query = """
-                SELECT id, company_name, sector, country, challenge,
-                       solution, implementation_steps, outcomes,
-                       metrics, timeline, budget, lessons_learned,
-                       contact_info, is_anonymized
-                FROM case_studies
-                WHERE is_published = true
-                ORDER BY created_at DESC
-                """
-
-            elif category == 'policy_documents':
-                # Import policy and strategy documents
-                query = """
-                SELECT id, document_title, country, sector, policy_type,
-                       summary, key_points, implementation_status,
-                       responsible_ministry, timeline, budget_allocated,
-                       expected_impact
-                FROM policy_documents
-                WHERE is_active = true
-                ORDER BY created_at DESC
-                """
-
-            else:
-                logger.warning(f"Unknown category: {category}")
-                return []
+            result = await session.execute(
+                text(f"SELECT COUNT(*) FROM {source['table']} WHERE {source['where']}")
+            )
+            return result.scalar()
+        except Exception as e:
+            logger.warning(f"Could not count rows for category {category}: {str(e)}")
+            return None
+        finally:
+            await session.close()
 
-            # Execute query
-            result = await session.execute(query)
-            rows = result.fetchall()
+    async def _fetch_category_data(self, category: str, after_id: Any = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream data for a specific category from database
 
-            # Convert to dictionaries
-            documents = []
-            for row in rows:
-                doc_dict = dict(row._mapping)
-                documents.append(doc_dict)
+        Keyset pagination on id: each page of RAG_IMPORT_PAGE_SIZE rows is one
+        short query, read whole and its session closed before the page is
+        yielded in batches, so no transaction stays open while batches are
+        embedded and neither the database nor this process holds a whole table.
 
-            logger.info(f"Fetched {len(documents)} documents for category: {category}")
-            return documents
+        Args:
+            category: Category name
+            after_id: Resume after this id (last_id of an interrupted import)
 
-        except Exception as e:
-            logger.error(f"Failed to fetch data for category {category}: {str(e)}")
-            return []
-        finally:
-            await session.close()
+        Yields:
+            Lists of up to RAG_IMPORT_FETCH_BATCH_SIZE documents
+        """
+        source = CATEGORY_SOURCES.get(category)
+        if source is None:
+            logger.warning(f"Unknown category: {category}")
+            return
+
+        last_id = after_id
+        total = 0
+        while True:
+            keyset = "AND id > :last_id" if last_id is not None else ""
+            query = text(f"""
+                SELECT {source['columns']}
+                FROM {source['table']}
+                WHERE {source['where']} {keyset}
+                ORDER BY id
+                LIMIT :limit
+            """)
+            params = {'limit': self.page_size}
+            if last_id is not None:
+                params['last_id'] = last_id
+
+            session = await self.get_db_session()
+            try:
+                result = await session.execute(query, params)
+                page = [dict(row) for row in result.mappings()]
+            finally:
+                await session.close()
+
+            for start in range(0, len(page), self.fetch_batch_size):
+                yield page[start:start + self.fetch_batch_size]
+
+            total += len(page)
+            if len(page) < self.page_size:
+                break
+            last_id = page[-1]['id']
+
+        logger.info(f"Fetched {total} documents for category: {category}")
 
     def _convert_to_rag_format(self, doc: Dict[str, Any], category: str) -> Optional[Dict[str, Any]]:
         """
@@ -0,0 +1,163 @@
+"""
+Embedding Cache for Africa Strategy RAG
+Persists chunk embeddings keyed by (model name, content hash) so re-imports
+of unchanged content skip the embedding model entirely
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the NFC-normalized text"""
+    return hashlib.sha256(unicodedata.normalize("NFC", text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed cache of float32 embeddings
+
+    Methods are blocking and thread-safe: call them from a worker thread
+    (asyncio.to_thread) when used from async code.
+    """
+
+    def __init__(self, sqlite_path: Optional[str] = None, max_entries: int = 100_000):
+        self.sqlite_path = sqlite_path
+        self.max_entries = max_entries
+        self._stats = {"hits": 0, "misses": 0, "stores": 0}
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if sqlite_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(sqlite_path)), exist_ok=True)
+                self._conn = sqlite3.connect(sqlite_path, check_same_thread=False, timeout=30)
+                with self._lock:
+                    self._conn.execute("PRAGMA journal_mode=WAL")
+                    self._conn.executescript("""
+                        CREATE TABLE IF NOT EXISTS embedding_cache (
+                            model TEXT NOT NULL,
+                            content_hash TEXT NOT NULL,
+                            dimension INTEGER NOT NULL,
+                            vector BLOB NOT NULL,
+                            created_at REAL NOT NULL,
+                            PRIMARY KEY (model, content_hash)
+                        );
+                        CREATE INDEX IF NOT EXISTS idx_embedding_cache_created
+                            ON embedding_cache (created_at);
+                    """)
+                    self._conn.commit()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Embedding cache unavailable ({sqlite_path}): {e}")
+                self._conn = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached embeddings
+
+        Args:
+            model: Embedding model name
+            hashes: Content hashes (see content_hash)
+
+        Returns:
+            {content_hash: float32 vector} for the hashes found
+        """
+        if self._conn is None or not hashes:
+            return {}
+
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(hashes))
+        try:
+            with self._lock:
+                # Stay under SQLite's bound-parameter limit
+                for i in range(0, len(unique), 500):
+                    batch = unique[i:i + 500]
+                    rows = self._conn.execute(
+                        f"SELECT content_hash, vector FROM embedding_cache "
+                        f"WHERE model = ? AND content_hash IN ({','.join('?' * len(batch))})",
+                        (model, *batch)
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=np.float32)
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache read failed: {e}")
+            return {}
+
+        self._stats["hits"] += len(found)
+        self._stats["misses"] += len(unique) - len(found)
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, np.ndarray]):
+        """Store embeddings, evicting the oldest entries beyond max_entries"""
+        if self._conn is None or not vectors:
+            return
+
+        now = time.time()
+        rows = [
+            (model, key, int(vector.shape[0]), np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for key, vector in vectors.items()
+        ]
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache "
+                    "(model, content_hash, dimension, vector, created_at) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute(
+                    "DELETE FROM embedding_cache WHERE rowid IN ("
+                    "  SELECT rowid FROM embedding_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?"
+                    ")",
+                    (self.max_entries,)
+                )
+                self._conn.commit()
+            self._stats["stores"] += len(rows)
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and number of cached embeddings"""
+        entries = None
+        if self._conn is not None:
+            try:
+                with self._lock:
+                    entries = self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+            except sqlite3.Error:
+                pass
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "enabled": self.enabled
+        }
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+
+def create_embedding_cache() -> EmbeddingCache:
+    """Embedding cache configured by RAG_EMBEDDING_CACHE_* (opens the SQLite file)"""
+    return EmbeddingCache(
+        sqlite_path=settings.RAG_EMBEDDING_CACHE_PATH or None,
+        max_entries=settings.RAG_EMBEDDING_CACHE_MAX_ENTRIES
+    )
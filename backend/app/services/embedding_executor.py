@@ -0,0 +1,290 @@
+"""
+Embedding Executor for Africa Strategy RAG
+Runs sentence-transformers inference in a pool of worker processes shared by
+search and ingestion, so a bulk import neither blocks the event loop nor
+holds the GIL while API requests are served
+
+Batches go through a bounded queue: callers wait (backpressure) once
+RAG_EMBED_MAX_PENDING batches are queued, and bulk (ingestion) batches are
+limited to one per worker so search batches never queue behind a whole import.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = ("default", "int8", "onnx")
+
+# Model of the current worker (process mode) or of this process (thread mode)
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+
+
+class _OnnxEncoder:
+    """
+    ONNX Runtime export of a MiniLM sentence-transformer (fp32 or int8-quantized
+    file): mean pooling over the attention mask, then L2 normalization
+    """
+
+    def __init__(self, onnx_path: str, tokenizer_name: str, threads: int = 0, max_length: int = 256):
+        import onnxruntime
+        from transformers import AutoTokenizer
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            onnx_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+        self.max_length = max_length
+        self._inputs = {item.name for item in self.session.get_inputs()}
+
+    def encode(self, texts: List[str], **_) -> np.ndarray:
+        tokens = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np"
+        )
+        feed = {name: tokens[name].astype(np.int64) for name in self._inputs if name in tokens}
+        if "token_type_ids" in self._inputs and "token_type_ids" not in feed:
+            feed["token_type_ids"] = np.zeros_like(feed["input_ids"])
+        hidden = self.session.run(None, feed)[0]
+
+        mask = tokens["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return int(self.encode(["dimension"]).shape[1])
+
+
+def _load_model(model_name: str, variant: str, onnx_path: str, torch_threads: int):
+    """Load the embedding model once per process (pool initializer)"""
+    global _MODEL
+    with _MODEL_LOCK:
+        if _MODEL is not None:
+            return
+
+        if variant == "onnx":
+            tokenizer_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+            _MODEL = _OnnxEncoder(onnx_path, tokenizer_name, torch_threads)
+            return
+
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if torch_threads:
+            # Workers share the cores instead of each starting one thread per core
+            torch.set_num_threads(torch_threads)
+        model = SentenceTransformer(model_name, device="cpu")
+        if variant == "int8":
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        _MODEL = model
+
+
+def _encode(texts: List[str]) -> np.ndarray:
+    """Embed one batch (runs in a worker)"""
+    vectors = _MODEL.encode(texts, batch_size=len(texts), convert_to_numpy=True, show_progress_bar=False)
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def _dimension() -> int:
+    """Embedding dimension of the worker's model (also forces the model load)"""
+    return int(_MODEL.get_sentence_embedding_dimension())
+
+
+class EmbeddingExecutor:
+    """
+    Pool of embedding workers ("process" or "thread" mode)
+
+    start() is blocking (it loads the model in every worker); embed() is async.
+    """
+
+    def __init__(self, model_name: str, variant: str = "default", mode: str = "process",
+                 workers: int = 0, batch_size: int = 64, max_pending: int = 16, onnx_path: str = ""):
+        if variant not in VARIANTS:
+            logger.warning(f"Unknown embedding variant: {variant} - using default")
+            variant = "default"
+        if variant == "onnx" and not onnx_path:
+            logger.warning("RAG_EMBED_ONNX_PATH not set - using default embedding variant")
+            variant = "default"
+
+        cores = os.cpu_count() or 1
+        self.model_name = model_name
+        self.variant = variant
+        self.mode = mode if mode in ("process", "thread") else "process"
+        self.workers = workers if workers > 0 else max(1, min(4, cores // 2))
+        self.torch_threads = max(1, cores // self.workers) if self.mode == "process" else 0
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max(self.workers, max_pending)
+        self.onnx_path = onnx_path
+        self.dimension: Optional[int] = None
+
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._limits_loop = None
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight = 0
+        self._stats = {"batches": 0, "texts": 0, "queue_waits": 0, "restarts": 0}
+
+    @property
+    def cache_model(self) -> str:
+        """Key for cached embeddings: a quantized variant gives slightly different vectors"""
+        return self.model_name if self.variant == "default" else f"{self.model_name}@{self.variant}"
+
+    def _create_pool(self):
+        initargs = (self.model_name, self.variant, self.onnx_path, self.torch_threads)
+        if self.mode == "thread":
+            return ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="rag-embed",
+                initializer=_load_model,
+                initargs=initargs
+            )
+        # spawn: forking a process that already holds torch threads can deadlock
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_load_model,
+            initargs=initargs
+        )
+
+    def start(self) -> int:
+        """
+        Start the workers and load the model in each of them
+
+        Returns:
+            Embedding dimension
+
+        Raises:
+            Exception if the model cannot be loaded
+        """
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = self._create_pool()
+            pool = self._pool
+        try:
+            # One probe per worker so every worker is spawned and loaded now
+            probes = [pool.submit(_dimension) for _ in range(self.workers)]
+            self.dimension = probes[0].result()
+            for probe in probes[1:]:
+                probe.result()
+        except Exception:
+            self.close()
+            raise
+        logger.info(
+            f"Embedding executor ready: {self.workers} {self.mode} worker(s), "
+            f"{self.cache_model}, dimension {self.dimension}"
+        )
+        return self.dimension
+
+    def _semaphores(self) -> Dict[str, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        if self._limits_loop is not loop:
+            self._limits_loop = loop
+            self._limits = {
+                "all": asyncio.Semaphore(self.max_pending),
+                "bulk": asyncio.Semaphore(self.workers)
+            }
+        return self._limits
+
+    async def _run_batch(self, batch: List[str], semaphores: List[asyncio.Semaphore]) -> np.ndarray:
+        async with contextlib.AsyncExitStack() as stack:
+            for semaphore in semaphores:
+                if semaphore.locked():
+                    self._stats["queue_waits"] += 1
+                await stack.enter_async_context(semaphore)
+
+            pool = self._pool
+            if pool is None:
+                raise RuntimeError("Embedding executor not started")
+            self._in_flight += 1
+            try:
+                return await asyncio.wrap_future(pool.submit(_encode, batch))
+            except BrokenProcessPool:
+                self._restart(pool)
+                raise
+            finally:
+                self._in_flight -= 1
+
+    def _restart(self, broken_pool):
+        """Replace a pool whose worker died (e.g. killed for memory); next calls use the new one"""
+        with self._pool_lock:
+            if self._pool is not broken_pool:
+                return
+            logger.error("Embedding worker died - restarting the embedding pool")
+            broken_pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._create_pool()
+            self._stats["restarts"] += 1
+
+    async def embed(self, texts: List[str], bulk: bool = False) -> np.ndarray:
+        """
+        Embed texts in batches of RAG_EMBED_BATCH_SIZE
+
+        Args:
+            texts: Texts to embed
+            bulk: Ingestion work - limited to one queued batch per worker so
+                  search batches keep getting through
+
+        Returns:
+            float32 array of shape (len(texts), dimension)
+        """
+        if not texts:
+            return np.empty((0, self.dimension or 0), dtype=np.float32)
+
+        limits = self._semaphores()
+        semaphores = [limits["bulk"], limits["all"]] if bulk else [limits["all"]]
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        arrays = await asyncio.gather(*(self._run_batch(batch, semaphores) for batch in batches))
+
+        self._stats["batches"] += len(batches)
+        self._stats["texts"] += len(texts)
+        return np.vstack(arrays)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool configuration, queue depth and counters"""
+        return {
+            **self._stats,
+            "mode": self.mode,
+            "workers": self.workers,
+            "variant": self.variant,
+            "batch_size": self.batch_size,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight,
+            "started": self._pool is not None
+        }
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+def create_embedding_executor() -> EmbeddingExecutor:
+    """Embedding executor configured by RAG_EMBEDDING_MODEL and RAG_EMBED_*"""
+    return EmbeddingExecutor(
+        model_name=settings.RAG_EMBEDDING_MODEL,
+        variant=settings.RAG_EMBED_VARIANT.lower(),
+        mode=settings.RAG_EMBED_EXECUTOR.lower(),
+        workers=settings.RAG_EMBED_WORKERS,
+        batch_size=settings.RAG_EMBED_BATCH_SIZE,
+        max_pending=settings.RAG_EMBED_MAX_PENDING,
+        onnx_path=settings.RAG_EMBED_ONNX_PATH
+    )
+
+
+# Global embedding executor instance (workers start on first RAG use)
+embedding_executor = create_embedding_executor()
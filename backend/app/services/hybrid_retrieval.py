@@ -0,0 +1,259 @@
+"""
+Hybrid Retrieval for Africa Strategy RAG
+BM25 lexical index over RAG chunks, reciprocal-rank fusion with the vector
+results, and an optional re-ranker stage
+
+Dense MiniLM embeddings match exact terms poorly ("ND-GAIN", "WGI",
+"CEDEAO", ISIC codes, country names); the lexical index catches them.
+"""
+
+import os
+import re
+import json
+import math
+import heapq
+import bisect
+import sqlite3
+import logging
+import threading
+import unicodedata
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+from app.services.vector_store import matches_filters
+
+logger = logging.getLogger(__name__)
+
+# Words, keeping hyphenated terms and codes together (nd-gain, c10-c12)
+_TOKEN_RE = re.compile(r"\w+(?:-\w+)*")
+
+_STOPWORDS = frozenset("""
+    a au aux avec ce ces dans de des du en et la le les leur leurs l d ou par pour
+    qui que sa se ses son sur un une est sont pas plus the and of to in for on with
+    by is are as at from or an be this that
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-folded terms; hyphenated terms also yield their parts"""
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    tokens = []
+    for token in _TOKEN_RE.findall(folded):
+        if token in _STOPWORDS:
+            continue
+        tokens.append(token)
+        if "-" in token:
+            tokens.extend(part for part in token.split("-") if part and part not in _STOPWORDS)
+    return tokens
+
+
+class BM25Index:
+    """
+    In-process BM25 (Okapi) index of RAG chunks
+
+    Postings live in memory; chunks are persisted to SQLite (when a path is
+    given) and re-indexed at startup. Methods are blocking and thread-safe.
+
+    A query term found in at most rare_term_ratio of the chunks is "rare":
+    matches on such terms are flagged, as they are specific enough to keep
+    a chunk whatever its vector score.
+    """
+
+    def __init__(self, sqlite_path: Optional[str] = None, k1: float = 1.5, b: float = 0.75,
+                 rare_term_ratio: float = 0.05):
+        self.k1 = k1
+        self.b = b
+        self.rare_term_ratio = rare_term_ratio
+        self._lock = threading.Lock()
+        self._docs: Dict[str, Tuple[Counter, int, Dict[str, Any]]] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        self._sorted_ids: Optional[List[str]] = None
+        self._conn = None
+
+        if sqlite_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(sqlite_path)), exist_ok=True)
+                self._conn = sqlite3.connect(sqlite_path, check_same_thread=False, timeout=30)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS lexical_chunks (
+                        chunk_id TEXT PRIMARY KEY,
+                        content TEXT NOT NULL,
+                        metadata TEXT NOT NULL
+                    )
+                """)
+                self._conn.commit()
+                rows = self._conn.execute("SELECT chunk_id, content, metadata FROM lexical_chunks").fetchall()
+                for chunk_id, content, metadata in rows:
+                    self._index(chunk_id, content, json.loads(metadata))
+                if rows:
+                    logger.info(f"Loaded lexical index: {len(rows)} chunks from {sqlite_path}")
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Lexical index storage unavailable ({sqlite_path}): {e}")
+                self._conn = None
+
+    def _unindex(self, chunk_id: str):
+        terms, length, _ = self._docs.pop(chunk_id)
+        self._total_length -= length
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(chunk_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def _index(self, chunk_id: str, content: str, metadata: Dict[str, Any]):
+        if chunk_id in self._docs:
+            self._unindex(chunk_id)
+        else:
+            self._sorted_ids = None
+        terms = Counter(tokenize(content))
+        length = sum(terms.values())
+        self._docs[chunk_id] = (terms, length, metadata)
+        self._total_length += length
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[chunk_id] = frequency
+
+    def add(self, chunks: List[Dict[str, Any]]):
+        """Index (or re-index) chunks: [{'id', 'content', 'metadata'}]"""
+        if not chunks:
+            return
+        with self._lock:
+            for chunk in chunks:
+                self._index(chunk['id'], chunk['content'], chunk.get('metadata') or {})
+            if self._conn is not None:
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO lexical_chunks (chunk_id, content, metadata) VALUES (?, ?, ?)",
+                        [
+                            (chunk['id'], chunk['content'], json.dumps(chunk.get('metadata') or {}, ensure_ascii=False, default=str))
+                            for chunk in chunks
+                        ]
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Lexical index write failed: {e}")
+
+    def ids_with_prefix(self, prefix: str) -> set:
+        """Indexed chunk IDs that start with `prefix`"""
+        with self._lock:
+            if self._sorted_ids is None:
+                self._sorted_ids = sorted(self._docs)
+            ids = set()
+            for chunk_id in self._sorted_ids[bisect.bisect_left(self._sorted_ids, prefix):]:
+                if not chunk_id.startswith(prefix):
+                    break
+                ids.add(chunk_id)
+            return ids
+
+    def remove(self, chunk_ids: List[str]):
+        """Drop chunks from the index and its storage (unknown IDs are ignored)"""
+        with self._lock:
+            removed = [chunk_id for chunk_id in chunk_ids if chunk_id in self._docs]
+            if not removed:
+                return
+            for chunk_id in removed:
+                self._unindex(chunk_id)
+            self._sorted_ids = None
+            if self._conn is not None:
+                try:
+                    self._conn.executemany(
+                        "DELETE FROM lexical_chunks WHERE chunk_id = ?", [(chunk_id,) for chunk_id in removed]
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Lexical index delete failed: {e}")
+
+    def search(self, query: str, top_k: int, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Best BM25 matches: [{'id', 'score', 'metadata', 'rare_match'}]
+
+        'rare_match' is True when the chunk matched a rare query term
+        (see rare_term_ratio), not only common ones ("afrique", "secteur").
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            count = len(self._docs)
+            if not count or not terms:
+                return []
+            average_length = self._total_length / count
+            rare_limit = max(1, int(count * self.rare_term_ratio))
+            scores: Dict[str, float] = {}
+            rare: set = set()
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                if len(postings) <= rare_limit:
+                    rare.update(postings)
+                for chunk_id, frequency in postings.items():
+                    length = self._docs[chunk_id][1]
+                    norm = frequency + self.k1 * (1 - self.b + self.b * length / average_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * frequency * (self.k1 + 1) / norm
+
+            ranked = (
+                (score, chunk_id) for chunk_id, score in scores.items()
+                if not filters or matches_filters(self._docs[chunk_id][2], filters)
+            )
+            return [
+                {'id': chunk_id, 'score': score, 'metadata': self._docs[chunk_id][2], 'rare_match': chunk_id in rare}
+                for score, chunk_id in heapq.nlargest(top_k, ranked)
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'chunks': len(self._docs),
+                'terms': len(self._postings),
+                'persistent': self._conn is not None
+            }
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> Dict[str, float]:
+    """RRF score of each ID: sum over rankings of 1 / (k + rank)"""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + 1.0 / (k + rank)
+    return fused
+
+
+class CrossEncoderReranker:
+    """
+    Cross-encoder re-ranker (sentence-transformers), loaded on first use.
+    score() is blocking: run it in a worker thread.
+    """
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def score(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+                    self._model = CrossEncoder(self.model_name)
+                    logger.info(f"Loaded re-ranker: {self.model_name}")
+        return [float(score) for score in self._model.predict(pairs)]
+
+
+def create_reranker(name: Optional[str] = None) -> Optional[CrossEncoderReranker]:
+    """Re-ranker selected by RAG_RERANKER ("none" or "cross-encoder")"""
+    name = (name or settings.RAG_RERANKER).lower()
+    if name == "cross-encoder":
+        return CrossEncoderReranker(settings.RAG_RERANKER_MODEL)
+    if name != "none":
+        logger.warning(f"Unknown re-ranker: {name} - re-ranking disabled")
+    return None
@@ -2,247 +2,510 @@
 
 Module dédié au nettoyage robuste de JSON invalide
 Gère tous les cas problématiques de l'assistant OpenAI
+
+Le contenu est lu en une seule passe par un tokenizer regex : chaînes,
+commentaires, accolades/crochets et virgules sont reconnus au vol, ce qui
+permet d'isoler l'objet JSON le plus externe, de retirer les commentaires
+et les virgules en trop sans repasser sur le texte.
+
+Une réponse tronquée est réparée selon sa pile d'ouverture réelle, puis
+confrontée aux validation_rules du bloc : chaque champ refermé, retiré ou
+synthétisé est listé dans result["_repair"].
 """
 import re
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 
+# Un token par correspondance : chaîne (éventuellement tronquée), commentaire
+# ligne, commentaire bloc, suite de caractères sans intérêt structurel, ou
+# caractère isolé ({ } [ ] , /)
+_TOKEN_RE = re.compile(r'''
+      "[^"\\]*(?:\\.[^"\\]*)*"?
+    | //[^\n\r]*
+    | /\*.*?(?:\*/|\Z)
+    | [^"/{}\[\],]+
+    | .
+''', re.DOTALL | re.VERBOSE)
+
+# Bloc de code markdown ouvrant (```json ou ```)
+_FENCE_RE = re.compile(r'```(?:json)?')
+
+# Chaîne complète, tokens de la réparation, échappement coupé en fin de texte
+_STRING_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_REPAIR_TOKEN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\],:]|[^"{}\[\],:\s]+|\s+', re.DOTALL)
+# (un nombre impair de \ en fin de texte : un \\ complet est conservé)
+_BROKEN_ESCAPE_RE = re.compile(r'(?<!\\)((?:\\\\)*)\\(?:u[0-9a-fA-F]{0,3})?$')
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class JSONParseError(Exception):
+    """JSON introuvable ou illisible ; `content` est le texte tel que tenté"""
+
+    def __init__(self, message: str, content: str, position: Optional[int] = None):
+        super().__init__(message)
+        self.content = content
+        self.position = position
+
+
 class JSONCleaner:
     """
     Nettoie et répare les JSON invalides générés par l'IA
     """
-    
+
+    @staticmethod
+    def _find_start(content: str) -> int:
+        """Position du premier { (ou [) du JSON, après un éventuel bloc ```json"""
+        fence = _FENCE_RE.search(content)
+        offset = fence.end() if fence else 0
+        start = content.find('{', offset)
+        if start == -1:
+            start = content.find('[', offset)
+        if start == -1 and offset:
+            start = content.find('{')
+        return start
+
+    @staticmethod
+    def _scan(content: str, start: int = 0) -> Tuple[str, List[str], bool]:
+        """
+        Passe unique sur le contenu à partir de `start` :
+        - s'arrête à la fermeture de l'objet (ou tableau) le plus externe
+        - supprime les commentaires // et /* */ hors chaînes
+        - supprime les virgules doublées et celles placées avant } ou ]
+
+        Returns:
+            (JSON nettoyé, fermetures manquantes dans l'ordre d'ouverture,
+            True si le contenu s'arrête au milieu d'une chaîne)
+        """
+        out: List[str] = []
+        stack: List[str] = []
+        pending = None  # virgule (et espaces qui suivent) en attente de décision
+        length = len(content)
+
+        for match in _TOKEN_RE.finditer(content, start):
+            token = match.group()
+            char = token[0]
+
+            if char == '"':
+                if pending:
+                    out.extend(pending)
+                    pending = None
+                out.append(token)
+                # Seule une chaîne en fin de contenu peut être tronquée
+                if match.end() >= length - 1 and not _STRING_RE.fullmatch(token):
+                    return ''.join(out), stack, True
+            elif char == '/' and len(token) > 1:
+                continue  # commentaire
+            elif char in '{[':
+                if pending:
+                    out.extend(pending)
+                    pending = None
+                stack.append(_CLOSERS[char])
+                out.append(token)
+            elif char in '}]':
+                pending = None  # virgule finale : supprimée
+                out.append(token)
+                if stack:
+                    stack.pop()
+                if not stack:
+                    break
+            elif char == ',':
+                if pending is None:
+                    pending = [token]
+                # sinon virgule doublée : ignorée
+            elif pending is not None:
+                if token.isspace():
+                    pending.append(token)
+                else:
+                    out.extend(pending)
+                    pending = None
+                    out.append(token)
+            else:
+                out.append(token)
+
+        return ''.join(out), stack, False
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # RÉPARATION STRUCTURELLE (réponse tronquée)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def _repair(json_str: str, open_string: bool) -> Tuple[str, List[str]]:
+        """
+        Termine un JSON tronqué (déjà nettoyé par _scan) dans l'ordre exact
+        de sa pile d'ouverture : chaîne coupée refermée, membre incomplet
+        (clé sans valeur, littéral coupé) retiré, puis } et ] ajoutés.
+
+        Returns:
+            (JSON réparé, description de chaque réparation avec son chemin)
+        """
+        repairs: List[str] = []
+        if open_string:
+            # Séquence d'échappement coupée (\ ou \u12) : inutilisable
+            json_str = _BROKEN_ESCAPE_RE.sub(r'\1', json_str) + '"'
+
+        # Pile réelle hors chaînes : une entrée par objet/tableau ouvert
+        levels: List[Dict[str, Any]] = []
+        length = len(json_str)
+        for match in _REPAIR_TOKEN_RE.finditer(json_str):
+            token = match.group()
+            char = token[0]
+            if char.isspace():
+                continue
+            level = levels[-1] if levels else None
+
+            if char in '{[':
+                if level is not None:
+                    level["state"] = "open"
+                levels.append({
+                    "object": char == '{',
+                    "state": "key" if char == '{' else "value",
+                    "key": None,
+                    "index": 0,
+                    "safe_end": match.end()
+                })
+            elif char in '}]':
+                levels.pop()
+                if levels:
+                    levels[-1]["state"] = "after"
+                    levels[-1]["safe_end"] = match.end()
+            elif level is None:
+                continue
+            elif char == ',':
+                level["state"] = "key" if level["object"] else "value"
+                if not level["object"]:
+                    level["index"] += 1
+            elif char == ':':
+                level["state"] = "value"
+            elif char == '"' and level["object"] and level["state"] == "key":
+                try:
+                    level["key"] = json.loads(token)
+                except json.JSONDecodeError:
+                    level["key"] = token.strip('"')
+                level["state"] = "colon"
+            elif match.end() == length and char != '"' and not _is_literal(token):
+                level["state"] = "partial"  # littéral coupé (tru, 12., -)
+            else:
+                level["state"] = "after"
+                level["safe_end"] = match.end()
+
+        if levels:
+            innermost = levels[-1]
+            path = _path(levels)
+            incomplete = innermost["state"] in ("colon", "partial") or (
+                innermost["object"] and innermost["state"] == "value"
+            )
+            if incomplete:
+                json_str = json_str[:innermost["safe_end"]]
+                repairs.append(f"{path}: membre tronqué supprimé")
+            elif open_string:
+                repairs.append(f"{path}: chaîne tronquée refermée")
+
+        closers = ''.join('}' if level["object"] else ']' for level in reversed(levels))
+        if closers:
+            json_str = json_str.rstrip() + closers
+            repairs.append(f"fermetures ajoutées: {closers}")
+        return json_str, repairs
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # VALIDATION (validation_rules des prompts)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def validate(result: Dict[str, Any], validation_rules: Optional[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """
+        Vérifie le résultat d'un bloc contre ses validation_rules et le
+        complète sur place :
+        - required_indices : indice absent → synthétisé (score None)
+        - score_range : score hors bornes → ramené dans l'intervalle
+
+        Returns:
+            {"synthesized": [chemins], "clamped": [chemins]} (listes vides si conforme)
+        """
+        report: Dict[str, List[str]] = {"synthesized": [], "clamped": []}
+        if not validation_rules or not isinstance(result, dict):
+            return report
+
+        required = validation_rules.get("required_indices") or []
+        path, indices = _find_indices(result, required)
+        if indices is None:
+            path, indices = "indices", result.setdefault("indices", {})
+
+        for name in required:
+            if not isinstance(indices.get(name), dict):
+                indices[name] = {
+                    "score": None,
+                    "interpretation": "Indice non fourni par l'assistant",
+                    "synthetique": True
+                }
+                report["synthesized"].append(f"{path}.{name}")
+
+        score_range = validation_rules.get("score_range")
+        if score_range:
+            low, high = score_range
+            for name, index in indices.items():
+                score = index.get("score") if isinstance(index, dict) else None
+                if isinstance(score, (int, float)) and not isinstance(score, bool) and not low <= score <= high:
+                    index["score"] = min(high, max(low, score))
+                    report["clamped"].append(f"{path}.{name}.score ({score} → {index['score']})")
+        return report
+
     @staticmethod
     def clean(json_str: str) -> str:
         """
         Nettoie un JSON potentiellement invalide
-        
+
         Args:
             json_str: Chaîne JSON à nettoyer
-            
+
         Returns:
             JSON nettoyé et valide
         """
-        logger.info("🧹 Début du nettoyage JSON approfondi...")
-        original_length = len(json_str)
-        
-        # 1. Supprimer les commentaires tout en préservant le contenu des chaînes
-        json_str = JSONCleaner._remove_comments_preserving_strings(json_str)
-        logger.info("   Commentaires supprimés")
-        
-        # 2. Nettoyer les virgules problématiques
-        # Virgules avant accolades fermantes
-        json_str = re.sub(r',\s*}', '}', json_str)
-        # Virgules avant crochets fermants
-        json_str = re.sub(r',\s*]', ']', json_str)
-        # Virgules doubles
-        json_str = re.sub(r',\s*,+', ',', json_str)
-        
-        logger.info(f"   Virgules nettoyées")
-        
-        # 3. Nettoyer les espaces et sauts de ligne
-        # Lignes vides multiples
-        json_str = re.sub(r'\n\s*\n+', '\n', json_str)
-        # Espaces multiples (mais pas dans les strings)
-        # On fait attention à ne pas toucher aux strings
-        
-        logger.info(f"   Espaces nettoyés")
-        
-        # 4. Réparer les structures incomplètes
-        # Compter les accolades et crochets
-        open_braces = json_str.count('{')
-        close_braces = json_str.count('}')
-        open_brackets = json_str.count('[')
-        close_brackets = json_str.count(']')
-        
-        if open_braces > close_braces:
-            missing = open_braces - close_braces
-            logger.warning(f"   ⚠️ {missing} accolades fermantes manquantes - ajout automatique")
-            json_str += '}' * missing
-        
-        if open_brackets > close_brackets:
-            missing = open_brackets - close_brackets
-            logger.warning(f"   ⚠️ {missing} crochets fermants manquants - ajout automatique")
-            json_str += ']' * missing
-        
-        # 5. Nettoyer les trailing commas qui pourraient rester
-        json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
-        
-        # 6. Nettoyer les espaces en début/fin
-        json_str = json_str.strip()
-        
-        cleaned_length = len(json_str)
-        reduction = original_length - cleaned_length
-        logger.info(f"✅ Nettoyage terminé: {original_length} → {cleaned_length} caractères (-{reduction})")
-        
-        return json_str
-    
+        start = JSONCleaner._find_start(json_str)
+        if start == -1:
+            return json_str.strip()
+
+        cleaned, missing, open_string = JSONCleaner._scan(json_str, start)
+        if missing:
+            cleaned, repairs = JSONCleaner._repair(cleaned, open_string)
+            logger.warning(f"   ⚠️ JSON tronqué réparé: {repairs}")
+        return cleaned.strip()
+
     @staticmethod
-    def extract_and_parse(content: str) -> Dict[str, Any]:
+    def extract_and_parse(content: str, validation_rules: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Extrait le JSON du contenu et le parse
-        
+
+        Fonction CPU pure : depuis le code asynchrone, l'appeler via
+        asyncio.to_thread pour ne pas bloquer la boucle d'événements.
+
         Args:
             content: Contenu brut (peut contenir du texte avant/après le JSON)
-            
+            validation_rules: règles du bloc (required_indices, score_range) ;
+                les corrections sont décrites dans result["_repair"]
+
         Returns:
             JSON parsé en dictionnaire
-            
+
         Raises:
-            Exception: Si le parsing échoue
+            JSONParseError: Si le parsing échoue
         """
         try:
             logger.info(f"📦 Extraction du JSON depuis {len(content)} caractères...")
-            
-            # Essayer de trouver le JSON dans différents formats
-            json_str = None
-            
-            # Pattern 1: ```json ... ```
-            match = re.search(r'```json\s*(.*?)\s*```', content, re.DOTALL)
-            if match:
-                json_str = match.group(1).strip()
-                logger.info("   JSON trouvé dans bloc ```json```")
-            else:
-                # Pattern 2: ``` ... ```
-                match = re.search(r'```\s*(.*?)\s*```', content, re.DOTALL)
-                if match:
-                    json_str = match.group(1).strip()
-                    logger.info("   JSON trouvé dans bloc ```")
-                else:
-                    # Pattern 3: Premier { jusqu'au dernier }
-                    start = content.find('{')
-                    end = content.rfind('}')
-                    if start != -1 and end != -1 and end > start:
-                        json_str = content[start:end+1]
-                        logger.info(f"   JSON trouvé directement (pos {start} à {end})")
-                    else:
-                        raise Exception("Aucun JSON trouvé dans le contenu")
-            
-            # Nettoyer le JSON
-            json_str = JSONCleaner.clean(json_str)
-            
-            # Tenter de parser
+
+            start = JSONCleaner._find_start(content)
+            if start == -1:
+                raise JSONParseError("Aucun JSON trouvé dans le contenu", content)
+
+            json_str, missing, open_string = JSONCleaner._scan(content, start)
+            repairs: List[str] = []
+            if missing:
+                json_str, repairs = JSONCleaner._repair(json_str, open_string)
+                logger.warning(f"   ⚠️ JSON tronqué réparé: {repairs}")
+
             try:
                 result = json.loads(json_str)
-                logger.info("✅ JSON parsé avec succès du premier coup")
-                return result
+                logger.info(f"✅ JSON parsé ({len(content)} → {len(json_str)} caractères)")
             except json.JSONDecodeError as e:
-                logger.warning(f"⚠️ Échec parsing initial: {e}")
-                
-                # Sauvegarder pour debug
-                try:
-                    with open("failed_json_debug.txt", "w", encoding="utf-8") as f:
-                        f.write(json_str)
-                    logger.info("💾 JSON problématique sauvegardé dans failed_json_debug.txt")
-                except:
-                    pass
-                
-                # Afficher le contexte de l'erreur
-                if hasattr(e, 'pos') and e.pos:
-                    start = max(0, e.pos - 150)
-                    end = min(len(json_str), e.pos + 150)
-                    context = json_str[start:end]
-                    logger.error(f"❌ Contexte de l'erreur (pos {e.pos}):")
-                    logger.error(f"   {context}")
-                
-                # Dernière tentative: nettoyage plus agressif
-                logger.info("🔧 Tentative de nettoyage agressif...")
-                
-                # Supprimer TOUT ce qui ressemble à un commentaire
-                json_str_aggressive = re.sub(r'//.*', '', json_str)
-                json_str_aggressive = re.sub(r'/\*.*?\*/', '', json_str_aggressive, flags=re.DOTALL)
-                
-                # Supprimer les lignes qui ne contiennent que des espaces
-                lines = json_str_aggressive.split('\n')
-                lines = [line for line in lines if line.strip()]
-                json_str_aggressive = '\n'.join(lines)
-                
-                # Re-nettoyer les virgules
-                json_str_aggressive = re.sub(r',\s*([}\]])', r'\1', json_str_aggressive)
-                json_str_aggressive = re.sub(r',\s*,+', ',', json_str_aggressive)
-                
-                try:
-                    result = json.loads(json_str_aggressive)
-                    logger.info("✅ JSON parsé après nettoyage agressif")
-                    return result
-                except json.JSONDecodeError as e2:
-                    logger.error(f"❌ Échec même après nettoyage agressif: {e2}")
-                    
-                    # Sauvegarder la version agressive aussi
-                    try:
-                        with open("failed_json_aggressive_debug.txt", "w", encoding="utf-8") as f:
-                            f.write(json_str_aggressive)
-                        logger.info("💾 Version agressive sauvegardée dans failed_json_aggressive_debug.txt")
-                    except:
-                        pass
-                    
-                    raise Exception(f"Impossible de parser le JSON: {str(e2)}")
-        
+                # Le texte tenté voyage avec l'exception (capture : parse_failures)
+                raise JSONParseError(f"Impossible de parser le JSON: {str(e)}", json_str, e.pos)
+
+            checks = JSONCleaner.validate(result, validation_rules)
+            if repairs or checks["synthesized"] or checks["clamped"]:
+                result["_repair"] = {"structural": repairs, **checks}
+                logger.warning(
+                    f"   🩹 Résultat réparé: {len(repairs)} corrections structurelles, "
+                    f"{len(checks['synthesized'])} indices synthétisés, {len(checks['clamped'])} scores bornés"
+                )
+            return result
+
         except Exception as e:
             logger.error(f"❌ Erreur lors de l'extraction/parsing: {str(e)}")
             raise
 
-    @staticmethod
-    def _remove_comments_preserving_strings(content: str) -> str:
-        """
-        Supprime les commentaires // et /* */ sans toucher aux chaînes de caractères
-        (pour éviter de casser les URLs de type https://, etc.)
-        """
-        result = []
-        i = 0
-        length = len(content)
-        in_string = False
-        string_delim = ''
 
-        while i < length:
-            char = content[i]
-
-            if in_string:
-                result.append(char)
-                if char == '\\':
-                    # Conserver le caractère d'échappement et le suivant
-                    if i + 1 < length:
-                        result.append(content[i + 1])
-                        i += 1
-                elif char == string_delim:
-                    in_string = False
-                i += 1
-                continue
+def _is_literal(token: str) -> bool:
+    """Nombre, true, false ou null complet"""
+    try:
+        json.loads(token)
+        return True
+    except json.JSONDecodeError:
+        return False
 
-            # Début de chaîne
-            if char in ('"', "'"):
-                in_string = True
-                string_delim = char
-                result.append(char)
-                i += 1
-                continue
 
-            # Commentaire sur une ligne
-            if char == '/' and i + 1 < length and content[i + 1] == '/':
-                i += 2
-                while i < length and content[i] not in ('\n', '\r'):
-                    i += 1
-                continue
+def _path(levels: List[Dict[str, Any]]) -> str:
+    """Chemin lisible du membre en cours (ex: indicateurs.politique[3].commentaire)"""
+    parts = []
+    for level in levels:
+        if level["object"]:
+            if level["key"] is not None:
+                parts.append(f".{level['key']}" if parts else level["key"])
+        else:
+            parts.append(f"[{level['index']}]")
+    return ''.join(parts) or "$"
+
+
+def _find_indices(result: Dict[str, Any], required: List[str], depth: int = 3) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Conteneur des indices : result["indices"] (blocs 1 à 6) ou, à défaut,
+    le premier objet imbriqué qui contient un des indices requis
+    (ex: consolidation_indices.indices_synthese_bloc7).
+    """
+    if isinstance(result.get("indices"), dict):
+        return "indices", result["indices"]
+    queue = [("", result)]
+    for _ in range(depth):
+        next_queue = []
+        for prefix, node in queue:
+            for key, value in node.items():
+                if not isinstance(value, dict):
+                    continue
+                path = f"{prefix}.{key}" if prefix else key
+                if any(name in value for name in required):
+                    return path, value
+                next_queue.append((path, value))
+        queue = next_queue
+    return "", None
+
+
+_STRUCTURE_RE = re.compile(r'["{}\[\],:/]')
+_STRING_END_RE = re.compile(r'["\\]')
+
+
+class IncrementalJSONParser:
+    """
+    Parse une réponse JSON au fil du streaming : chaque clé de premier
+    niveau de l'objet racine ("indices", "synthese_strategique", ...) est
+    rendue dès que sa valeur est fermée, sans attendre la fin du run.
+
+        parser = IncrementalJSONParser()
+        for delta in stream:
+            for key, value in parser.feed(delta).items():
+                ...
+
+    Le texte n'est parcouru qu'une fois : l'état (chaîne, profondeur,
+    clé courante) est conservé entre deux deltas et un token coupé en
+    deux (échappement, commentaire) est repris au delta suivant.
+    """
 
-            # Commentaire multi-ligne
-            if char == '/' and i + 1 < length and content[i + 1] == '*':
-                i += 2
-                while i + 1 < length and not (content[i] == '*' and content[i + 1] == '/'):
-                    i += 1
-                i += 2
+    def __init__(self):
+        self.sections: Dict[str, Any] = {}
+        self.done = False
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._expect = "key"  # key → colon → value (profondeur 1 uniquement)
+        self._key_start = -1
+        self._key = None
+        self._value_start = -1
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        """Ajoute un delta, retourne les sections complétées par ce delta"""
+        completed: Dict[str, Any] = {}
+        if self.done or not chunk:
+            return completed
+        self._text += chunk
+        text = self._text
+        length = len(text)
+        i = self._pos
+
+        if self._depth == 0:
+            start = JSONCleaner._find_start(text)
+            if start == -1 or text[start] != '{':
+                return completed
+            self._depth = 1
+            i = start + 1
+
+        while i < length:
+            if self._in_string:
+                match = _STRING_END_RE.search(text, i)
+                if match is None:
+                    i = length
+                    break
+                index = match.start()
+                if text[index] == '\\':
+                    if index + 1 >= length:
+                        i = index  # échappement coupé : attendre la suite
+                        break
+                    i = index + 2
+                    continue
+                self._in_string = False
+                i = index + 1
+                if self._key_start >= 0:
+                    try:
+                        self._key = json.loads(text[self._key_start:i])
+                    except json.JSONDecodeError:
+                        self._key = None
+                    self._key_start = -1
+                    self._expect = "colon"
                 continue
 
-            result.append(char)
-            i += 1
+            match = _STRUCTURE_RE.search(text, i)
+            if match is None:
+                i = length
+                break
+            index = match.start()
+            char = text[index]
+            i = index + 1
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._key_start = index
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete(text[self._value_start:index], completed)
+                    self.done = True
+                    break
+            elif char == ':':
+                if self._depth == 1 and self._expect == "colon":
+                    self._expect = "value"
+                    self._value_start = i
+            elif char == ',':
+                if self._depth == 1:
+                    self._complete(text[self._value_start:index], completed)
+            elif char == '/':
+                if index + 1 >= length:
+                    i = index  # commentaire éventuel coupé : attendre la suite
+                    break
+                if text[index + 1] == '/':
+                    end = text.find('\n', index)
+                elif text[index + 1] == '*':
+                    end = text.find('*/', index + 2)
+                    end = end + 2 if end != -1 else -1
+                else:
+                    continue
+                if end == -1:
+                    i = index
+                    break
+                i = end
+
+        self._pos = i
+        return completed
 
-        return ''.join(result)
+    def _complete(self, value_text: str, completed: Dict[str, Any]):
+        """Parse la valeur de la clé courante et l'ajoute aux sections"""
+        if self._expect == "value" and self._key is not None:
+            cleaned, missing, _ = JSONCleaner._scan(value_text)
+            if not missing and cleaned.strip():
+                try:
+                    value = json.loads(cleaned)
+                except json.JSONDecodeError as e:
+                    logger.debug(f"Section {self._key} illisible en streaming: {e}")
+                else:
+                    self.sections[self._key] = value
+                    completed[self._key] = value
+        self._expect = "key"
+        self._key = None
 
 
 # Instance globale
 json_cleaner = JSONCleaner()
-
-
@@ -6,7 +6,7 @@
 
 Architecture :
 - 7 Assistants OpenAI spécialisés (un par bloc)
-- Exécution parallèle des blocs indépendants (BLOC1, BLOC3, BLOC4)
+- Ordonnancement DAG : chaque bloc démarre dès que ses dépendances sont prêtes
 - Chaînage des blocs dépendants (BLOC2→BLOC5→BLOC6→BLOC7)
 - RAG intégré via File Search d'OpenAI
 
@@ -16,15 +16,26 @@ Version: 2.0
 
 import os
 import json
+import time
+import inspect
 import logging
 import asyncio
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Callable
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, BadRequestError, RateLimitError
+from openai.types.beta.threads import Run
 from app.core.config import settings
-from app.services.json_cleaner import json_cleaner
+from app.services.json_cleaner import json_cleaner, IncrementalJSONParser, JSONParseError
+from app.services.parse_failures import parse_failures
+from app.services.bloc_scheduler import bloc_scheduler
+from app.services.bloc_cache import bloc_cache, bloc_cache_key
+from app.services.rate_limiter import rate_limiter, estimate_tokens, retry_after_seconds, PRIORITY_NORMAL
+from app.services.resilience import (
+    RetryPolicy, CircuitBreaker, LatencyTracker, TransientError, BlocParseError, DeadlineExceeded
+)
+from app.config.prompts import ALL_PROMPTS
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +75,16 @@ BLOC_DEPENDENCIES = {
     "BLOC7": ["BLOC1", "BLOC2", "BLOC3", "BLOC4", "BLOC5", "BLOC6"],  # Tous
 }
 
+# Progression d'un bloc : (bloc_id, {"chars", "estimated_tokens", "partial_text", "partial_result", "done", ...})
+# "completion_tokens" (usage réel du run) n'est présent qu'à la fin du run
+ProgressCallback = Callable[[str, Dict[str, Any]], Any]
+
+# Threads créés pour un bloc : (bloc_id, thread_id)
+ThreadCallback = Callable[[str, str], Any]
+
+# Intervalle minimal entre deux notifications de progression en streaming
+STREAM_PROGRESS_INTERVAL = 1.0
+
 
 class OpenAIAssistantService:
     """
@@ -73,23 +94,64 @@ class OpenAIAssistantService:
     def __init__(self):
         self.api_key = settings.OPENAI_API_KEY
         self.assistant_ids = ASSISTANT_IDS
+        self.retry_policy = RetryPolicy(
+            max_attempts=settings.BLOC_RETRY_MAX_ATTEMPTS,
+            base_delay=settings.BLOC_RETRY_BASE_DELAY,
+            max_delay=settings.BLOC_RETRY_MAX_DELAY
+        )
+        # Budget de temps par bloc, dérivé du p95 des exécutions (réussies ou hors budget)
+        self.latency = LatencyTracker(
+            default_budget=settings.BLOC_BUDGET_DEFAULT_SECONDS,
+            min_budget=settings.BLOC_BUDGET_MIN_SECONDS,
+            max_budget=settings.BLOC_BUDGET_MAX_SECONDS,
+            multiplier=settings.BLOC_BUDGET_P95_MULTIPLIER
+        )
+        # Sortie structurée par assistant : "json_schema", "json_object" ou "none"
+        # (déterminée au premier run d'après le modèle, rétrogradée si refusée)
+        self.response_formats: Dict[str, str] = {}
+        # Un disjoncteur par assistant (un assistant en panne n'affecte pas les autres)
+        self.breakers: Dict[str, CircuitBreaker] = {
+            bloc_id: CircuitBreaker(
+                bloc_id,
+                failure_threshold=settings.ASSISTANT_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=settings.ASSISTANT_BREAKER_RESET_SECONDS
+            )
+            for bloc_id in ASSISTANT_IDS
+        }
         
         if not self.api_key:
             logger.warning("⚠️ OpenAI API key not configured")
             self.client = None
+            self.http_client = None
         else:
-            import httpx
+            # Pool de connexions partagé par tous les blocs et toutes les sessions :
+            # les appels HTTP ne bloquent plus la boucle asyncio du worker
+            self.http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.OPENAI_TIMEOUT_SECONDS, connect=30.0),
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS
+                )
+            )
             # Configuration pour utiliser l'API v2 des Assistants
-            self.client = OpenAI(
+            self.client = AsyncOpenAI(
                 api_key=self.api_key,
-                timeout=httpx.Timeout(900.0, connect=30.0),
+                timeout=httpx.Timeout(settings.OPENAI_TIMEOUT_SECONDS, connect=30.0),
+                http_client=self.http_client,
                 default_headers={
                     "OpenAI-Beta": "assistants=v2"
                 }
             )
-            logger.info("✅ OpenAI Assistant Service V2 initialized (API v2)")
+            logger.info("✅ OpenAI Assistant Service V2 initialized (API v2, client async)")
             logger.info(f"   Assistants configurés: {list(self.assistant_ids.keys())}")
 
+    async def aclose(self):
+        """
+        Ferme le pool de connexions HTTP partagé (arrêt de l'application).
+        """
+        if self.client:
+            await self.client.close()
+
     # ═══════════════════════════════════════════════════════════════════════════
     # MÉTHODE PRINCIPALE : ANALYSE COMPLÈTE (7 BLOCS)
     # ═══════════════════════════════════════════════════════════════════════════
@@ -98,87 +160,49 @@ class OpenAIAssistantService:
         """
         Exécute l'analyse complète sur les 7 blocs avec orchestration intelligente.
         
-        Stratégie d'exécution :
-        - Phase 1 : BLOC1 (seul, requis par tous)
-        - Phase 2 : BLOC2, BLOC3, BLOC4 en parallèle
-        - Phase 3 : BLOC5 (dépend de BLOC1 + BLOC2)
-        - Phase 4 : BLOC6 (dépend de BLOC1 + BLOC2 + BLOC5)
-        - Phase 5 : BLOC7 (consolidation finale)
+        Stratégie d'exécution (ordonnanceur DAG sur BLOC_DEPENDENCIES) :
+        - BLOC1 seul (requis par tous)
+        - BLOC2, BLOC3, BLOC4 dès que BLOC1 est prêt
+        - BLOC5 dès que BLOC1 + BLOC2 sont prêts
+        - BLOC6 dès que BLOC5 est prêt
+        - BLOC7 (consolidation finale)
+        
+        Résultats partiels : un bloc en échec (après retries) n'interrompt
+        pas l'analyse, ses dépendants s'exécutent avec le contexte disponible.
         """
         if not self.client:
             raise Exception("OpenAI client not initialized - check API key")
         
         start_time = datetime.now()
-        results = {}
-        errors = {}
         
         logger.info("═" * 60)
         logger.info("🚀 DÉMARRAGE ANALYSE COMPLÈTE - 7 BLOCS")
         logger.info("═" * 60)
         
+        thread_ids: Dict[str, List[str]] = {}
+        
+        async def run_bloc(bloc_id: str, context: Dict[str, Any]) -> Dict[str, Any]:
+            result = await self._run_bloc(
+                bloc_id, questionnaire_data, context,
+                on_thread=lambda b, t: thread_ids.setdefault(b, []).append(t)
+            )
+            logger.info(f"   ✅ {bloc_id} terminé")
+            return result
+        
         try:
-            # ─────────────────────────────────────────────────────────────────
-            # PHASE 1 : BLOC1 (PESTEL+) - Fondation pour tous les autres
-            # ─────────────────────────────────────────────────────────────────
-            logger.info("\n📊 PHASE 1 : Analyse PESTEL+ (BLOC1)")
-            results["BLOC1"] = await self._run_bloc("BLOC1", questionnaire_data, {})
-            logger.info(f"   ✅ BLOC1 terminé")
-            
-            # ─────────────────────────────────────────────────────────────────
-            # PHASE 2 : BLOC2, BLOC3, BLOC4 en PARALLÈLE
-            # ─────────────────────────────────────────────────────────────────
-            logger.info("\n📊 PHASE 2 : Blocs 2, 3, 4 en parallèle")
-            
-            context_phase2 = {"BLOC1": results["BLOC1"]}
-            
-            bloc2_task = self._run_bloc("BLOC2", questionnaire_data, context_phase2)
-            bloc3_task = self._run_bloc("BLOC3", questionnaire_data, context_phase2)
-            bloc4_task = self._run_bloc("BLOC4", questionnaire_data, context_phase2)
-            
-            phase2_results = await asyncio.gather(
-                bloc2_task, bloc3_task, bloc4_task,
-                return_exceptions=True
+            report = await bloc_scheduler.run(
+                run_bloc,
+                bloc_ids=list(BLOC_DEPENDENCIES.keys())
             )
             
-            # Traiter les résultats
-            for i, bloc_id in enumerate(["BLOC2", "BLOC3", "BLOC4"]):
-                if isinstance(phase2_results[i], Exception):
-                    logger.error(f"   ❌ {bloc_id} échoué: {str(phase2_results[i])}")
-                    errors[bloc_id] = str(phase2_results[i])
-                    results[bloc_id] = {"error": str(phase2_results[i])}
-                else:
-                    results[bloc_id] = phase2_results[i]
-                    logger.info(f"   ✅ {bloc_id} terminé")
-            
-            # ─────────────────────────────────────────────────────────────────
-            # PHASE 3 : BLOC5 (ODD) - Dépend de BLOC1 + BLOC2
-            # ─────────────────────────────────────────────────────────────────
-            logger.info("\n📊 PHASE 3 : Modèles Durables & ODD (BLOC5)")
-            context_phase3 = {
-                "BLOC1": results["BLOC1"],
-                "BLOC2": results["BLOC2"]
-            }
-            results["BLOC5"] = await self._run_bloc("BLOC5", questionnaire_data, context_phase3)
-            logger.info(f"   ✅ BLOC5 terminé")
-            
-            # ─────────────────────────────────────────────────────────────────
-            # PHASE 4 : BLOC6 (Réglementaire) - Dépend de BLOC1 + BLOC2 + BLOC5
-            # ─────────────────────────────────────────────────────────────────
-            logger.info("\n📊 PHASE 4 : Cadre Réglementaire (BLOC6)")
-            context_phase4 = {
-                "BLOC1": results["BLOC1"],
-                "BLOC2": results["BLOC2"],
-                "BLOC5": results["BLOC5"]
-            }
-            results["BLOC6"] = await self._run_bloc("BLOC6", questionnaire_data, context_phase4)
-            logger.info(f"   ✅ BLOC6 terminé")
-            
-            # ─────────────────────────────────────────────────────────────────
-            # PHASE 5 : BLOC7 (Synthèse) - Consolide tout
-            # ─────────────────────────────────────────────────────────────────
-            logger.info("\n📊 PHASE 5 : Synthèse Stratégique (BLOC7)")
-            results["BLOC7"] = await self._run_bloc("BLOC7", questionnaire_data, results)
-            logger.info(f"   ✅ BLOC7 terminé")
+            results = {}
+            errors = report["errors"]
+            for bloc_id in BLOC_DEPENDENCIES:
+                if bloc_id in errors:
+                    logger.error(f"   ❌ {bloc_id} échoué: {errors[bloc_id]}")
+                    results[bloc_id] = {"error": errors[bloc_id]}
+                elif bloc_id in report["results"]:
+                    results[bloc_id] = report["results"][bloc_id]
             
             # ─────────────────────────────────────────────────────────────────
             # CONSOLIDATION FINALE
@@ -192,12 +216,17 @@ class OpenAIAssistantService:
             
             # Construire la réponse finale
             final_result = {
-                "success": True,
+                "success": len(errors) < len(BLOC_DEPENDENCIES),
+                "partial": bool(errors),
                 "metadata": {
                     "generated_at": end_time.isoformat(),
                     "duration_seconds": duration,
                     "blocs_executed": list(results.keys()),
                     "blocs_failed": list(errors.keys()) if errors else [],
+                    "timings": report["timings"],
+                    "critical_path": report["critical_path"],
+                    "critical_path_seconds": report["critical_path_seconds"],
+                    "thread_ids": thread_ids,
                     "questionnaire": {
                         "pays": questionnaire_data.get("paysInstallation", ""),
                         "secteur": questionnaire_data.get("secteur", ""),
@@ -222,87 +251,340 @@ class OpenAIAssistantService:
         self, 
         bloc_id: str, 
         questionnaire_data: Dict[str, Any],
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        on_progress: Optional[ProgressCallback] = None,
+        priority: int = PRIORITY_NORMAL,
+        on_thread: Optional[ThreadCallback] = None,
+        deadline: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Exécute un bloc spécifique via son assistant dédié.
+        
+        En mode streaming, le bloc se termine dès l'événement de fin du run
+        et la progression (texte partiel, tokens) est transmise à on_progress.
+        Sinon, repli sur un polling à backoff exponentiel.
+        
+        Un message identique pour le même assistant et la même version de
+        prompt est servi depuis le cache des résultats, sans nouveau run.
+        
+        Le run occupe une place "openai_runs" pendant toute sa durée et ne
+        compte qu'une requête pour le budget "openai" (partagé avec le chat) ;
+        priority ordonne l'attente (chat > BLOC1 > arrière-plan).
+        
+        Les échecs transitoires sont relancés (retry_policy) et le disjoncteur
+        de l'assistant fait échouer immédiatement les appels s'il est en panne.
+        
+        on_thread(bloc_id, thread_id) reçoit chaque thread créé (une tentative
+        = un thread) pour permettre leur suppression via delete_threads.
+        
+        deadline (time.monotonic()) : échéance de la session, aucun run ne
+        la dépasse.
         """
         assistant_id = self.assistant_ids.get(bloc_id)
         if not assistant_id:
             raise ValueError(f"Assistant ID non trouvé pour {bloc_id}")
         
         bloc_name = BLOC_NAMES.get(bloc_id, bloc_id)
+        
+        # 1. Construire le message utilisateur
+        user_message = self._build_user_message(bloc_id, questionnaire_data, context)
+        
+        # 2. Consulter le cache des résultats
+        cache_key = None
+        if settings.BLOC_CACHE_ENABLED:
+            prompt_version = ALL_PROMPTS.get(bloc_id, {}).get("version", "")
+            cache_key = bloc_cache_key(assistant_id, prompt_version, user_message)
+            cached = await bloc_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"   ♻️ {bloc_id} ({bloc_name}) servi depuis le cache")
+                cached.setdefault("_metadata", {})["cache"] = {"hit": True, "key": cache_key}
+                await self._emit_progress(on_progress, bloc_id, {"cached": True, "done": True})
+                return cached
+        
         logger.info(f"   🔄 Lancement {bloc_id} ({bloc_name})...")
+        breaker = self.breakers.setdefault(bloc_id, CircuitBreaker(bloc_id))
+        
+        async def attempt() -> Dict[str, Any]:
+            breaker.before_call()
+            try:
+                result = await self._execute_bloc(
+                    bloc_id, assistant_id, user_message, on_progress, priority, on_thread, deadline
+                )
+            except BlocParseError:
+                # L'assistant a répondu : il est disponible, seule la réponse est à refaire
+                breaker.record_success()
+                raise
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            return result
+        
+        async def on_retry(attempt_number: int, error: BaseException, wait: float):
+            await self._emit_progress(on_progress, bloc_id, {
+                "retry": attempt_number,
+                "retry_in_seconds": round(wait, 1),
+                "last_error": str(error)
+            })
         
         try:
-            # 1. Créer un thread
-            thread = self.client.beta.threads.create()
-            thread_id = thread.id
-            
-            # 2. Construire le message utilisateur
-            user_message = self._build_user_message(bloc_id, questionnaire_data, context)
-            
-            # 3. Envoyer le message
-            self.client.beta.threads.messages.create(
-                thread_id=thread_id,
-                role="user",
-                content=user_message
+            result = await self.retry_policy.run(attempt, label=bloc_id, on_retry=on_retry)
+        except Exception as e:
+            logger.error(f"   ❌ Erreur {bloc_id}: {str(e)}")
+            raise
+        
+        # 7. Alimenter le cache des résultats (sauf réponse tronquée réparée ou
+        #    indices synthétisés : une nouvelle requête doit retenter le run)
+        repair = result.get("_metadata", {}).get("repair") or {}
+        if repair.get("structural") or repair.get("synthesized"):
+            logger.info(f"   ♻️ {bloc_id} réparé, résultat non mis en cache")
+        elif cache_key:
+            await bloc_cache.set(cache_key, bloc_id, result)
+        
+        return result
+
+    async def _execute_bloc(
+        self,
+        bloc_id: str,
+        assistant_id: str,
+        user_message: str,
+        on_progress: Optional[ProgressCallback],
+        priority: int,
+        on_thread: Optional[ThreadCallback] = None,
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Une tentative d'exécution d'un bloc : thread + run, réponse, parsing.
+        Les échecs transitoires lèvent TransientError (relancés par _run_bloc).
+        
+        Le run est borné par bloc_budget() ; en cas de dépassement ou
+        d'annulation de la tâche, le run distant est annulé (runs.cancel).
+        
+        Un 429 met le budget "openai" en pause (Retry-After) pour tous les
+        appels, puis retry_policy relance la tentative qui attend son tour.
+        """
+        active: Dict[str, str] = {}
+        # Runs simultanés bornés par leur propre budget ; le budget "openai"
+        # compte le démarrage du run (requête + tokens estimés) sans garder de
+        # place pendant des minutes, pour ne pas bloquer le chat interactif
+        async with rate_limiter.limit("openai_runs", priority=priority):
+            permit = await rate_limiter.admit(
+                "openai",
+                tokens=estimate_tokens(user_message) + settings.ASSISTANT_RUN_TOKEN_ESTIMATE,
+                priority=priority
             )
+            own_budget = self.latency.budget(bloc_id)
+            budget = self.bloc_budget(bloc_id, deadline)
+            started = time.monotonic()
+            try:
+                run, content = await asyncio.wait_for(
+                    self._run_to_completion(bloc_id, assistant_id, user_message, on_progress, active),
+                    timeout=budget
+                )
+            except asyncio.TimeoutError:
+                await self._cancel_run(bloc_id, active)
+                # Run plus long que son budget : la durée écoulée (borne basse) entre
+                # dans le p95, sinon le budget n'apprendrait que des runs rapides.
+                # Un budget raccourci par l'échéance de la session n'apprend rien.
+                if budget >= own_budget:
+                    self.latency.record(bloc_id, time.monotonic() - started)
+                raise DeadlineExceeded(f"{bloc_id} : budget de {budget:.1f}s dépassé")
+            except RateLimitError as e:
+                rate_limiter.penalize(
+                    "openai", retry_after_seconds(e.response.headers, default=self.retry_policy.base_delay)
+                )
+                raise
+            except asyncio.CancelledError:
+                # Session annulée ou arrêtée : le run distant ne doit pas continuer à consommer
+                await asyncio.shield(self._cancel_run(bloc_id, active))
+                raise
+            finally:
+                # Enregistrer le thread (nettoyage ultérieur via delete_threads)
+                await self._notify_thread(on_thread, bloc_id, active.get("thread_id"))
             
-            # 4. Lancer le run
-            run = self.client.beta.threads.runs.create(
-                thread_id=thread_id,
-                assistant_id=assistant_id
+            self.latency.record(bloc_id, time.monotonic() - started)
+            permit.record_tokens(self._usage_dict(run).get("total_tokens"))
+        thread_id = active["thread_id"]
+        logger.info(f"   📥 Réponse {bloc_id}: {len(content)} caractères")
+        
+        # 6. Parser le JSON (hors boucle d'événements : 60-150 Ko par bloc)
+        #    Une réponse tronquée est réparée plutôt que régénérée
+        try:
+            result = await asyncio.to_thread(
+                json_cleaner.extract_and_parse,
+                content,
+                ALL_PROMPTS.get(bloc_id, {}).get("validation_rules")
             )
-            
-            # 5. Attendre la completion
-            run = await self._wait_for_completion(thread_id, run.id, bloc_id)
-            
-            if run.status != "completed":
-                error_msg = f"Run {bloc_id} failed: {run.status}"
-                if run.last_error:
-                    error_msg += f" - {run.last_error.message}"
-                raise Exception(error_msg)
-            
-            # 6. Récupérer la réponse
-            messages = self.client.beta.threads.messages.list(
-                thread_id=thread_id,
-                order="asc"
+        except JSONParseError as e:
+            parse_failures.record(bloc_id, e.content, str(e), e.position)
+            raise BlocParseError(f"Réponse {bloc_id} illisible: {e}") from e
+        except Exception as e:
+            raise BlocParseError(f"Réponse {bloc_id} illisible: {e}") from e
+        
+        if not isinstance(result, dict):
+            raise BlocParseError(f"Réponse {bloc_id} n'est pas un objet JSON")
+        
+        # Ajouter les métadonnées du bloc
+        result["_metadata"] = {
+            "bloc_id": bloc_id,
+            "bloc_name": BLOC_NAMES.get(bloc_id, bloc_id),
+            "thread_id": thread_id,
+            "run_id": run.id,
+            "usage": self._usage_dict(run),
+            "repair": result.pop("_repair", None),
+            "generated_at": datetime.now().isoformat()
+        }
+        return result
+
+    async def _run_to_completion(
+        self,
+        bloc_id: str,
+        assistant_id: str,
+        user_message: str,
+        on_progress: Optional[ProgressCallback],
+        active: Dict[str, str]
+    ) -> Tuple[Any, str]:
+        """
+        Crée le thread, exécute le run et retourne (run terminé, texte de la réponse).
+        `active` reçoit thread_id / run_id dès leur création (annulation du run).
+        """
+        # 3. Créer le thread avec son message et lancer le run en un seul appel
+        #    (streaming si disponible)
+        thread = {"messages": [{"role": "user", "content": user_message}]}
+        response_format = await self._response_format(bloc_id, assistant_id)
+        run = None
+        content = None
+        if settings.OPENAI_RUN_STREAMING:
+            run, content = await self._stream_run(
+                thread, assistant_id, bloc_id, on_progress, active, response_format
             )
-            
-            assistant_message = None
-            for msg in reversed(messages.data):
-                if msg.role == "assistant":
-                    assistant_message = msg
-                    break
-            
-            if not assistant_message or not assistant_message.content:
-                raise Exception(f"Pas de réponse de l'assistant {bloc_id}")
-            
-            content = assistant_message.content[0].text.value
-            logger.info(f"   📥 Réponse {bloc_id}: {len(content)} caractères")
-            
-            # 7. Parser le JSON
-            result = json_cleaner.extract_and_parse(content)
-            
-            if not isinstance(result, dict):
-                raise Exception(f"Réponse {bloc_id} n'est pas un objet JSON")
-            
-            # Ajouter les métadonnées du bloc
-            result["_metadata"] = {
-                "bloc_id": bloc_id,
-                "bloc_name": bloc_name,
-                "thread_id": thread_id,
-                "run_id": run.id,
-                "generated_at": datetime.now().isoformat()
+        
+        while run is None:
+            try:
+                run = await self.client.beta.threads.create_and_run(
+                    assistant_id=assistant_id,
+                    thread=thread,
+                    **({"response_format": response_format} if response_format else {})
+                )
+            except BadRequestError as e:
+                # Format de sortie refusé (modèle, outils) : niveau inférieur et nouvel essai
+                if not response_format or "response_format" not in str(e):
+                    raise
+                response_format = self._downgrade_response_format(bloc_id, assistant_id, e)
+                continue
+            active.update(thread_id=run.thread_id, run_id=run.id)
+        
+        # 4. Attendre la completion (polling si le streaming n'a pas abouti)
+        if run.status != "completed":
+            run = await self._wait_for_completion(active["thread_id"], run.id, bloc_id)
+        
+        if run.status != "completed":
+            raise self._run_error(bloc_id, run)
+        
+        # 5. Récupérer la réponse (déjà reçue en streaming le cas échéant)
+        if content is None:
+            content = await self._fetch_assistant_text(active["thread_id"], bloc_id, run.id)
+            await self._emit_progress(on_progress, bloc_id, {
+                "chars": len(content),
+                "partial_text": content,
+                **self._usage_dict(run),
+                "done": True
+            })
+        return run, content
+
+    async def _response_format(self, bloc_id: str, assistant_id: str) -> Optional[Dict[str, Any]]:
+        """
+        response_format du run : JSON Schema du bloc (ALL_PROMPTS[...]["output_schema"])
+        si le modèle de l'assistant le permet, sinon JSON simple.
+        """
+        if not settings.OPENAI_STRUCTURED_OUTPUTS:
+            return None
+        
+        mode = self.response_formats.get(assistant_id)
+        if mode is None:
+            mode = "json_object"
+            try:
+                assistant = await self.client.beta.assistants.retrieve(assistant_id)
+                model = assistant.model or ""
+                # gpt-4o-2024-05-13 précède les sorties structurées
+                if model != "gpt-4o-2024-05-13" and model.startswith(tuple(settings.OPENAI_JSON_SCHEMA_MODELS)):
+                    mode = "json_schema"
+            except Exception as e:
+                logger.warning(f"   ⚠️ Modèle de l'assistant {bloc_id} inconnu ({e}), sortie JSON simple")
+            self.response_formats[assistant_id] = mode
+            logger.info(f"   🧩 Sortie structurée {bloc_id}: {mode}")
+        
+        schema = ALL_PROMPTS.get(bloc_id, {}).get("output_schema")
+        if mode == "json_schema" and schema:
+            return {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": f"{bloc_id.lower()}_output",
+                    "schema": schema,
+                    # Non strict : les analyses libres ne respectent pas les contraintes
+                    # du mode strict (toutes les clés requises, aucune clé additionnelle)
+                    "strict": False
+                }
             }
-            
-            return result
-            
+        if mode in ("json_schema", "json_object"):
+            return {"type": "json_object"}
+        return None
+
+    def _downgrade_response_format(self, bloc_id: str, assistant_id: str, error: Exception) -> Optional[Dict[str, Any]]:
+        """Passe l'assistant au format de sortie inférieur après un refus de l'API"""
+        mode = self.response_formats.get(assistant_id, "json_schema")
+        mode = "json_object" if mode == "json_schema" else "none"
+        self.response_formats[assistant_id] = mode
+        logger.warning(f"   ⚠️ response_format refusé pour {bloc_id} ({error}), repli sur {mode}")
+        return {"type": "json_object"} if mode == "json_object" else None
+
+    def bloc_budget(self, bloc_id: str, deadline: Optional[float] = None) -> float:
+        """
+        Budget de temps d'un run : p95 historique du bloc (LatencyTracker),
+        raccourci si la session a une échéance plus proche.
+        """
+        budget = self.latency.budget(bloc_id)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"{bloc_id} : délai de la session dépassé")
+            budget = min(budget, remaining)
+        return budget
+
+    async def _cancel_run(self, bloc_id: str, active: Dict[str, str]):
+        """Annule le run distant (best effort : il peut être déjà terminé)"""
+        if not active.get("run_id"):
+            return
+        try:
+            await self.client.beta.threads.runs.cancel(
+                thread_id=active["thread_id"],
+                run_id=active["run_id"]
+            )
+            logger.info(f"   🛑 Run {bloc_id} ({active['run_id']}) annulé")
         except Exception as e:
-            logger.error(f"   ❌ Erreur {bloc_id}: {str(e)}")
-            raise
+            logger.warning(f"   ⚠️ Annulation du run {bloc_id} impossible: {e}")
 
+    @staticmethod
+    def _run_error(bloc_id: str, run: Any) -> Exception:
+        """
+        Exception correspondant à un run terminé sans succès.
+        Les runs expirés ou en erreur serveur / rate limit sont transitoires.
+        """
+        last_error = getattr(run, "last_error", None)
+        message = f"Run {bloc_id} {run.status}"
+        if last_error:
+            message += f" - {last_error.message}"
+        
+        code = getattr(last_error, "code", None)
+        if run.status in ("expired", "incomplete") or (
+            run.status == "failed" and code in ("server_error", "rate_limit_exceeded")
+        ):
+            return TransientError(message)
+        return Exception(message)
+    
     # ═══════════════════════════════════════════════════════════════════════════
     # CONSTRUCTION DU MESSAGE UTILISATEUR
     # ═══════════════════════════════════════════════════════════════════════════
@@ -329,7 +611,7 @@ class OpenAIAssistantService:
         # ODD
         odd_auto = questionnaire_data.get("oddAutomatiques", [])
         odd_manuels = questionnaire_data.get("oddManuels", [])
-        odd_declares = list(set(odd_auto + odd_manuels))
+        odd_declares = sorted(set(odd_auto + odd_manuels), key=lambda o: (len(str(o)), str(o)))
         
         vision = questionnaire_data.get("visionOrganisation", "Non spécifiée")
         mission = questionnaire_data.get("missionOrganisation", "Non spécifiée")
@@ -399,6 +681,203 @@ class OpenAIAssistantService:
         
         return message
 
+    # ═══════════════════════════════════════════════════════════════════════════
+    # STREAMING DES RUNS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    async def _stream_run(
+        self,
+        thread: Dict[str, Any],
+        assistant_id: str,
+        bloc_id: str,
+        on_progress: Optional[ProgressCallback] = None,
+        active: Optional[Dict[str, str]] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Any, Optional[str]]:
+        """
+        Crée le thread et lance le run en mode streaming (événements
+        Assistants v2), en un seul appel create_and_run.
+        
+        Les sections de premier niveau du JSON sont parsées au fil des
+        deltas et transmises dans la progression ("partial_result") dès
+        qu'elles sont fermées.
+        
+        Returns:
+            (run, contenu) : run final et texte complet de la réponse.
+            (run, None) si le flux s'est interrompu après la création du run
+            (le polling prend le relais), (None, None) si le streaming est
+            indisponible avant la création du run.
+        """
+        run = None
+        parts: List[str] = []
+        chars = 0
+        content = None
+        last_emit = 0.0
+        parser = IncrementalJSONParser()
+        
+        try:
+            stream = await self.client.beta.threads.create_and_run(
+                assistant_id=assistant_id,
+                thread=thread,
+                stream=True,
+                **({"response_format": response_format} if response_format else {})
+            )
+            
+            while stream is not None:
+                next_stream = None
+                async for event in stream:
+                    kind = getattr(event, "event", "")
+                    data = getattr(event, "data", None)
+                    
+                    # Les événements thread.run.step.* portent un RunStep, pas le run
+                    if isinstance(data, Run):
+                        run = data
+                        if active is not None:
+                            active.update(thread_id=data.thread_id, run_id=data.id)
+                    
+                    if kind == "thread.message.delta":
+                        new_sections = False
+                        for block in (data.delta.content or []):
+                            text = getattr(block, "text", None)
+                            if text is not None and text.value:
+                                parts.append(text.value)
+                                chars += len(text.value)
+                                if on_progress and parser.feed(text.value):
+                                    new_sections = True
+                        now = time.monotonic()
+                        # Une section terminée est publiée sans attendre l'intervalle
+                        if on_progress and (new_sections or now - last_emit >= STREAM_PROGRESS_INTERVAL):
+                            last_emit = now
+                            partial_text = "".join(parts)
+                            await self._emit_progress(on_progress, bloc_id, {
+                                "chars": chars,
+                                "estimated_tokens": estimate_tokens(partial_text),
+                                "partial_text": partial_text,
+                                "partial_result": dict(parser.sections),
+                                "done": False
+                            })
+                    
+                    elif kind == "thread.message.completed":
+                        if data.role == "assistant" and data.content:
+                            content = data.content[0].text.value
+                    
+                    elif kind == "thread.run.requires_action":
+                        next_stream = await self.client.beta.threads.runs.submit_tool_outputs(
+                            thread_id=data.thread_id,
+                            run_id=data.id,
+                            tool_outputs=self._default_tool_outputs(data),
+                            stream=True
+                        )
+                        break
+                    
+                    elif kind == "error":
+                        raise Exception(f"Erreur de streaming {bloc_id}: {data}")
+                
+                stream = next_stream
+            
+        except Exception as e:
+            if run is None:
+                logger.warning(f"   ⚠️ Streaming indisponible pour {bloc_id}, repli sur polling: {e}")
+                return None, None
+            logger.warning(f"   ⚠️ Flux {bloc_id} interrompu ({e}), repli sur polling du run {run.id}")
+            return run, None
+        
+        if run is None:
+            return None, None
+        
+        if content is None and parts:
+            content = "".join(parts)
+        
+        if run.status == "completed" and content is not None:
+            await self._emit_progress(on_progress, bloc_id, {
+                "chars": len(content),
+                "partial_text": content,
+                **self._usage_dict(run),
+                "done": True
+            })
+        
+        return run, content if run.status == "completed" else None
+
+    async def _fetch_assistant_text(self, thread_id: str, bloc_id: str, run_id: Optional[str] = None) -> str:
+        """
+        Récupère le texte de la dernière réponse de l'assistant
+        (un seul message demandé, le plus récent).
+        """
+        params = {"run_id": run_id} if run_id else {}
+        messages = await self.client.beta.threads.messages.list(
+            thread_id=thread_id,
+            order="desc",
+            limit=1,
+            **params
+        )
+        
+        assistant_message = messages.data[0] if messages.data else None
+        if assistant_message is not None and assistant_message.role != "assistant":
+            assistant_message = None
+        
+        if not assistant_message or not assistant_message.content:
+            raise Exception(f"Pas de réponse de l'assistant {bloc_id}")
+        
+        return assistant_message.content[0].text.value
+
+    @staticmethod
+    def _default_tool_outputs(run: Any) -> List[Dict[str, str]]:
+        """
+        Réponses neutres aux tool calls (file_search est géré côté OpenAI).
+        """
+        return [
+            {
+                "tool_call_id": tool_call.id,
+                "output": json.dumps({"status": "completed"})
+            }
+            for tool_call in run.required_action.submit_tool_outputs.tool_calls
+        ]
+
+    @staticmethod
+    def _usage_dict(run: Any) -> Dict[str, int]:
+        """
+        Extrait le nombre de tokens consommés par un run terminé.
+        """
+        usage = getattr(run, "usage", None)
+        if not usage:
+            return {}
+        return {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens
+        }
+
+    @staticmethod
+    async def _notify_thread(on_thread: Optional[ThreadCallback], bloc_id: str, thread_id: str):
+        """Transmet l'identifiant d'un thread créé (callback sync ou async)"""
+        if not on_thread or not thread_id:
+            return
+        try:
+            outcome = on_thread(bloc_id, thread_id)
+            if inspect.isawaitable(outcome):
+                await outcome
+        except Exception as e:
+            logger.warning(f"   ⚠️ Callback de thread {bloc_id} en erreur: {e}")
+
+    @staticmethod
+    async def _emit_progress(
+        on_progress: Optional[ProgressCallback],
+        bloc_id: str,
+        progress: Dict[str, Any]
+    ):
+        """
+        Transmet la progression d'un bloc (callback sync ou async).
+        Une erreur du callback ne doit jamais interrompre le run.
+        """
+        if not on_progress:
+            return
+        try:
+            outcome = on_progress(bloc_id, progress)
+            if inspect.isawaitable(outcome):
+                await outcome
+        except Exception as e:
+            logger.warning(f"   ⚠️ Callback de progression {bloc_id} en erreur: {e}")
+
     # ═══════════════════════════════════════════════════════════════════════════
     # POLLING ET ATTENTE
     # ═══════════════════════════════════════════════════════════════════════════
@@ -408,20 +887,21 @@ class OpenAIAssistantService:
         thread_id: str, 
         run_id: str, 
         bloc_id: str,
-        max_wait: int = 300
+        max_wait: Optional[float] = None
     ) -> Any:
         """
-        Attend la completion d'un run avec polling.
+        Attend la completion d'un run avec polling à backoff exponentiel :
+        intervalle court au début, allongé progressivement jusqu'au plafond.
+        
+        Sans max_wait, la durée est bornée par le budget du bloc (_execute_bloc).
         """
-        import time
         start_time = time.time()
-        poll_count = 0
+        interval = settings.OPENAI_POLL_INITIAL_INTERVAL
+        last_log = 0.0
         
         while True:
-            poll_count += 1
-            
             try:
-                run = self.client.beta.threads.runs.retrieve(
+                run = await self.client.beta.threads.runs.retrieve(
                     thread_id=thread_id,
                     run_id=run_id
                 )
@@ -435,38 +915,31 @@ class OpenAIAssistantService:
             elapsed = time.time() - start_time
             
             # Log toutes les 30 secondes
-            if poll_count % 15 == 0:
+            if elapsed - last_log >= 30:
+                last_log = elapsed
                 logger.info(f"   ⏳ {bloc_id}: {run.status} ({int(elapsed)}s)")
             
             if run.status == "completed":
                 return run
             
-            elif run.status == "failed":
-                raise Exception(f"{bloc_id} failed: {run.last_error.message if run.last_error else 'Unknown'}")
-            
-            elif run.status in ["cancelled", "expired"]:
-                raise Exception(f"{bloc_id} {run.status}")
+            elif run.status in ["failed", "cancelled", "expired", "incomplete"]:
+                raise self._run_error(bloc_id, run)
             
             elif run.status == "requires_action":
                 # Gérer les tool outputs pour file_search
                 if run.required_action and run.required_action.type == "submit_tool_outputs":
-                    tool_outputs = []
-                    for tool_call in run.required_action.submit_tool_outputs.tool_calls:
-                        tool_outputs.append({
-                            "tool_call_id": tool_call.id,
-                            "output": json.dumps({"status": "completed"})
-                        })
-                    
-                    run = self.client.beta.threads.runs.submit_tool_outputs(
+                    run = await self.client.beta.threads.runs.submit_tool_outputs(
                         thread_id=thread_id,
                         run_id=run_id,
-                        tool_outputs=tool_outputs
+                        tool_outputs=self._default_tool_outputs(run)
                     )
+                    interval = settings.OPENAI_POLL_INITIAL_INTERVAL
             
-            if elapsed > max_wait:
-                raise Exception(f"{bloc_id} timeout after {max_wait}s")
+            if max_wait is not None and elapsed > max_wait:
+                raise TransientError(f"{bloc_id} timeout after {max_wait}s")
             
-            await asyncio.sleep(2)
+            await asyncio.sleep(interval)
+            interval = min(interval * 1.5, settings.OPENAI_POLL_MAX_INTERVAL)
 
     # ═══════════════════════════════════════════════════════════════════════════
     # MÉTHODE POUR UN BLOC UNIQUE (API PUBLIQUE)
@@ -499,6 +972,34 @@ class OpenAIAssistantService:
             "result": result
         }
 
+    # ═══════════════════════════════════════════════════════════════════════════
+    # NETTOYAGE DES THREADS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    async def delete_threads(self, thread_ids: List[str], concurrency: int = 5) -> Dict[str, Any]:
+        """
+        Supprime des threads côté OpenAI (une fois les résultats stockés).
+        Les échecs sont journalisés sans interrompre les autres suppressions.
+        """
+        if not self.client or not thread_ids:
+            return {"deleted": 0, "failed": 0}
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def delete(thread_id: str) -> bool:
+            async with semaphore:
+                try:
+                    await self.client.beta.threads.delete(thread_id)
+                    return True
+                except Exception as e:
+                    logger.warning(f"   ⚠️ Suppression du thread {thread_id} échouée: {e}")
+                    return False
+        
+        outcomes = await asyncio.gather(*(delete(t) for t in dict.fromkeys(thread_ids)))
+        deleted = sum(outcomes)
+        logger.info(f"   🧹 {deleted}/{len(outcomes)} threads supprimés")
+        return {"deleted": deleted, "failed": len(outcomes) - deleted}
+
     # ═══════════════════════════════════════════════════════════════════════════
     # HEALTH CHECK
     # ═══════════════════════════════════════════════════════════════════════════
@@ -510,25 +1011,29 @@ class OpenAIAssistantService:
         if not self.client:
             return {"status": "error", "message": "OpenAI client not initialized"}
         
-        results = {}
-        all_healthy = True
-        
-        for bloc_id, assistant_id in self.assistant_ids.items():
+        async def check_assistant(assistant_id: str) -> Dict[str, Any]:
             try:
-                assistant = self.client.beta.assistants.retrieve(assistant_id)
-                results[bloc_id] = {
+                assistant = await self.client.beta.assistants.retrieve(assistant_id)
+                return {
                     "status": "healthy",
                     "name": assistant.name,
                     "model": assistant.model,
                     "tools": [t.type for t in assistant.tools] if assistant.tools else []
                 }
             except Exception as e:
-                all_healthy = False
-                results[bloc_id] = {
+                return {
                     "status": "error",
                     "message": str(e)
                 }
         
+        # Les 7 vérifications partent en parallèle sur le pool partagé
+        bloc_ids = list(self.assistant_ids.keys())
+        checks = await asyncio.gather(
+            *(check_assistant(self.assistant_ids[bloc_id]) for bloc_id in bloc_ids)
+        )
+        results = dict(zip(bloc_ids, checks))
+        all_healthy = all(check["status"] == "healthy" for check in checks)
+        
         return {
             "status": "healthy" if all_healthy else "degraded",
             "assistants": results
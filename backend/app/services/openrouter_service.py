@@ -7,6 +7,9 @@ import httpx
 import logging
 from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.services.rate_limiter import (
+    rate_limiter, estimate_tokens, retry_after_seconds, PRIORITY_BACKGROUND
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,53 @@ class OpenRouterService:
         self.api_key = settings.OPENROUTER_API_KEY
         self.base_url = "https://openrouter.ai/api/v1/chat/completions"
         self.model = "anthropic/claude-3.5-sonnet"  # Modèle puissant pour résumés
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Client HTTP partagé (connexions keep-alive réutilisées entre appels)"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                }
+            )
+        return self._client
+    
+    async def _post_completion(self, payload: Dict[str, Any], timeout: float) -> httpx.Response:
+        """
+        Envoie une requête chat/completions via le limiteur de débit partagé.
+        Un 429 met le budget "openrouter" en pause (Retry-After) puis
+        l'appel reprend sa place dans la file, au lieu d'échouer.
+        """
+        estimated = estimate_tokens(
+            *(m.get("content", "") for m in payload.get("messages", []))
+        ) + payload.get("max_tokens", 0)
+        
+        for attempt in range(settings.OPENROUTER_MAX_RETRIES + 1):
+            async with rate_limiter.limit(
+                "openrouter", payload.get("model"),
+                tokens=estimated, priority=PRIORITY_BACKGROUND
+            ) as permit:
+                response = await self._get_client().post(self.base_url, json=payload, timeout=timeout)
+                if response.status_code == 200:
+                    permit.record_tokens(response.json().get("usage", {}).get("total_tokens"))
+                    return response
+            
+            if response.status_code != 429 or attempt == settings.OPENROUTER_MAX_RETRIES:
+                return response
+            rate_limiter.penalize(
+                "openrouter",
+                retry_after_seconds(response.headers, default=2.0 ** (attempt + 1)),
+                model=payload.get("model")
+            )
+        return response
+    
+    async def close(self):
+        """Ferme le client HTTP partagé"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
         
     async def summarize_text(self, text: str, max_words: int = 200) -> str:
         """
@@ -34,34 +84,29 @@ TEXTE À RÉSUMER:
 
 RÉSUMÉ:"""
 
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    self.base_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ],
-                        "max_tokens": max_words * 2,
-                        "temperature": 0.3,
-                    }
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    summary = result["choices"][0]["message"]["content"]
-                    logger.info(f"✅ Texte résumé: {len(text)} -> {len(summary)} caractères")
-                    return summary.strip()
-                else:
-                    logger.error(f"Erreur OpenRouter: {response.status_code}")
-                    return text[:500] + "..."  # Fallback: tronquer
+            response = await self._post_completion(
+                {
+                    "model": self.model,
+                    "messages": [
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    "max_tokens": max_words * 2,
+                    "temperature": 0.3,
+                },
+                timeout=60.0
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                summary = result["choices"][0]["message"]["content"]
+                logger.info(f"✅ Texte résumé: {len(text)} -> {len(summary)} caractères")
+                return summary.strip()
+            else:
+                logger.error(f"Erreur OpenRouter: {response.status_code}")
+                return text[:500] + "..."  # Fallback: tronquer
                     
         except Exception as e:
             logger.error(f"Erreur lors du résumé: {str(e)}")
@@ -105,44 +150,39 @@ Réponds en JSON avec cette structure:
   "kpis": ["...", "..."]
 }}"""
 
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.post(
-                    self.base_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": context
-                            }
-                        ],
-                        "max_tokens": 3000,
-                        "temperature": 0.5,
-                    }
-                )
+            response = await self._post_completion(
+                {
+                    "model": self.model,
+                    "messages": [
+                        {
+                            "role": "user",
+                            "content": context
+                        }
+                    ],
+                    "max_tokens": 3000,
+                    "temperature": 0.5,
+                },
+                timeout=120.0
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                synthesis_text = result["choices"][0]["message"]["content"]
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    synthesis_text = result["choices"][0]["message"]["content"]
-                    
-                    # Parser le JSON
-                    import json
-                    # Extraire le JSON du texte (peut être entouré de ```json```)
-                    if "```json" in synthesis_text:
-                        synthesis_text = synthesis_text.split("```json")[1].split("```")[0]
-                    elif "```" in synthesis_text:
-                        synthesis_text = synthesis_text.split("```")[1].split("```")[0]
-                    
-                    synthesis = json.loads(synthesis_text.strip())
-                    logger.info("✅ Synthèse stratégique générée avec succès")
-                    return synthesis
-                else:
-                    logger.error(f"Erreur OpenRouter: {response.status_code}")
-                    return self._create_fallback_synthesis()
+                # Parser le JSON
+                import json
+                # Extraire le JSON du texte (peut être entouré de ```json```)
+                if "```json" in synthesis_text:
+                    synthesis_text = synthesis_text.split("```json")[1].split("```")[0]
+                elif "```" in synthesis_text:
+                    synthesis_text = synthesis_text.split("```")[1].split("```")[0]
+                
+                synthesis = json.loads(synthesis_text.strip())
+                logger.info("✅ Synthèse stratégique générée avec succès")
+                return synthesis
+            else:
+                logger.error(f"Erreur OpenRouter: {response.status_code}")
+                return self._create_fallback_synthesis()
                     
         except Exception as e:
             logger.error(f"Erreur lors de la génération de synthèse: {str(e)}")
@@ -239,38 +279,33 @@ Réponds uniquement avec une liste JSON de strings:
 ["Point 1", "Point 2", ...]"""
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.base_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [{"role": "user", "content": prompt}],
-                        "max_tokens": 500,
-                        "temperature": 0.3,
-                    }
-                )
+            response = await self._post_completion(
+                {
+                    "model": self.model,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "max_tokens": 500,
+                    "temperature": 0.3,
+                },
+                timeout=30.0
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                content = result["choices"][0]["message"]["content"]
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    content = result["choices"][0]["message"]["content"]
-                    
-                    # Parser le JSON
-                    import json
-                    if "```json" in content:
-                        content = content.split("```json")[1].split("```")[0]
-                    elif "```" in content:
-                        content = content.split("```")[1].split("```")[0]
-                    
-                    points = json.loads(content.strip())
-                    logger.info(f"✅ {len(points)} points clés extraits")
-                    return points
-                else:
-                    logger.warning(f"Erreur extraction points clés: {response.status_code}")
-                    return []
+                # Parser le JSON
+                import json
+                if "```json" in content:
+                    content = content.split("```json")[1].split("```")[0]
+                elif "```" in content:
+                    content = content.split("```")[1].split("```")[0]
+                
+                points = json.loads(content.strip())
+                logger.info(f"✅ {len(points)} points clés extraits")
+                return points
+            else:
+                logger.warning(f"Erreur extraction points clés: {response.status_code}")
+                return []
         except Exception as e:
             logger.error(f"Erreur extraction points clés: {str(e)}")
             return []
@@ -0,0 +1,186 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║           CAPTURE DES ÉCHECS DE PARSING JSON - AFRICA STRATEGY                ║
+║        Tampon circulaire en mémoire | Copie disque bornée par session         ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Remplace les fichiers failed_json_debug.txt écrits dans le répertoire courant
+(écriture bloquante, écrasés par les sessions concurrentes) :
+
+- les N derniers échecs restent en mémoire (tampon circulaire) et sont
+  consultables via /api/admin/parse-failures ;
+- si PARSE_FAILURES_SPILL_DIR est défini, chaque échec est aussi écrit dans
+  <dir>/<session_id>/ par un thread dédié, sans dépasser
+  PARSE_FAILURES_MAX_SESSION_BYTES par session.
+
+La session courante est portée par `current_session_id` (ContextVar) : elle
+suit les tâches asyncio et les appels asyncio.to_thread.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import logging
+import threading
+from collections import deque
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Session d'analyse en cours d'exécution (None hors session)
+current_session_id: ContextVar[Optional[str]] = ContextVar("current_session_id", default=None)
+
+# Caractères autorisés dans un nom de répertoire de session
+_SAFE_NAME_RE = re.compile(r'[^A-Za-z0-9_-]')
+
+
+class ParseFailureSink:
+    """
+    Tampon circulaire des derniers échecs de parsing, avec copie disque
+    optionnelle et asynchrone
+    """
+
+    def __init__(
+        self,
+        capacity: int = 50,
+        max_content_chars: int = 200_000,
+        spill_dir: Optional[str] = None,
+        max_session_bytes: int = 5 * 1024 * 1024
+    ):
+        self.max_content_chars = max_content_chars
+        self.spill_dir = spill_dir
+        self.max_session_bytes = max_session_bytes
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=max(1, capacity))
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._session_bytes: Dict[str, int] = {}
+        self._stats = {"recorded": 0, "spilled": 0, "spill_skipped": 0, "spill_errors": 0}
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # ENREGISTREMENT
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def record(
+        self,
+        bloc_id: str,
+        content: str,
+        error: str,
+        position: Optional[int] = None,
+        session_id: Optional[str] = None
+    ) -> str:
+        """
+        Enregistre un échec (appel non bloquant, utilisable depuis n'importe
+        quel thread). Retourne l'identifiant de l'échec.
+        """
+        session_id = session_id or current_session_id.get()
+        failure = {
+            "id": uuid.uuid4().hex[:12],
+            "recorded_at": datetime.now().isoformat(),
+            "session_id": session_id,
+            "bloc_id": bloc_id,
+            "error": error,
+            "position": position,
+            "content_chars": len(content),
+            "context": content[max(0, position - 150):position + 150] if position is not None else None,
+            "content": content[:self.max_content_chars]
+        }
+        with self._lock:
+            self._buffer.append(failure)
+            self._stats["recorded"] += 1
+
+        if self.spill_dir:
+            if self._executor is None:
+                with self._lock:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="parse-failures")
+            self._executor.submit(self._spill, failure)
+
+        logger.warning(f"🧾 Échec de parsing {bloc_id} capturé ({failure['id']}, session {session_id})")
+        return failure["id"]
+
+    def _spill(self, failure: Dict[str, Any]):
+        """Écrit l'échec dans le répertoire de sa session (thread dédié)"""
+        session = _SAFE_NAME_RE.sub('_', failure["session_id"] or "hors_session")
+        payload = json.dumps(failure, ensure_ascii=False, indent=1).encode("utf-8")
+        try:
+            directory = os.path.join(self.spill_dir, session)
+            if session not in self._session_bytes:
+                os.makedirs(directory, exist_ok=True)
+                self._session_bytes[session] = sum(
+                    entry.stat().st_size for entry in os.scandir(directory) if entry.is_file()
+                )
+            if self._session_bytes[session] + len(payload) > self.max_session_bytes:
+                self._stats["spill_skipped"] += 1
+                return
+            path = os.path.join(directory, f"{int(time.time())}_{failure['bloc_id']}_{failure['id']}.json")
+            with open(path, "wb") as f:
+                f.write(payload)
+            self._session_bytes[session] += len(payload)
+            self._stats["spilled"] += 1
+        except OSError as e:
+            self._stats["spill_errors"] += 1
+            logger.warning(f"⚠️ Copie disque de l'échec {failure['id']} impossible: {e}")
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # CONSULTATION
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def list(
+        self,
+        session_id: Optional[str] = None,
+        bloc_id: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Derniers échecs (plus récents d'abord), sans le contenu complet"""
+        with self._lock:
+            failures = list(self._buffer)
+        failures = [
+            {key: value for key, value in failure.items() if key != "content"}
+            for failure in reversed(failures)
+            if (session_id is None or failure["session_id"] == session_id)
+            and (bloc_id is None or failure["bloc_id"] == bloc_id)
+        ]
+        return failures[:limit]
+
+    def get(self, failure_id: str) -> Optional[Dict[str, Any]]:
+        """Échec complet (contenu inclus), s'il est encore dans le tampon"""
+        with self._lock:
+            for failure in self._buffer:
+                if failure["id"] == failure_id:
+                    return dict(failure)
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            buffered = len(self._buffer)
+        return {
+            **self._stats,
+            "buffered": buffered,
+            "capacity": self._buffer.maxlen,
+            "spill_dir": self.spill_dir
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INSTANCE GLOBALE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+parse_failures = ParseFailureSink(
+    capacity=settings.PARSE_FAILURES_BUFFER_SIZE,
+    max_content_chars=settings.PARSE_FAILURES_MAX_CONTENT_CHARS,
+    spill_dir=settings.PARSE_FAILURES_SPILL_DIR or None,
+    max_session_bytes=settings.PARSE_FAILURES_MAX_SESSION_BYTES
+)
@@ -5,85 +5,168 @@ Handles document indexing, retrieval, and context enrichment for AI analyses
 
 import os
 import json
+import asyncio
+import time
+import hashlib
 import logging
+import threading
+import unicodedata
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
-from pinecone import Pinecone, ServerlessSpec
-try:
-    from langchain_pinecone import Pinecone as LangchainPinecone
-except ImportError:
-    from langchain_community.vectorstores import Pinecone as LangchainPinecone
-from langchain_community.embeddings import SentenceTransformerEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_core.documents import Document
+import numpy as np
 
 from app.core.config import settings
+from app.services.embedding_cache import create_embedding_cache, content_hash
+from app.services.embedding_executor import embedding_executor
+from app.services.vector_store import create_vector_store, DOCS_NAMESPACE
+from app.services.hybrid_retrieval import BM25Index, reciprocal_rank_fusion, create_reranker
+from app.services.search_cache import search_cache, search_cache_key
 
 logger = logging.getLogger(__name__)
 
 
 class RAGService:
     """
-    Service for Retrieval-Augmented Generation using Pinecone
+    Service for Retrieval-Augmented Generation over a vector store
+    (Pinecone or local index, see RAG_VECTOR_BACKEND)
     """
 
     def __init__(self):
         self.pinecone_api_key = settings.PINECONE_API_KEY
         self.pinecone_env = settings.PINECONE_ENVIRONMENT
         self.index_name = settings.PINECONE_INDEX_NAME
+        self.embedding_model = settings.RAG_EMBEDDING_MODEL
+
+        # Loaded on first use (see _ensure_initialized): importing this module
+        # must not load the model or reach the vector store
+        self.store = None
+        self.embedder = None
+        self.embedding_cache = None
+        self.lexical_index = None
+        self.reranker = None
+        self.text_splitter = None
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        self.init_seconds = None
+
+        self.search_concurrency = max(1, settings.RAG_SEARCH_CONCURRENCY)
+        self.rrf_k = settings.RAG_RRF_K
+        self.rerank_candidates = max(1, settings.RAG_RERANK_CANDIDATES)
+
+        # Model vs index dimension, checked once instead of on every vector
+        self.model_dimension = None
+        self.dimension_error = None
+        self._dimension_checked = False
+
+    def _ensure_initialized(self):
+        """
+        Load the vector store, embedding model and lexical index once
+
+        Blocking and thread-safe: concurrent first calls wait for a single load.
+        """
+        if self._initialized:
+            return
 
-        # Initialize Pinecone
-        if self.pinecone_api_key and self.pinecone_env:
+        with self._init_lock:
+            if self._initialized:
+                return
+            started = time.perf_counter()
+
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+            # Initialize vector store (None = RAG disabled)
+            self.store = create_vector_store()
+            if self.store:
+                logger.info(f"RAG Service using {self.store.backend} vector store")
+
+            # Start the embedding workers (shared with ingestion, see embedding_executor)
             try:
-                self.pc = Pinecone(api_key=self.pinecone_api_key)
-                self._ensure_index_exists()
-                logger.info(f"RAG Service initialized with Pinecone index: {self.index_name}")
+                embedding_executor.start()
+                self.embedder = embedding_executor
             except Exception as e:
-                logger.warning(f"Failed to initialize Pinecone: {str(e)}")
-                self.pc = None
-        else:
-            logger.warning("Pinecone credentials not configured - RAG disabled")
-            self.pc = None
+                logger.error(f"Failed to initialize embeddings: {str(e)}")
+                self.embedder = None
+
+            # Chunk embeddings of unchanged content are reused across imports
+            self.embedding_cache = create_embedding_cache()
+
+            # Hybrid retrieval: BM25 over chunks fused with vector results, optional re-ranker
+            self.lexical_index = BM25Index(
+                settings.RAG_LEXICAL_INDEX_PATH or None,
+                rare_term_ratio=settings.RAG_LEXICAL_RARE_TERM_RATIO
+            ) if settings.RAG_HYBRID_SEARCH else None
+            self.reranker = create_reranker()
+
+            # Initialize text splitter
+            self.text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=1000,
+                chunk_overlap=200,
+                separators=["\n\n", "\n", ". ", " ", ""]
+            )
+
+            self._check_dimension()
+            self.init_seconds = round(time.perf_counter() - started, 3)
+            self._initialized = True
+            logger.info(f"RAG Service initialized in {self.init_seconds}s")
 
-        # Initialize embeddings
+    async def initialize(self):
+        """Load the service off the event loop (no-op once loaded)"""
+        if not self._initialized:
+            await asyncio.to_thread(self._ensure_initialized)
+
+    async def warm_up(self):
+        """
+        Load the service and run one embedding so the first request pays neither
+        (started in the background at app startup when RAG_WARMUP_ON_STARTUP is set)
+        """
+        started = time.perf_counter()
         try:
-            self.embeddings = SentenceTransformerEmbeddings(
-                model_name="all-MiniLM-L6-v2"  # Fast and good quality
-            )
+            await self.initialize()
+            if await self._ready():
+                await self.embed_texts(["warm-up"])
+            logger.info(f"RAG warm-up done in {time.perf_counter() - started:.2f}s")
         except Exception as e:
-            logger.error(f"Failed to initialize embeddings: {str(e)}")
-            self.embeddings = None
-
-        # Initialize text splitter
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            separators=["\n\n", "\n", ". ", " ", ""]
-        )
+            logger.warning(f"RAG warm-up failed: {str(e)}")
+
+    def _check_dimension(self):
+        """
+        Compare the embedding model dimension with the index dimension.
 
-    def _ensure_index_exists(self):
-        """Ensure Pinecone index exists"""
-        if not self.pc:
+        Any mismatch disables RAG with a health error: the index must be
+        re-created for the model (vectors are never padded or truncated).
+        Retried on first use if the index could not be reached.
+        """
+        if not self.store or not self.embedder:
             return
 
+        self.model_dimension = self.embedder.dimension
         try:
-            if self.index_name not in self.pc.list_indexes().names():
-                logger.info(f"Creating Pinecone index: {self.index_name}")
-                self.pc.create_index(
-                    name=self.index_name,
-                    dimension=384,  # Dimension for all-MiniLM-L6-v2
-                    metric="cosine",
-                    spec=ServerlessSpec(
-                        cloud="aws",
-                        region=self.pinecone_env
-                    )
-                )
-                logger.info(f"Created Pinecone index: {self.index_name}")
-            else:
-                logger.info(f"Pinecone index already exists: {self.index_name}")
+            index_dimension = self.store.dimension()
         except Exception as e:
-            logger.error(f"Failed to create/verify Pinecone index: {str(e)}")
+            logger.warning(f"Could not check index dimension: {str(e)}")
+            return
+
+        self._dimension_checked = True
+        if index_dimension is None or index_dimension == self.model_dimension:
+            return
+        self.dimension_error = (
+            f"Index dimension {index_dimension} does not match {self.embedding_model} dimension "
+            f"{self.model_dimension} - re-create the index for this model or change RAG_EMBEDDING_MODEL"
+        )
+        logger.error(self.dimension_error)
+
+    async def _ready(self) -> bool:
+        """Store and model available, with a compatible dimension"""
+        await self.initialize()
+        if not self.store or not self.embedder:
+            return False
+        if not self._dimension_checked:
+            await asyncio.to_thread(self._check_dimension)
+        if self.dimension_error:
+            logger.error(f"RAG disabled: {self.dimension_error}")
+            return False
+        return True
 
     def _get_vectorstore(self):
         """Get LangChain Pinecone vectorstore - DEPRECATED due to compatibility issues"""
@@ -91,88 +174,238 @@ class RAGService:
         # We use direct Pinecone API instead in search_context method
         return None
 
-    async def add_documents(self, documents: List[Dict[str, Any]]) -> bool:
+    async def embed_texts(self, texts: List[str], bulk: bool = False) -> np.ndarray:
         """
-        Add documents to the RAG system using direct Pinecone API
+        Embed texts in the embedding worker pool without blocking the event loop
+
+        Args:
+            texts: Texts to embed
+            bulk: Ingestion work (yields to search batches, see embedding_executor)
+
+        Returns:
+            float32 array of shape (len(texts), model dimension)
+        """
+        return await self.embedder.embed(texts, bulk=bulk)
+
+    async def embed_chunks(self, chunks: List[str]) -> np.ndarray:
+        """
+        Embed document chunks, reusing cached embeddings of unchanged content
+
+        Args:
+            chunks: Chunk texts
+
+        Returns:
+            float32 array of shape (len(chunks), model dimension)
+        """
+        hashes = [content_hash(chunk) for chunk in chunks]
+        cache_model = self.embedder.cache_model
+        cached = await asyncio.to_thread(self.embedding_cache.get_many, cache_model, hashes)
+
+        missing = {}
+        for key, chunk in zip(hashes, chunks):
+            if key not in cached:
+                missing.setdefault(key, chunk)
+
+        if missing:
+            computed = await self.embed_texts(list(missing.values()), bulk=True)
+            fresh = dict(zip(missing.keys(), computed))
+            await asyncio.to_thread(self.embedding_cache.put_many, cache_model, fresh)
+            cached.update(fresh)
+
+        logger.info(f"Embedded {len(missing)} chunks ({len(chunks) - len(missing)} reused from cache)")
+        return np.vstack([cached[key] for key in hashes])
+
+    @staticmethod
+    def _document_prefix(doc: Dict[str, Any]) -> Optional[str]:
+        """
+        ID prefix shared by the chunks of a document with a stable identity
+        (metadata doc_id), None for documents without one
+        """
+        doc_id = (doc.get('metadata') or {}).get('doc_id')
+        if not doc_id:
+            return None
+        identity = "\x00".join([str(doc.get('source', 'doc')), str(doc.get('category', '')), str(doc_id)])
+        digest = hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+        return f"{doc.get('source', 'doc')}_{digest}_"
+
+    @classmethod
+    def _vector_id(cls, doc: Dict[str, Any], chunk: str) -> str:
+        """
+        Deterministic vector ID: same document identity and chunk text give
+        the same ID, so re-imports overwrite instead of duplicating.
+        Chunks of a document with a doc_id share its prefix (see _remove_stale_chunks).
+        """
+        prefix = cls._document_prefix(doc)
+        if prefix:
+            return prefix + hashlib.sha256(unicodedata.normalize("NFC", chunk).encode("utf-8")).hexdigest()[:24]
+        identity = "\x00".join([
+            str(doc.get('source', 'doc')),
+            str(doc.get('category', '')),
+            str(doc.get('country', '')),
+            str(doc.get('sector', '')),
+            str((doc.get('metadata') or {}).get('doc_id', '')),
+            unicodedata.normalize("NFC", chunk)
+        ])
+        digest = hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
+        return f"{doc.get('source', 'doc')}_{digest}"
+
+    def _existing_ids(self, ids: List[str], namespace: str) -> set:
+        """IDs already present in the store namespace (empty set if the lookup fails)"""
+        try:
+            return self.store.existing_ids(ids, namespace)
+        except Exception as e:
+            logger.warning(f"Could not check existing vectors, upserting all: {str(e)}")
+            return set()
+
+    def _remove_stale_chunks(self, produced: Dict[str, set], namespace: str) -> int:
+        """
+        Delete the chunks of re-imported documents that their new content no
+        longer produces, from the vector store and the lexical index
+
+        Args:
+            produced: {document prefix: chunk IDs of its current content}
+
+        Returns:
+            Number of stale chunks removed
+        """
+        removed = 0
+        for prefix, ids in produced.items():
+            try:
+                stale = self.store.ids_with_prefix(prefix, namespace) - ids
+                if stale:
+                    self.store.delete(sorted(stale), namespace)
+                if self.lexical_index is not None:
+                    lexical_stale = self.lexical_index.ids_with_prefix(prefix) - ids
+                    if lexical_stale:
+                        self.lexical_index.remove(sorted(lexical_stale))
+                    stale |= lexical_stale
+                removed += len(stale)
+            except Exception as e:
+                logger.warning(f"Could not remove stale chunks of {prefix}*: {str(e)}")
+        return removed
+
+    @staticmethod
+    async def _invalidate_search_cache():
+        """New index generation: cached search results are no longer served"""
+        if search_cache is not None:
+            await search_cache.invalidate()
+
+    @staticmethod
+    def _chunk_metadata(doc: Dict[str, Any], i: int, total_chunks: int, chunk: str) -> Dict[str, Any]:
+        """Metadata stored with a chunk (vector store and lexical index)"""
+        metadata = doc.get('metadata', {}).copy()
+        metadata.update({
+            'chunk_id': i,
+            'total_chunks': total_chunks,
+            'source': doc.get('source', 'unknown'),
+            'category': doc.get('category', 'general'),
+            'country': doc.get('country', ''),
+            'sector': doc.get('sector', ''),
+            'content': chunk[:1000],  # Limit content size
+            'added_at': datetime.now().isoformat()
+        })
+        return metadata
+
+    async def add_documents(self, documents: List[Dict[str, Any]], flush: bool = True) -> bool:
+        """
+        Add documents to the RAG system (embedded chunks upserted to the vector store)
 
         Args:
             documents: List of document dictionaries with 'content', 'metadata', etc.
+            flush: Persist the vector store afterwards; bulk imports pass False
+                and call flush() once at the end (a local index is rewritten whole)
 
         Returns:
             Success status
         """
-        if not self.pc or not self.embeddings:
+        if not await self._ready():
             logger.warning("RAG not available - skipping document addition")
             return False
 
         try:
-            index = self.pc.Index(self.index_name)
-            stats = index.describe_index_stats()
-            dimension = stats.get('dimension', 384)
-            
-            vectors_to_upsert = []
-            
+            # Split every document first so chunks can be embedded in batches
+            pending = []
             for doc in documents:
                 content = doc.get('content', '')
                 if not content.strip():
                     continue
 
-                # Split text into chunks
                 chunks = self.text_splitter.split_text(content)
-
                 for i, chunk in enumerate(chunks):
-                    # Generate embedding
-                    try:
-                        embedding = self.embeddings.embed_query(chunk)
-                        
-                        # Adjust dimension if needed
-                        if len(embedding) != dimension:
-                            if len(embedding) < dimension:
-                                embedding = embedding + [0.0] * (dimension - len(embedding))
-                            else:
-                                embedding = embedding[:dimension]
-                    except Exception as e:
-                        logger.error(f"Failed to generate embedding for chunk {i}: {str(e)}")
-                        continue
-                    
-                    # Prepare metadata
-                    metadata = doc.get('metadata', {}).copy()
-                    metadata.update({
-                        'chunk_id': i,
-                        'total_chunks': len(chunks),
-                        'source': doc.get('source', 'unknown'),
-                        'category': doc.get('category', 'general'),
-                        'country': doc.get('country', ''),
-                        'sector': doc.get('sector', ''),
-                        'content': chunk[:1000],  # Limit content size
-                        'added_at': datetime.now().isoformat()
-                    })
-                    
-                    # Create vector
-                    vector_id = f"{doc.get('source', 'doc')}_{i}_{datetime.now().timestamp()}"
-                    vectors_to_upsert.append({
-                        'id': vector_id,
-                        'values': embedding,
-                        'metadata': metadata
-                    })
-            
+                    pending.append((doc, i, len(chunks), chunk))
+
+            if not pending:
+                logger.warning("No valid documents to add")
+                return False
+
+            # Unchanged chunks keep their ID: skip the ones already indexed
+            namespace = DOCS_NAMESPACE
+            vector_ids = [self._vector_id(doc, chunk) for doc, _, _, chunk in pending]
+
+            # Re-imported documents: drop the chunks their new content no longer produces
+            produced: Dict[str, set] = {}
+            for vector_id, (doc, _, _, _) in zip(vector_ids, pending):
+                prefix = self._document_prefix(doc)
+                if prefix:
+                    produced.setdefault(prefix, set()).add(vector_id)
+            removed = await asyncio.to_thread(self._remove_stale_chunks, produced, namespace) if produced else 0
+            if removed:
+                logger.info(f"Removed {removed} stale chunks of re-imported documents")
+
+            existing = await asyncio.to_thread(self._existing_ids, list(dict.fromkeys(vector_ids)), namespace)
+            seen = set(existing)
+            new_items = []
+            for vector_id, item in zip(vector_ids, pending):
+                if vector_id not in seen:
+                    seen.add(vector_id)
+                    new_items.append((vector_id, item))
+
+            # Lexical index: every chunk, including unchanged ones already in the vector store
+            if self.lexical_index is not None:
+                await asyncio.to_thread(self.lexical_index.add, [
+                    {'id': vector_id, 'content': chunk, 'metadata': self._chunk_metadata(doc, i, total_chunks, chunk)}
+                    for vector_id, (doc, i, total_chunks, chunk) in dict(zip(vector_ids, pending)).items()
+                ])
+
+            if not new_items:
+                logger.info(f"All {len(pending)} chunks already indexed - nothing to upload")
+                if removed and flush:
+                    await self.flush()
+                if removed or self.lexical_index is not None:
+                    await self._invalidate_search_cache()
+                return True
+
+            embeddings = await self.embed_chunks([chunk for _, (_, _, _, chunk) in new_items])
+
+            vectors_to_upsert = []
+            for (vector_id, (doc, i, total_chunks, chunk)), embedding in zip(new_items, embeddings):
+                vectors_to_upsert.append({
+                    'id': vector_id,
+                    'values': embedding.tolist(),
+                    'metadata': self._chunk_metadata(doc, i, total_chunks, chunk)
+                })
+
             if vectors_to_upsert:
                 # Upload in batches
-                batch_size = 50
+                batch_size = max(1, settings.RAG_UPSERT_BATCH_SIZE)
                 total_uploaded = 0
                 
                 for i in range(0, len(vectors_to_upsert), batch_size):
                     batch = vectors_to_upsert[i:i+batch_size]
                     try:
-                        index.upsert(
-                            vectors=batch,
-                            namespace="africa-strategy-docs"
-                        )
+                        await asyncio.to_thread(self.store.upsert, batch, namespace)
                         total_uploaded += len(batch)
                     except Exception as e:
                         logger.error(f"Failed to upsert batch {i//batch_size + 1}: {str(e)}")
-                
-                logger.info(f"Added {total_uploaded} document chunks to RAG")
+
+                if flush:
+                    await self.flush()
+                await self._invalidate_search_cache()
+
+                logger.info(
+                    f"Added {total_uploaded} document chunks to RAG "
+                    f"({len(pending) - len(new_items)} unchanged chunks skipped)"
+                )
                 return total_uploaded > 0
             else:
                 logger.warning("No valid documents to add")
@@ -184,10 +417,15 @@ class RAGService:
             logger.error(traceback.format_exc())
             return False
 
+    async def flush(self):
+        """Persist pending vector store writes (no-op for Pinecone)"""
+        if self.store is not None:
+            await asyncio.to_thread(self.store.flush)
+
     async def search_context(self, query: str, filters: Optional[Dict[str, Any]] = None,
                            top_k: int = 5) -> List[Dict[str, Any]]:
         """
-        Search for relevant context in the RAG system using direct Pinecone API
+        Search for relevant context in the RAG system
 
         Args:
             query: Search query
@@ -197,80 +435,210 @@ class RAGService:
         Returns:
             List of relevant documents with scores
         """
-        if not self.pc or not self.embeddings:
-            logger.warning("RAG not available - returning empty results")
+        results = (await self.search_many([query], filters=filters, top_k=top_k))[0]
+        logger.info(f"RAG search returned {len(results)} results for query: {query[:50]}...")
+        return results
+
+    async def search_many(self, queries: List[str], filters: Optional[Dict[str, Any]] = None,
+                          top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Run several searches at once: all queries are embedded in one batch,
+        then the vector lookups run concurrently
+
+        Args:
+            queries: Search queries
+            filters: Metadata filters applied to every query
+            top_k: Number of results per query
+
+        Returns:
+            One result list per query (empty if that lookup failed)
+        """
+        if not queries:
             return []
+        if not await self._ready():
+            logger.warning("RAG not available - returning empty results")
+            return [[] for _ in queries]
+
+        # Only country, sector and category are indexed as filters
+        store_filters = {
+            key: filters[key]
+            for key in ('country', 'sector', 'category')
+            if filters and filters.get(key)
+        }
 
+        if search_cache is None:
+            return [results or [] for results in await self._search(queries, store_filters, top_k)]
+
+        # Serve repeated (query, filters, top_k) from the cache, search the rest
+        keys = [search_cache_key(query, store_filters, top_k) for query in queries]
+        generation, cached = await search_cache.get_many(keys)
+        missing = list(dict.fromkeys(key for key in keys if key not in cached))
+        if missing:
+            first_query = {key: query for key, query in reversed(list(zip(keys, queries)))}
+            searched = await self._search([first_query[key] for key in missing], store_filters, top_k)
+            fresh = {key: results for key, results in zip(missing, searched) if results is not None}
+            await search_cache.set_many(generation, fresh)
+            cached.update(fresh)
+        return [cached.get(key, []) for key in keys]
+
+    async def _search(self, queries: List[str], store_filters: Dict[str, Any],
+                      top_k: int) -> List[Optional[List[Dict[str, Any]]]]:
+        """Uncached search_many: one result list per query, None if its lookup failed"""
         try:
-            # Generate embedding for the query
-            query_embedding = self.embeddings.embed_query(query)
-            
-            # Get index dimension
-            index = self.pc.Index(self.index_name)
-            stats = index.describe_index_stats()
-            dimension = stats.get('dimension', 384)
-            
-            # Adjust embedding dimension if needed
-            if len(query_embedding) != dimension:
-                if len(query_embedding) < dimension:
-                    query_embedding = query_embedding + [0.0] * (dimension - len(query_embedding))
-                else:
-                    query_embedding = query_embedding[:dimension]
-            
-            # Prepare filter for Pinecone
-            pinecone_filter = {}
-            if filters:
-                if 'country' in filters and filters['country']:
-                    pinecone_filter['country'] = {'$eq': filters['country']}
-                if 'sector' in filters and filters['sector']:
-                    pinecone_filter['sector'] = {'$eq': filters['sector']}
-                if 'category' in filters and filters['category']:
-                    pinecone_filter['category'] = {'$eq': filters['category']}
-
-            # Search using direct Pinecone API
-            # Try default namespace first (where import_all_data.py puts data)
-            search_results = None
-            try:
-                # First try default namespace (no namespace parameter)
-                search_results = index.query(
-                    vector=query_embedding,
-                    top_k=top_k,
-                    include_metadata=True,
-                    filter=pinecone_filter if pinecone_filter else None
-                )
-            except Exception as e1:
-                # Try with namespace if default fails
-                try:
-                    search_results = index.query(
-                        vector=query_embedding,
-                        top_k=top_k,
-                        include_metadata=True,
-                        filter=pinecone_filter if pinecone_filter else None,
-                        namespace="africa-strategy-docs"
+            # Generate embeddings for all queries (one batch, off the event loop)
+            query_vectors = await self.embed_texts(queries)
+        except Exception as e:
+            logger.error(f"Failed to embed RAG queries: {str(e)}")
+            return [None for _ in queries]
+
+        # Hybrid: fetch more candidates per side so fusion and re-ranking have room
+        hybrid = self.lexical_index is not None
+        fetch_k = top_k
+        if hybrid:
+            fetch_k = max(fetch_k, 2 * top_k)
+        if self.reranker is not None:
+            fetch_k = max(fetch_k, self.rerank_candidates)
+
+        semaphore = asyncio.Semaphore(self.search_concurrency)
+
+        async def lookup(query: str, vector: np.ndarray) -> List[Dict[str, Any]]:
+            async with semaphore:
+                dense_lookup = asyncio.to_thread(self.store.query, vector.tolist(), fetch_k, store_filters)
+                if hybrid:
+                    dense, lexical = await asyncio.gather(
+                        dense_lookup,
+                        asyncio.to_thread(self.lexical_index.search, query, fetch_k, store_filters)
                     )
-                except Exception as e2:
-                    logger.error(f"Failed to query index (both namespaces): {str(e1)} / {str(e2)}")
-                    return []
-
-            # Format results
-            results = []
-            for match in search_results.get('matches', []):
-                results.append({
-                    'content': match['metadata'].get('content', ''),
-                    'metadata': match['metadata'],
-                    'score': float(match.get('score', 0.0)),
-                    'source': match['metadata'].get('source', 'unknown'),
-                    'category': match['metadata'].get('category', 'general')
-                })
+                else:
+                    dense, lexical = await dense_lookup, []
+            return self._fuse(dense, lexical)
 
-            logger.info(f"RAG search returned {len(results)} results for query: {query[:50]}...")
+        outcomes = await asyncio.gather(
+            *(lookup(query, vector) for query, vector in zip(queries, query_vectors)),
+            return_exceptions=True
+        )
+        results = []
+        for query, outcome in zip(queries, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Failed to query vector store for '{query[:50]}': {str(outcome)}")
+                outcome = None
+            results.append(outcome)
+
+        if self.reranker is not None:
+            reranked = await self._rerank(queries, [(r or [])[:max(top_k, self.rerank_candidates)] for r in results])
+            results = [None if r is None else ranked for r, ranked in zip(results, reranked)]
+        return [None if r is None else r[:top_k] for r in results]
+
+    def _fuse(self, dense: List[Dict[str, Any]], lexical: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Reciprocal-rank fusion of vector and BM25 matches. 'score' stays the
+        vector similarity (0.0 for lexical-only hits); the fused order is
+        carried by 'rank_score'.
+        """
+        results = {}
+        for match in dense:
+            result = self._format_match(match)
+            result['rank_score'] = result['score']
+            results[result['id']] = result
+        if not lexical:
+            return list(results.values())
+
+        for match in lexical:
+            result = results.get(match['id'])
+            if result is None:
+                result = results[match['id']] = self._format_match({**match, 'score': 0.0})
+            result['lexical_score'] = float(match['score'])
+            result['lexical_rare'] = bool(match.get('rare_match'))
+
+        fused = reciprocal_rank_fusion(
+            [[match['id'] for match in dense], [match['id'] for match in lexical]],
+            k=self.rrf_k
+        )
+        for result_id, result in results.items():
+            result['rank_score'] = fused[result_id]
+        return sorted(results.values(), key=lambda r: r['rank_score'], reverse=True)
+
+    async def _rerank(self, queries: List[str], results: List[List[Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+        """Re-order each query's candidates by the re-ranker (one batch for all queries)"""
+        pairs = [(query, result['content']) for query, candidates in zip(queries, results) for result in candidates]
+        if not pairs:
             return results
-
+        try:
+            scores = await asyncio.to_thread(self.reranker.score, pairs)
         except Exception as e:
-            logger.error(f"Failed to search RAG: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
-            return []
+            logger.warning(f"Re-ranking failed, keeping fused order: {str(e)}")
+            return results
+
+        position = 0
+        reranked = []
+        for candidates in results:
+            for result in candidates:
+                result['rerank_score'] = result['rank_score'] = scores[position]
+                position += 1
+            reranked.append(sorted(candidates, key=lambda r: r['rank_score'], reverse=True))
+        return reranked
+
+    @staticmethod
+    def _confident(result: Dict[str, Any], min_score: float) -> bool:
+        """
+        Vector score above the cutoff, or a lexical match on a rare term (exact
+        terms such as "ND-GAIN" score low in dense space). Matches on common
+        terms only ("afrique", "secteur") must pass the cutoff.
+        """
+        return result['score'] > min_score or result.get('lexical_rare', False)
+
+    @staticmethod
+    def _format_match(match: Dict[str, Any]) -> Dict[str, Any]:
+        metadata = match.get('metadata') or {}
+        return {
+            'id': match.get('id'),
+            'content': metadata.get('content', ''),
+            'metadata': metadata,
+            'score': float(match.get('score', 0.0)),
+            'source': metadata.get('source', 'unknown'),
+            'category': metadata.get('category', 'general')
+        }
+
+    @staticmethod
+    def merge_results(result_lists: List[List[Dict[str, Any]]], min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Merge the results of several queries, de-duplicated by chunk ID (and
+        content), ranked by best rank score then by number of queries that hit
+
+        Args:
+            result_lists: Results of search_many
+            min_score: Drop vector-only results scoring at or below this value
+
+        Returns:
+            Merged results, best first; each carries a 'hits' count
+        """
+        merged: Dict[str, Dict[str, Any]] = {}
+        for results in result_lists:
+            for result in results:
+                if not RAGService._confident(result, min_score):
+                    continue
+                key = result.get('id') or result['content']
+                best = merged.get(key)
+                if best is None:
+                    merged[key] = {**result, 'hits': 1}
+                else:
+                    best['hits'] += 1
+                    if result.get('rank_score', result['score']) > best.get('rank_score', best['score']):
+                        best.update({**result, 'hits': best['hits']})
+
+        ranked = sorted(
+            merged.values(),
+            key=lambda r: (r.get('rank_score', r['score']), r['hits']),
+            reverse=True
+        )
+        seen_content = set()
+        unique = []
+        for result in ranked:
+            if result['content'] in seen_content:
+                continue
+            seen_content.add(result['content'])
+            unique.append(result)
+        return unique
 
     async def get_sector_context(self, sector: str, country: str = "") -> str:
         """
@@ -297,21 +665,15 @@ class RAGService:
                 f"Opportunités {sector} {country}"
             ])
 
-        all_context = []
-        for query in queries:
-            results = await self.search_context(
-                query,
-                filters={'sector': sector, 'country': country} if country else {'sector': sector},
-                top_k=3
-            )
-
-            for result in results:
-                if result['score'] > 0.7:  # Only high-confidence results
-                    all_context.append(result['content'])
+        results = await self.search_many(
+            queries,
+            filters={'sector': sector, 'country': country} if country else {'sector': sector},
+            top_k=3
+        )
 
-        # Remove duplicates and join
-        unique_context = list(set(all_context))
-        return "\n\n".join(unique_context[:5])  # Limit to top 5 chunks
+        # Only high-confidence results, de-duplicated, best first
+        merged = self.merge_results(results, min_score=0.7)
+        return "\n\n".join(result['content'] for result in merged[:5])  # Limit to top 5 chunks
 
     async def get_regulatory_context(self, sector: str, country: str) -> str:
         """
@@ -333,7 +695,7 @@ class RAGService:
 
         context_parts = []
         for result in results:
-            if result['score'] > 0.75:
+            if self._confident(result, 0.75):
                 context_parts.append(result['content'])
 
         return "\n\n".join(context_parts)
@@ -362,7 +724,7 @@ class RAGService:
 
         context_parts = []
         for result in results:
-            if result['score'] > 0.7:
+            if self._confident(result, 0.7):
                 context_parts.append(f"Best Practice: {result['content']}")
 
         return "\n\n".join(context_parts)
@@ -386,15 +748,13 @@ class RAGService:
             return {'rag_context': '', 'available': False}
 
         try:
-            # Get sector-specific context
-            sector_context = await self.get_sector_context(sector, country)
-
-            # Get regulatory context
-            regulatory_context = await self.get_regulatory_context(sector, country)
-
-            # Get best practices
+            # Sector, regulatory and best-practices lookups run concurrently
             challenge = company_data.get('main_challenge', '')
-            best_practices = await self.get_best_practices_context(sector, challenge)
+            sector_context, regulatory_context, best_practices = await asyncio.gather(
+                self.get_sector_context(sector, country),
+                self.get_regulatory_context(sector, country),
+                self.get_best_practices_context(sector, challenge)
+            )
 
             # Combine all context
             full_context = f"""
@@ -427,33 +787,50 @@ BEST PRACTICES:
         Returns:
             Health status dictionary
         """
+        await self.initialize()
         health = {
             'service': 'RAG',
             'status': 'unhealthy',
             'pinecone_configured': bool(self.pinecone_api_key and self.pinecone_env),
-            'embeddings_loaded': self.embeddings is not None,
+            'embeddings_loaded': self.embedder is not None,
+            'init_seconds': self.init_seconds,
+            'embedding_model': self.embedding_model,
+            'embedding_executor': embedding_executor.stats(),
+            'embedding_cache': self.embedding_cache.stats() if self.embedding_cache else None,
+            'lexical_index': self.lexical_index.stats() if self.lexical_index else None,
+            'search_cache': search_cache.stats() if search_cache else None,
+            'reranker': self.reranker.model_name if self.reranker else None,
             'index_name': self.index_name,
+            'vector_backend': self.store.backend if self.store else settings.RAG_VECTOR_BACKEND,
             'timestamp': datetime.now().isoformat()
         }
 
-        if not health['pinecone_configured']:
-            health['error'] = 'Pinecone credentials not configured'
+        if not self.store:
+            health['error'] = (
+                'Pinecone credentials not configured' if not health['pinecone_configured']
+                else 'Vector store not available'
+            )
             return health
 
         if not health['embeddings_loaded']:
             health['error'] = 'Embeddings model not loaded'
             return health
 
+        health['model_dimension'] = self.model_dimension
+        if self.dimension_error:
+            health['error'] = self.dimension_error
+            return health
+
         try:
-            # Check index exists
-            indexes = self.pc.list_indexes().names() if self.pc else []
-            health['index_exists'] = self.index_name in indexes
+            # Check index exists (and backend-specific details)
+            health['vector_store'] = await asyncio.to_thread(self.store.health)
+            health['index_exists'] = health['vector_store'].get('index_exists', False)
 
             if health['index_exists']:
-                # Try a simple search using direct API
+                # Try a simple search (bypassing the result cache)
                 try:
-                    test_results = await self.search_context("test", top_k=1)
-                    health['search_working'] = len(test_results) > 0 or True  # Even if no results, search works
+                    test_results = (await self._search(["test"], {}, 1))[0]
+                    health['search_working'] = test_results is not None  # Even if no results, search works
                 except Exception as e:
                     health['search_working'] = False
                     health['error'] = f'Search test failed: {str(e)}'
@@ -0,0 +1,341 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║              LIMITEUR DE DÉBIT DES APPELS LLM - AFRICA STRATEGY               ║
+║        Requêtes/min, tokens/min et appels simultanés par fournisseur          ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Chaque appel LLM réserve une place avant de partir :
+
+    async with rate_limiter.limit("openrouter", model, tokens=estimation,
+                                  priority=PRIORITY_INTERACTIVE) as permit:
+        response = await ...
+        permit.record_tokens(response.usage.total_tokens)
+
+- Un appel consomme les budgets de son fournisseur ("openai") et, si une
+  limite est configurée, de son modèle ("openai/gpt-4o").
+- Les appels en attente sont servis par ordre de priorité puis d'arrivée :
+  le chat interactif passe devant les blocs générés en arrière-plan.
+- Un 429 met le fournisseur en pause (Retry-After) au lieu d'échouer.
+- Les appelants attendent leur tour, ils ne reçoivent jamais d'erreur.
+"""
+
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from email.utils import parsedate_to_datetime
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, List
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Priorités (plus petit = servi en premier)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 5
+PRIORITY_BACKGROUND = 10
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Estimation grossière : ~4 caractères par token"""
+    return sum(len(text or "") for text in texts) // 4
+
+
+def retry_after_seconds(headers: Any, default: float) -> float:
+    """Délai demandé par l'en-tête Retry-After (secondes ou date HTTP)"""
+    value = headers.get("retry-after") if headers is not None else None
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class _TokenBucket:
+    """
+    Seau à jetons rempli en continu : `per_minute` unités par minute,
+    capacité d'une minute de budget. None = illimité.
+    """
+
+    def __init__(self, per_minute: Optional[int]):
+        self.per_minute = per_minute
+        self.level = float(per_minute or 0)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        if self.per_minute:
+            self.level = min(
+                float(self.per_minute),
+                self.level + (now - self.updated) * self.per_minute / 60.0
+            )
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        if not self.per_minute or amount <= 0:
+            return 0.0
+        self._refill(now)
+        # Une demande plus grosse que la capacité passe quand le seau est plein
+        amount = min(amount, self.per_minute)
+        missing = amount - self.level
+        return 0.0 if missing <= 0 else missing * 60.0 / self.per_minute
+
+    def take(self, amount: float, now: float):
+        if not self.per_minute:
+            return
+        self._refill(now)
+        # Le niveau peut devenir négatif (consommation réelle > estimation)
+        self.level -= min(amount, self.per_minute) if amount > 0 else amount
+
+
+class _Scope:
+    """Budgets d'un fournisseur ou d'un modèle"""
+
+    def __init__(self, name: str, rpm: Optional[int], tpm: Optional[int], max_in_flight: Optional[int]):
+        self.name = name
+        self.requests = _TokenBucket(rpm)
+        self.tokens = _TokenBucket(tpm)
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.granted = 0
+        self.throttled = 0
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return float("inf")  # un release() relancera la distribution
+        return max(
+            self.paused_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(tokens, now),
+            0.0
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rpm": self.requests.per_minute,
+            "tpm": self.tokens.per_minute,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 1),
+            "granted": self.granted,
+            "throttled": self.throttled
+        }
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "scopes", "tokens", "future", "enqueued_at")
+
+    def __init__(self, priority: int, seq: int, scopes: List[_Scope], tokens: int, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.scopes = scopes
+        self.tokens = tokens
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class Permit:
+    """Place accordée à un appel, libérée à la sortie du bloc `async with`"""
+
+    def __init__(self, scopes: List[_Scope], estimated_tokens: int):
+        self.scopes = scopes
+        self.estimated_tokens = estimated_tokens
+        self.waited_seconds = 0.0
+
+    def record_tokens(self, actual_tokens: Optional[int]):
+        """Corrige le budget de tokens avec la consommation réelle"""
+        if actual_tokens is None:
+            return
+        delta = actual_tokens - self.estimated_tokens
+        if delta:
+            now = time.monotonic()
+            for scope in self.scopes:
+                scope.tokens.take(delta, now)
+        self.estimated_tokens = actual_tokens
+
+
+class RateLimiter:
+    """
+    File d'attente à priorités partagée par tous les appels LLM du process
+    """
+
+    def __init__(self):
+        self._scopes: Dict[str, _Scope] = {}
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # CONFIGURATION
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def configure(
+        self,
+        scope: str,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        max_in_flight: Optional[int] = None
+    ):
+        """Définit les budgets d'un fournisseur ("openai") ou d'un modèle ("openai/gpt-4o")"""
+        self._scopes[scope] = _Scope(scope, rpm or None, tpm or None, max_in_flight or None)
+
+    def _resolve(self, provider: str, model: Optional[str]) -> List[_Scope]:
+        if provider not in self._scopes:
+            self.configure(provider)
+        scopes = [self._scopes[provider]]
+        if model and f"{provider}/{model}" in self._scopes:
+            scopes.append(self._scopes[f"{provider}/{model}"])
+        return scopes
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # DISTRIBUTION DES PLACES
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def _dispatch(self):
+        """
+        Accorde les places dans l'ordre des priorités. Un appel bloqué
+        réserve ses budgets : les appels moins prioritaires qui partagent
+        un de ses budgets attendent derrière lui (pas de famine).
+        """
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        blocked = set()
+        next_check = None
+        remaining: List[_Waiter] = []
+
+        for waiter in sorted(self._queue):
+            if waiter.future.done():
+                continue
+            if any(scope.name in blocked for scope in waiter.scopes):
+                remaining.append(waiter)
+                continue
+            wait = max(scope.wait_time(waiter.tokens, now) for scope in waiter.scopes)
+            if wait <= 0:
+                for scope in waiter.scopes:
+                    scope.requests.take(1, now)
+                    scope.tokens.take(waiter.tokens, now)
+                    scope.in_flight += 1
+                    scope.granted += 1
+                waiter.future.set_result(None)
+            else:
+                remaining.append(waiter)
+                blocked.update(scope.name for scope in waiter.scopes)
+                if wait != float("inf"):
+                    next_check = wait if next_check is None else min(next_check, wait)
+
+        heapq.heapify(remaining)
+        self._queue = remaining
+        if remaining and next_check is not None:
+            self._timer = asyncio.get_running_loop().call_later(next_check, self._dispatch)
+
+    def _release(self, scopes: List[_Scope]):
+        for scope in scopes:
+            scope.in_flight = max(0, scope.in_flight - 1)
+        if self._queue:
+            self._dispatch()
+
+    @asynccontextmanager
+    async def limit(
+        self,
+        provider: str,
+        model: Optional[str] = None,
+        tokens: int = 0,
+        priority: int = PRIORITY_NORMAL
+    ):
+        """
+        Attend une place pour un appel puis la libère à la sortie.
+
+        Args:
+            provider: budget fournisseur ("openai", "openrouter")
+            model: budget modèle, s'il est configuré
+            tokens: estimation des tokens consommés (prompt + réponse)
+            priority: PRIORITY_INTERACTIVE, PRIORITY_NORMAL ou PRIORITY_BACKGROUND
+        """
+        scopes = self._resolve(provider, model)
+        future = asyncio.get_running_loop().create_future()
+        waiter = _Waiter(priority, next(self._seq), scopes, tokens, future)
+        heapq.heappush(self._queue, waiter)
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(scopes)
+            raise
+
+        permit = Permit(scopes, tokens)
+        permit.waited_seconds = round(time.monotonic() - waiter.enqueued_at, 3)
+        if permit.waited_seconds >= 1:
+            logger.info(f"⏳ {provider}/{model or '*'} : {permit.waited_seconds}s d'attente (priorité {priority})")
+        try:
+            yield permit
+        finally:
+            self._release(scopes)
+
+    async def admit(
+        self,
+        provider: str,
+        model: Optional[str] = None,
+        tokens: int = 0,
+        priority: int = PRIORITY_NORMAL
+    ) -> Permit:
+        """
+        Attend son tour et consomme les budgets d'une requête, sans garder de
+        place simultanée (requête qui démarre un travail long côté fournisseur).
+        Le Permit retourné sert à corriger les tokens (record_tokens).
+        """
+        async with self.limit(provider, model, tokens=tokens, priority=priority) as permit:
+            return permit
+
+    def penalize(self, provider: str, retry_after: float, model: Optional[str] = None):
+        """Met un budget en pause après un 429 (Retry-After)"""
+        until = time.monotonic() + retry_after
+        for scope in self._resolve(provider, model):
+            scope.paused_until = max(scope.paused_until, until)
+            scope.throttled += 1
+        logger.warning(f"⚠️ {provider}/{model or '*'} limité (429), pause de {retry_after:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """État des budgets et de la file d'attente"""
+        return {
+            "queued": sum(1 for waiter in self._queue if not waiter.future.done()),
+            "scopes": {name: scope.stats() for name, scope in self._scopes.items()}
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INSTANCE GLOBALE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+rate_limiter = RateLimiter()
+rate_limiter.configure(
+    "openai",
+    rpm=settings.OPENAI_RPM_LIMIT,
+    tpm=settings.OPENAI_TPM_LIMIT,
+    max_in_flight=settings.OPENAI_MAX_IN_FLIGHT
+)
+# Runs d'assistants en cours (durée de plusieurs minutes, hors budget "openai")
+rate_limiter.configure("openai_runs", max_in_flight=settings.ASSISTANT_MAX_CONCURRENT_RUNS)
+rate_limiter.configure(
+    "openrouter",
+    rpm=settings.OPENROUTER_RPM_LIMIT,
+    tpm=settings.OPENROUTER_TPM_LIMIT,
+    max_in_flight=settings.OPENROUTER_MAX_IN_FLIGHT
+)
+for _scope, _limits in settings.LLM_MODEL_RATE_LIMITS.items():
+    rate_limiter.configure(_scope, **_limits)
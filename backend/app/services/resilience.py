@@ -0,0 +1,238 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║             RÉSILIENCE DES RUNS D'ASSISTANTS - AFRICA STRATEGY                ║
+║           Retries avec backoff + jitter | Disjoncteur par assistant           ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+- RetryPolicy : relance les échecs transitoires (timeouts, 5xx, 429, runs
+  expirés, JSON illisible) avec un délai exponentiel tiré au hasard
+  ("full jitter") pour ne pas relancer tous les blocs au même instant.
+- CircuitBreaker : après N échecs consécutifs d'un assistant, les appels
+  suivants échouent immédiatement pendant `reset_timeout` secondes, puis un
+  seul appel d'essai décide de la réouverture.
+- LatencyTracker : budget de temps de chaque bloc dérivé du p95 des
+  dernières exécutions réussies.
+"""
+
+import math
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+import openai
+
+logger = logging.getLogger(__name__)
+
+
+class TransientError(Exception):
+    """Échec passager : le même appel a des chances de réussir plus tard"""
+
+
+class BlocParseError(TransientError):
+    """Réponse de l'assistant reçue mais JSON inexploitable"""
+
+
+class CircuitOpenError(Exception):
+    """L'assistant est considéré indisponible, l'appel n'est pas tenté"""
+
+
+class DeadlineExceeded(Exception):
+    """Le budget de temps du bloc ou de la session est épuisé"""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Détermine si une exception justifie une nouvelle tentative"""
+    if isinstance(exc, (CircuitOpenError, DeadlineExceeded)):
+        return False
+    if isinstance(exc, (TransientError, asyncio.TimeoutError)):
+        return True
+    if isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError,
+                        openai.RateLimitError, openai.InternalServerError)):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code >= 500 or exc.status_code in (408, 409, 429)
+    if isinstance(exc, (httpx.TimeoutException, httpx.TransportError)):
+        return True
+    return False
+
+
+class RetryPolicy:
+    """
+    Nouvelles tentatives avec backoff exponentiel et jitter complet
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 2.0,
+        max_delay: float = 30.0,
+        multiplier: float = 2.0
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+
+    def delay(self, attempt: int) -> float:
+        """Délai avant la tentative `attempt + 1` (attempt commence à 1)"""
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    async def run(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        label: str = "",
+        retryable: Callable[[BaseException], bool] = is_retryable,
+        on_retry: Optional[Callable[[int, BaseException, float], Awaitable[None]]] = None
+    ) -> Any:
+        """
+        Exécute fn() jusqu'à max_attempts fois tant que l'erreur est transitoire.
+
+        Args:
+            fn: coroutine sans argument à exécuter
+            label: nom utilisé dans les logs (ex: "BLOC3")
+            retryable: filtre des exceptions à relancer
+            on_retry: coroutine (tentative, exception, délai) appelée avant chaque attente
+        """
+        attempt = 1
+        while True:
+            try:
+                return await fn()
+            except Exception as e:
+                if attempt >= self.max_attempts or not retryable(e):
+                    raise
+                wait = self.delay(attempt)
+                logger.warning(
+                    f"   🔁 {label} tentative {attempt}/{self.max_attempts} échouée "
+                    f"({type(e).__name__}: {e}), nouvel essai dans {wait:.1f}s"
+                )
+                if on_retry:
+                    await on_retry(attempt, e, wait)
+                await asyncio.sleep(wait)
+                attempt += 1
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur d'un assistant : closed → open → half_open → closed
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.rejected = 0
+
+    def before_call(self):
+        """Lève CircuitOpenError si l'appel ne doit pas être tenté"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(
+                    f"Assistant {self.name} indisponible (disjoncteur ouvert après {self.failures} échecs)"
+                )
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+            logger.info(f"   🔌 Disjoncteur {self.name} : appel d'essai")
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(f"Assistant {self.name} en cours de vérification")
+            self._probe_in_flight = True
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info(f"   🔌 Disjoncteur {self.name} refermé")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.error(f"   🔌 Disjoncteur {self.name} ouvert ({self.failures} échecs consécutifs)")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Libère l'appel d'essai sans verdict (ex: échec côté client)"""
+        self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        retry_in = 0.0
+        if self.state == self.OPEN:
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(retry_in, 1)
+        }
+
+
+class LatencyTracker:
+    """
+    Durées des dernières exécutions de chaque bloc (réussies, ou interrompues
+    par leur budget : durée écoulée comme borne basse) et budget dérivé :
+    p95 × multiplier, borné par [min_budget, max_budget]. Tant qu'il y a
+    moins de `min_samples` mesures, le budget par défaut s'applique.
+    """
+
+    def __init__(
+        self,
+        default_budget: float,
+        min_budget: float,
+        max_budget: float,
+        multiplier: float = 1.5,
+        window: int = 50,
+        min_samples: int = 5
+    ):
+        self.default_budget = default_budget
+        self.min_budget = min_budget
+        self.max_budget = max_budget
+        self.multiplier = multiplier
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, key: str, duration: float):
+        self._samples.setdefault(key, deque(maxlen=self.window)).append(duration)
+
+    def percentile(self, key: str, q: float = 0.95) -> Optional[float]:
+        samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        index = max(0, math.ceil(q * len(samples)) - 1)
+        return samples[index]
+
+    def budget(self, key: str) -> float:
+        """Budget de temps (secondes) d'une exécution de `key`"""
+        if len(self._samples.get(key, ())) < self.min_samples:
+            return self.default_budget
+        budget = self.percentile(key) * self.multiplier
+        return min(self.max_budget, max(self.min_budget, budget))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            key: {
+                "samples": len(samples),
+                "p95_seconds": round(self.percentile(key), 1),
+                "budget_seconds": round(self.budget(key), 1)
+            }
+            for key, samples in self._samples.items()
+        }
@@ -0,0 +1,185 @@
+"""
+Search Result Cache for Africa Strategy RAG
+Caches search results keyed on (normalized query, filters, top_k)
+
+Every index write bumps a generation counter; entries from an older
+generation are never served. With a shared Redis cache the counter lives
+in Redis too, so a write on one worker invalidates every worker.
+"""
+
+import copy
+import json
+import time
+import hashlib
+import logging
+import unicodedata
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "rag_search:"
+_GENERATION_KEY = "rag_search:generation"
+
+
+def search_cache_key(query: str, filters: Optional[Dict[str, Any]], top_k: int) -> str:
+    """SHA-256 of the normalized query (NFC, lowercase, single spaces), filters and top_k"""
+    normalized = " ".join(unicodedata.normalize("NFC", query).lower().split())
+    payload = json.dumps({
+        "query": normalized,
+        "filters": {key: value for key, value in (filters or {}).items() if value},
+        "top_k": top_k
+    }, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SearchResultCache:
+    """
+    In-process LRU of search results, optionally backed by a shared Redis cache
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: int = 3600, redis_client=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._redis = redis_client
+        self._generation = 0
+        self._memory: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._stats = {
+            "memory_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "stale_writes": 0
+        }
+
+    async def _current_generation(self) -> int:
+        if self._redis is not None:
+            try:
+                self._generation = int(await self._redis.get(_GENERATION_KEY) or 0)
+            except Exception as e:
+                logger.warning(f"Shared search cache unavailable: {str(e)}")
+        return self._generation
+
+    async def get_many(self, keys: List[str]) -> Tuple[int, Dict[str, List[Dict[str, Any]]]]:
+        """
+        Cached results for the given keys (current generation only)
+
+        Returns:
+            (generation, {key: results}) : the generation read, to pass back
+            to set_many, and the keys found; results are copies
+        """
+        generation = await self._current_generation()
+        found: Dict[str, List[Dict[str, Any]]] = {}
+        remote = []
+        now = time.time()
+        for key in keys:
+            entry = self._memory.get(f"{generation}:{key}")
+            if entry is not None and entry[0] >= now:
+                self._memory.move_to_end(f"{generation}:{key}")
+                found[key] = copy.deepcopy(entry[1])
+                self._stats["memory_hits"] += 1
+            else:
+                remote.append(key)
+
+        if remote and self._redis is not None:
+            try:
+                values = await self._redis.mget([f"{_KEY_PREFIX}{generation}:{key}" for key in remote])
+            except Exception as e:
+                logger.warning(f"Shared search cache read failed: {str(e)}")
+                values = [None] * len(remote)
+            for key, value in zip(remote, values):
+                if value is not None:
+                    results = json.loads(value)
+                    self._remember(f"{generation}:{key}", results)
+                    found[key] = copy.deepcopy(results)
+                    self._stats["shared_hits"] += 1
+
+        self._stats["misses"] += len(keys) - len(found)
+        return generation, found
+
+    async def set_many(self, generation: int, entries: Dict[str, List[Dict[str, Any]]]):
+        """
+        Store results searched under `generation` (as returned by get_many)
+
+        Dropped if an index write started a new generation meanwhile: the
+        results may predate that write.
+        """
+        if not entries:
+            return
+        if await self._current_generation() != generation:
+            self._stats["stale_writes"] += 1
+            return
+        for key, results in entries.items():
+            self._remember(f"{generation}:{key}", copy.deepcopy(results))
+
+        if self._redis is not None:
+            try:
+                pipe = self._redis.pipeline()
+                for key, results in entries.items():
+                    pipe.setex(
+                        f"{_KEY_PREFIX}{generation}:{key}",
+                        self.ttl_seconds,
+                        json.dumps(results, ensure_ascii=False, default=str)
+                    )
+                await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Shared search cache write failed: {str(e)}")
+
+    def _remember(self, key: str, results: List[Dict[str, Any]]):
+        self._memory[key] = (time.time() + self.ttl_seconds, results)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def invalidate(self):
+        """Start a new generation (called after every index write)"""
+        self._memory.clear()
+        self._stats["invalidations"] += 1
+        if self._redis is not None:
+            try:
+                self._generation = int(await self._redis.incr(_GENERATION_KEY))
+                return
+            except Exception as e:
+                logger.warning(f"Shared search cache invalidation failed: {str(e)}")
+        self._generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, hit rate and current generation"""
+        hits = self._stats["memory_hits"] + self._stats["shared_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "generation": self._generation,
+            "shared": self._redis is not None
+        }
+
+
+def create_search_cache() -> Optional[SearchResultCache]:
+    """Search cache configured by RAG_SEARCH_CACHE_* (None when disabled)"""
+    if not settings.RAG_SEARCH_CACHE_ENABLED:
+        return None
+
+    redis_client = None
+    if settings.RAG_SEARCH_CACHE_SHARED:
+        if settings.REDIS_URL:
+            try:
+                import redis.asyncio as aioredis
+                redis_client = aioredis.from_url(settings.REDIS_URL)
+            except ImportError:
+                logger.warning("redis not installed - search cache kept in process")
+        else:
+            logger.warning("REDIS_URL not set - search cache kept in process")
+
+    return SearchResultCache(
+        max_entries=settings.RAG_SEARCH_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.RAG_SEARCH_CACHE_TTL_SECONDS,
+        redis_client=redis_client
+    )
+
+
+# Global search cache instance
+search_cache = create_search_cache()
@@ -0,0 +1,579 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║               STOCKAGE DES SESSIONS D'ANALYSE - AFRICA STRATEGY               ║
+║                  Mémoire | SQLite | Redis (partagé multi-workers)             ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Une session a la forme :
+    {
+        "status": "running" | "completed" | "error",
+        "started_at": ..., "metadata": {...}, "questionnaire_data": {...},
+        "blocs": {"BLOC1": {"status": ..., "result": ...}, ...}
+    }
+
+Chaque bloc est stocké dans un champ séparé : un changement de statut ou de
+progression ne réécrit que l'état du bloc concerné, jamais la session entière.
+Les résultats des blocs sont stockés à part pour que les lectures de statut
+(flux SSE) ne rechargent pas des centaines de Ko de JSON à chaque tick.
+
+Backend choisi par SESSION_STORE_BACKEND (memory, sqlite, redis).
+"""
+
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _split_bloc_state(bloc_state: Dict[str, Any]) -> Tuple[Dict[str, Any], Any]:
+    """Sépare l'état d'un bloc (léger) de son résultat (volumineux)"""
+    state = {k: v for k, v in bloc_state.items() if k != "result"}
+    return state, bloc_state.get("result")
+
+
+class SessionStore(ABC):
+    """
+    Interface commune des stockages de sessions
+    """
+
+    # True si le stockage n'est visible que par le process courant
+    is_local = False
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    async def create(self, session_id: str, session: Dict[str, Any]):
+        """Crée (ou remplace) une session complète"""
+
+    @abstractmethod
+    async def get(self, session_id: str, include_results: bool = True) -> Optional[Dict[str, Any]]:
+        """Retourne la session, avec ou sans les résultats des blocs"""
+
+    @abstractmethod
+    async def get_bloc_result(self, session_id: str, bloc_id: str) -> Optional[Dict[str, Any]]:
+        """Retourne le résultat d'un seul bloc"""
+
+    @abstractmethod
+    async def update(self, session_id: str, **fields):
+        """Met à jour des champs de premier niveau (status, error, ...)"""
+
+    @abstractmethod
+    async def update_bloc(self, session_id: str, bloc_id: str, bloc_state: Dict[str, Any]):
+        """Remplace l'état d'un bloc et son résultat (absent = supprimé)"""
+
+    @abstractmethod
+    async def update_bloc_state(self, session_id: str, bloc_id: str, bloc_state: Dict[str, Any]):
+        """Remplace l'état d'un bloc sans réécrire son résultat (progression)"""
+
+    @abstractmethod
+    async def delete(self, session_id: str):
+        """Supprime une session"""
+
+    async def exists(self, session_id: str) -> bool:
+        return await self.get(session_id, include_results=False) is not None
+
+    async def purge_expired(self) -> int:
+        """Supprime les sessions expirées, retourne le nombre supprimé"""
+        return 0
+
+    async def close(self):
+        pass
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MÉMOIRE (un seul process)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class InMemorySessionStore(SessionStore):
+    """
+    Sessions en mémoire du process, avec TTL et éviction LRU
+    """
+
+    is_local = True
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        super().__init__(ttl_seconds)
+        self.max_entries = max_entries
+        self._sessions: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def _touch(self, session_id: str, session: Dict[str, Any]):
+        self._sessions[session_id] = (time.time() + self.ttl_seconds, session)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_entries:
+            evicted, _ = self._sessions.popitem(last=False)
+            logger.info(f"Session {evicted} évincée (limite {self.max_entries})")
+
+    def _live(self, session_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._sessions.get(session_id)
+        if not entry:
+            return None
+        expires_at, session = entry
+        if expires_at < time.time():
+            del self._sessions[session_id]
+            return None
+        return session
+
+    async def create(self, session_id: str, session: Dict[str, Any]):
+        await self.purge_expired()
+        session = dict(session)
+        session["blocs"] = {bloc_id: dict(state) for bloc_id, state in session.get("blocs", {}).items()}
+        self._touch(session_id, session)
+
+    async def get(self, session_id: str, include_results: bool = True) -> Optional[Dict[str, Any]]:
+        session = self._live(session_id)
+        if session is None:
+            return None
+        copy = dict(session)
+        if include_results:
+            copy["blocs"] = dict(session["blocs"])
+        else:
+            copy["blocs"] = {bloc_id: _split_bloc_state(state)[0] for bloc_id, state in session["blocs"].items()}
+        return copy
+
+    async def get_bloc_result(self, session_id: str, bloc_id: str) -> Optional[Dict[str, Any]]:
+        session = self._live(session_id)
+        if session is None:
+            return None
+        return session["blocs"].get(bloc_id, {}).get("result")
+
+    async def update(self, session_id: str, **fields):
+        session = self._live(session_id)
+        if session is None:
+            return
+        session.update(fields)
+        self._touch(session_id, session)
+
+    async def update_bloc(self, session_id: str, bloc_id: str, bloc_state: Dict[str, Any]):
+        session = self._live(session_id)
+        if session is None:
+            return
+        session["blocs"][bloc_id] = dict(bloc_state)
+        self._touch(session_id, session)
+
+    async def update_bloc_state(self, session_id: str, bloc_id: str, bloc_state: Dict[str, Any]):
+        session = self._live(session_id)
+        if session is None:
+            return
+        state, _ = _split_bloc_state(bloc_state)
+        result = session["blocs"].get(bloc_id, {}).get("result")
+        session["blocs"][bloc_id] = {**state, "result": result} if result is not None else state
+        self._touch(session_id, session)
+
+    async def delete(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    async def purge_expired(self) -> int:
+        now = time.time()
+        expired = [sid for sid, (expires_at, _) in self._sessions.items() if expires_at < now]
+        for sid in expired:
+            del self._sessions[sid]
+        return len(expired)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SQLITE (persistant, partagé entre workers d'une même machine)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions persistées dans SQLite (mode WAL) : survivent aux redémarrages
+    et sont lisibles par tous les workers uvicorn de la machine.
+
+    Comme pour Redis, chaque champ modifié par update est une ligne à part
+    (analysis_session_fields) : deux workers qui mettent à jour des champs
+    différents ne s'écrasent pas (pas de lecture-fusion-écriture du JSON).
+    """
+
+    def __init__(self, path: str, ttl_seconds: int):
+        super().__init__(ttl_seconds)
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS analysis_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_analysis_sessions_expires
+                    ON analysis_sessions (expires_at);
+                CREATE TABLE IF NOT EXISTS analysis_session_fields (
+                    session_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    PRIMARY KEY (session_id, name)
+                );
+                CREATE TABLE IF NOT EXISTS analysis_session_blocs (
+                    session_id TEXT NOT NULL,
+                    bloc_id TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    result TEXT,
+                    PRIMARY KEY (session_id, bloc_id)
+                );
+            """)
+            self._conn.commit()
+
+    async def _run(self, fn, *args):
+        def locked():
+            with self._lock:
+                return fn(*args)
+        return await asyncio.to_thread(locked)
+
+    def _expiry(self) -> float:
+        return time.time() + self.ttl_seconds
+
+    def _write_bloc(self, session_id: str, bloc_id: str, bloc_state: Dict[str, Any]):
+        state, result = _split_bloc_state(bloc_state)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO analysis_session_blocs (session_id, bloc_id, state, result) "
+            "VALUES (?, ?, ?, ?)",
+            (session_id, bloc_id, json.dumps(state, default=str),
+             json.dumps(result, default=str) if result is not None else None)
+        )
+
+    def _delete_children(self, session_id: str):
+        self._conn.execute("DELETE FROM analysis_session_fields WHERE session_id = ?", (session_id,))
+        self._conn.execute("DELETE FROM analysis_session_blocs WHERE session_id = ?", (session_id,))
+
+    async def create(self, session_id: str, session: Dict[str, Any]):
+        def write():
+            self._purge()
+            top = {k: v for k, v in session.items() if k != "blocs"}
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analysis_sessions (session_id, data, expires_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(top, default=str), self._expiry())
+            )
+            self._delete_children(session_id)
+            for bloc_id, bloc_state in session.get("blocs", {}).items():
+                self._write_bloc(session_id, bloc_id, bloc_state)
+            self._conn.commit()
+        await self._run(write)
+
+    async def get(self, session_id: str, include_results: bool = True) -> Optional[Dict[str, Any]]:
+        def read():
+            row = self._conn.execute(
+                "SELECT data FROM analysis_sessions WHERE session_id = ? AND expires_at >= ?",
+                (session_id, time.time())
+            ).fetchone()
+            if not row:
+                return None
+            session = json.loads(row[0])
+            for name, value in self._conn.execute(
+                "SELECT name, value FROM analysis_session_fields WHERE session_id = ?", (session_id,)
+            ):
+                session[name] = json.loads(value)
+            columns = "bloc_id, state, result" if include_results else "bloc_id, state, NULL"
+            session["blocs"] = {}
+            for bloc_id, state, result in self._conn.execute(
+                f"SELECT {columns} FROM analysis_session_blocs WHERE session_id = ? ORDER BY bloc_id",
+                (session_id,)
+            ):
+                bloc_state = json.loads(state)
+                if result is not None:
+                    bloc_state["result"] = json.loads(result)
+                session["blocs"][bloc_id] = bloc_state
+            return session
+        return await self._run(read)
+
+    async def get_bloc_result(self, session_id: str, bloc_id: str) -> Optional[Dict[str, Any]]:
+        def read():
+            row = self._conn.execute(
+                "SELECT result FROM analysis_session_blocs WHERE session_id = ? AND bloc_id = ?",
+                (session_id, bloc_id)
+            ).fetchone()
+            return json.loads(row[0]) if row and row[0] else None
+        return await self._run(read)
+
+    async def update(self, session_id: str, **fields):
+        def write():
+            renewed = self._conn.execute(
+                "UPDATE analysis_sessions SET expires_at = ? WHERE session_id = ?",
+                (self._expiry(), session_id)
+            ).rowcount
+            if renewed:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO analysis_session_fields (session_id, name, value) VALUES (?, ?, ?)",
+                    [(session_id, name, json.dumps(value, default=str)) for name, value in fields.items()]
+                )
+            self._conn.commit()
+        await self._run(write)
+
+    async def update_bloc(self, session_id: str, bloc_id: str, bloc_state: Dict[str, Any]):
+        def write():
+            self._write_bloc(session_id, bloc_id, bloc_state)
+            self._conn.execute(
+                "UPDATE analysis_sessions SET expires_at = ? WHERE session_id = ?",
+                (self._expiry(), session_id)
+            )
+            self._conn.commit()
+        await self._run(write)
+
+    async def update_bloc_state(self, session_id: str, bloc_id: str, bloc_state: Dict[str, Any]):
+        def write():
+            exists = self._conn.execute(
+                "SELECT 1 FROM analysis_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if not exists:
+                return
+            state, _ = _split_bloc_state(bloc_state)
+            self._conn.execute(
+                "INSERT INTO analysis_session_blocs (session_id, bloc_id, state, result) VALUES (?, ?, ?, NULL) "
+                "ON CONFLICT (session_id, bloc_id) DO UPDATE SET state = excluded.state",
+                (session_id, bloc_id, json.dumps(state, default=str))
+            )
+            self._conn.execute(
+                "UPDATE analysis_sessions SET expires_at = ? WHERE session_id = ?",
+                (self._expiry(), session_id)
+            )
+            self._conn.commit()
+        await self._run(write)
+
+    async def delete(self, session_id: str):
+        def write():
+            self._conn.execute("DELETE FROM analysis_sessions WHERE session_id = ?", (session_id,))
+            self._delete_children(session_id)
+            self._conn.commit()
+        await self._run(write)
+
+    def _purge(self) -> int:
+        expired = [row[0] for row in self._conn.execute(
+            "SELECT session_id FROM analysis_sessions WHERE expires_at < ?", (time.time(),)
+        )]
+        for session_id in expired:
+            self._conn.execute("DELETE FROM analysis_sessions WHERE session_id = ?", (session_id,))
+            self._delete_children(session_id)
+        return len(expired)
+
+    async def purge_expired(self) -> int:
+        def purge():
+            count = self._purge()
+            self._conn.commit()
+            return count
+        return await self._run(purge)
+
+    async def close(self):
+        await self._run(self._conn.close)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REDIS (partagé entre workers et machines)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class RedisSessionStore(SessionStore):
+    """
+    Une session = un hash Redis :
+    - "_session"      : champs de premier niveau à la création (JSON)
+    - "field:<nom>"   : champ de premier niveau modifié par update (JSON)
+    - "bloc:BLOCn"    : état du bloc (JSON)
+    - "result:BLOCn"  : résultat du bloc (JSON)
+    Chaque écriture ne touche que ses propres champs du hash (HSET atomique) :
+    des mises à jour concurrentes, depuis des blocs en parallèle ou d'autres
+    workers, ne s'écrasent pas. Le TTL est renouvelé à chaque écriture (EXPIRE).
+    """
+
+    KEY_PREFIX = "analysis_session:"
+
+    def __init__(self, client: Any, ttl_seconds: int):
+        super().__init__(ttl_seconds)
+        self.client = client
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.KEY_PREFIX}{session_id}"
+
+    @staticmethod
+    def _decode(value: Any) -> Optional[str]:
+        if value is None:
+            return None
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    async def _write(self, session_id: str, mapping: Dict[str, str]):
+        key = self._key(session_id)
+        await self.client.hset(key, mapping=mapping)
+        await self.client.expire(key, self.ttl_seconds)
+
+    @staticmethod
+    def _bloc_fields(bloc_id: str, bloc_state: Dict[str, Any]) -> Dict[str, str]:
+        state, result = _split_bloc_state(bloc_state)
+        fields = {f"bloc:{bloc_id}": json.dumps(state, default=str)}
+        if result is not None:
+            fields[f"result:{bloc_id}"] = json.dumps(result, default=str)
+        return fields
+
+    async def create(self, session_id: str, session: Dict[str, Any]):
+        mapping = {"_session": json.dumps({k: v for k, v in session.items() if k != "blocs"}, default=str)}
+        for bloc_id, bloc_state in session.get("blocs", {}).items():
+            mapping.update(self._bloc_fields(bloc_id, bloc_state))
+        await self.client.delete(self._key(session_id))
+        await self._write(session_id, mapping)
+
+    async def get(self, session_id: str, include_results: bool = True) -> Optional[Dict[str, Any]]:
+        raw = await self.client.hgetall(self._key(session_id))
+        if not raw:
+            return None
+        fields = {self._decode(k): self._decode(v) for k, v in raw.items()}
+        if "_session" not in fields:
+            return None
+        session = json.loads(fields["_session"])
+        session["blocs"] = {}
+        for name in sorted(fields):
+            if name.startswith("field:"):
+                session[name[len("field:"):]] = json.loads(fields[name])
+            elif name.startswith("bloc:"):
+                bloc_id = name[len("bloc:"):]
+                bloc_state = json.loads(fields[name])
+                result = fields.get(f"result:{bloc_id}")
+                if include_results and result is not None:
+                    bloc_state["result"] = json.loads(result)
+                session["blocs"][bloc_id] = bloc_state
+        return session
+
+    async def get_bloc_result(self, session_id: str, bloc_id: str) -> Optional[Dict[str, Any]]:
+        value = self._decode(await self.client.hget(self._key(session_id), f"result:{bloc_id}"))
+        return json.loads(value) if value else None
+
+    async def update(self, session_id: str, **fields):
+        if not fields or not await self.client.exists(self._key(session_id)):
+            return
+        await self._write(session_id, {
+            f"field:{name}": json.dumps(value, default=str) for name, value in fields.items()
+        })
+
+    async def update_bloc(self, session_id: str, bloc_id: str, bloc_state: Dict[str, Any]):
+        if not await self.client.exists(self._key(session_id)):
+            return
+        await self._write(session_id, self._bloc_fields(bloc_id, bloc_state))
+        if bloc_state.get("result") is None:
+            await self.client.hdel(self._key(session_id), f"result:{bloc_id}")
+
+    async def update_bloc_state(self, session_id: str, bloc_id: str, bloc_state: Dict[str, Any]):
+        if not await self.client.exists(self._key(session_id)):
+            return
+        state, _ = _split_bloc_state(bloc_state)
+        await self._write(session_id, {f"bloc:{bloc_id}": json.dumps(state, default=str)})
+
+    async def delete(self, session_id: str):
+        await self.client.delete(self._key(session_id))
+
+    async def close(self):
+        close = getattr(self.client, "aclose", None) or getattr(self.client, "close", None)
+        if close:
+            outcome = close()
+            if asyncio.iscoroutine(outcome):
+                await outcome
+
+
+class LocalRedis:
+    """
+    Stand-in local de redis.asyncio.Redis (sous-ensemble utilisé par
+    RedisSessionStore) : tests sans serveur Redis. Non partagé entre
+    process : ne pas l'utiliser comme stockage de production.
+    """
+
+    def __init__(self):
+        self._hashes: Dict[str, Dict[str, str]] = {}
+        self._expiry: Dict[str, float] = {}
+
+    def _alive(self, key: str) -> bool:
+        expires_at = self._expiry.get(key)
+        if expires_at is not None and expires_at < time.time():
+            self._hashes.pop(key, None)
+            self._expiry.pop(key, None)
+        return key in self._hashes
+
+    async def hset(self, name: str, key: Optional[str] = None, value: Optional[str] = None,
+                   mapping: Optional[Dict[str, str]] = None) -> int:
+        self._alive(name)
+        target = self._hashes.setdefault(name, {})
+        items = dict(mapping or {})
+        if key is not None:
+            items[key] = value
+        added = sum(1 for k in items if k not in target)
+        target.update(items)
+        return added
+
+    async def hget(self, name: str, key: str) -> Optional[str]:
+        return self._hashes.get(name, {}).get(key) if self._alive(name) else None
+
+    async def hdel(self, name: str, *keys: str) -> int:
+        fields = self._hashes.get(name, {}) if self._alive(name) else {}
+        return sum(1 for key in keys if fields.pop(key, None) is not None)
+
+    async def hgetall(self, name: str) -> Dict[str, str]:
+        return dict(self._hashes.get(name, {})) if self._alive(name) else {}
+
+    async def exists(self, *names: str) -> int:
+        return sum(1 for name in names if self._alive(name))
+
+    async def expire(self, name: str, seconds: int) -> bool:
+        if not self._alive(name):
+            return False
+        self._expiry[name] = time.time() + seconds
+        return True
+
+    async def delete(self, *names: str) -> int:
+        deleted = 0
+        for name in names:
+            if self._alive(name):
+                deleted += 1
+            self._hashes.pop(name, None)
+            self._expiry.pop(name, None)
+        return deleted
+
+    async def aclose(self):
+        pass
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FABRIQUE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def create_session_store(backend: Optional[str] = None) -> SessionStore:
+    """
+    Instancie le stockage configuré (SESSION_STORE_BACKEND).
+    Repli sur la mémoire si le backend demandé est indisponible.
+    """
+    backend = (backend or settings.SESSION_STORE_BACKEND).lower()
+    ttl = settings.SESSION_TTL_SECONDS
+
+    if backend == "sqlite":
+        try:
+            store = SQLiteSessionStore(settings.SESSION_SQLITE_PATH, ttl)
+            logger.info(f"Session store: SQLite ({settings.SESSION_SQLITE_PATH})")
+            return store
+        except Exception as e:
+            logger.warning(f"SQLite session store indisponible ({e}) - repli mémoire")
+
+    elif backend == "redis":
+        if settings.REDIS_URL:
+            try:
+                import redis.asyncio as aioredis
+                client = aioredis.from_url(settings.REDIS_URL)
+                logger.info("Session store: Redis")
+                return RedisSessionStore(client, ttl)
+            except ImportError:
+                logger.warning("redis non installé - repli mémoire")
+        else:
+            logger.warning("REDIS_URL non défini - repli mémoire (sessions non partagées entre workers)")
+
+    elif backend != "memory":
+        logger.warning(f"Backend de sessions inconnu: {backend} - repli mémoire")
+
+    return InMemorySessionStore(ttl, settings.SESSION_MAX_ENTRIES)
+
+
+# Instance globale
+session_store = create_session_store()
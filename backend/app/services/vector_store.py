@@ -0,0 +1,610 @@
+"""
+Vector Stores for Africa Strategy RAG
+Pinecone (managed) or local in-process index, selected by RAG_VECTOR_BACKEND
+
+All methods are blocking: RAGService calls them through asyncio.to_thread.
+Filters are plain equality maps ({'country': 'Sénégal', 'sector': 'agriculture'});
+{'$eq': v} and {'$in': [...]} conditions are accepted too.
+"""
+
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pinecone import Pinecone, ServerlessSpec
+    PINECONE_AVAILABLE = True
+except ImportError:
+    PINECONE_AVAILABLE = False
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+# Namespace used by add_documents
+DOCS_NAMESPACE = "africa-strategy-docs"
+
+
+def _conditions(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Drop empty filter values ({'country': ''} means no country filter)"""
+    return {key: value for key, value in (filters or {}).items() if value not in (None, "", [], {})}
+
+
+def _accepted_values(condition: Any) -> List[Any]:
+    if isinstance(condition, dict):
+        if "$in" in condition:
+            return list(condition["$in"])
+        return [condition.get("$eq")]
+    return [condition]
+
+
+def matches_filters(metadata: Dict[str, Any], filters: Optional[Dict[str, Any]]) -> bool:
+    """True if the metadata satisfies every (non-empty) filter condition"""
+    return all(
+        metadata.get(field) in _accepted_values(condition)
+        for field, condition in _conditions(filters).items()
+    )
+
+
+class VectorStore(ABC):
+    """
+    Common interface of the vector stores
+    """
+
+    backend = "base"
+
+    @abstractmethod
+    def dimension(self) -> Optional[int]:
+        """Index dimension (None while a local index is still empty)"""
+
+    @abstractmethod
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = DOCS_NAMESPACE):
+        """Insert or overwrite vectors ({'id', 'values', 'metadata'})"""
+
+    @abstractmethod
+    def existing_ids(self, ids: List[str], namespace: str = DOCS_NAMESPACE) -> Set[str]:
+        """Subset of `ids` already stored in the namespace"""
+
+    @abstractmethod
+    def ids_with_prefix(self, prefix: str, namespace: str = DOCS_NAMESPACE) -> Set[str]:
+        """IDs stored in the namespace that start with `prefix`"""
+
+    @abstractmethod
+    def delete(self, ids: List[str], namespace: str = DOCS_NAMESPACE):
+        """Remove vectors by ID (unknown IDs are ignored)"""
+
+    @abstractmethod
+    def query(self, vector: List[float], top_k: int, filters: Optional[Dict[str, Any]] = None,
+              namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Nearest vectors by cosine similarity: [{'id', 'score', 'metadata'}]"""
+
+    def health(self) -> Dict[str, Any]:
+        return {'backend': self.backend}
+
+    def flush(self):
+        """Persist pending writes (no-op for remote stores)"""
+
+    def close(self):
+        self.flush()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PINECONE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class PineconeVectorStore(VectorStore):
+    """
+    Pinecone serverless index (direct API)
+
+    The index handle and its stats are resolved once and reused for
+    `stats_refresh_seconds`, instead of an Index() + describe_index_stats()
+    round trip on every search and insert.
+    """
+
+    backend = "pinecone"
+
+    def __init__(self, api_key: str, environment: str, index_name: str, stats_refresh_seconds: float = 300.0):
+        self.index_name = index_name
+        self.environment = environment
+        self.stats_refresh_seconds = stats_refresh_seconds
+        self.pc = Pinecone(api_key=api_key)
+        self._lock = threading.Lock()
+        self._index_handle = None
+        self._stats: Optional[Dict[str, Any]] = None
+        self._stats_at = 0.0
+        self._ensure_index_exists()
+
+    def _ensure_index_exists(self):
+        """Ensure Pinecone index exists"""
+        try:
+            if self.index_name not in self.pc.list_indexes().names():
+                logger.info(f"Creating Pinecone index: {self.index_name}")
+                self.pc.create_index(
+                    name=self.index_name,
+                    dimension=384,  # Dimension for all-MiniLM-L6-v2
+                    metric="cosine",
+                    spec=ServerlessSpec(
+                        cloud="aws",
+                        region=self.environment
+                    )
+                )
+                logger.info(f"Created Pinecone index: {self.index_name}")
+            else:
+                logger.info(f"Pinecone index already exists: {self.index_name}")
+        except Exception as e:
+            logger.error(f"Failed to create/verify Pinecone index: {str(e)}")
+
+    def _index(self):
+        if self._index_handle is None:
+            with self._lock:
+                if self._index_handle is None:
+                    self._index_handle = self.pc.Index(self.index_name)
+        return self._index_handle
+
+    def _index_stats(self, force: bool = False) -> Dict[str, Any]:
+        """Cached dimension and vector count; the handle is re-resolved on refresh"""
+        if force or self._stats is None or time.monotonic() - self._stats_at > self.stats_refresh_seconds:
+            with self._lock:
+                self._index_handle = None
+            stats = self._index().describe_index_stats()
+            self._stats = {
+                'dimension': stats.get('dimension', 384),
+                'vector_count': stats.get('total_vector_count', 0)
+            }
+            self._stats_at = time.monotonic()
+        return self._stats
+
+    def dimension(self) -> Optional[int]:
+        return self._index_stats()['dimension']
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = DOCS_NAMESPACE):
+        self._index().upsert(vectors=vectors, namespace=namespace)
+
+    def existing_ids(self, ids: List[str], namespace: str = DOCS_NAMESPACE) -> Set[str]:
+        index = self._index()
+        existing = set()
+        for i in range(0, len(ids), 100):
+            fetched = index.fetch(ids=ids[i:i + 100], namespace=namespace)
+            existing.update(fetched.get('vectors', {}).keys())
+        return existing
+
+    def ids_with_prefix(self, prefix: str, namespace: str = DOCS_NAMESPACE) -> Set[str]:
+        ids = set()
+        for page in self._index().list(prefix=prefix, namespace=namespace):
+            ids.update(page)
+        return ids
+
+    def delete(self, ids: List[str], namespace: str = DOCS_NAMESPACE):
+        index = self._index()
+        for i in range(0, len(ids), 1000):
+            index.delete(ids=ids[i:i + 1000], namespace=namespace)
+
+    def query(self, vector: List[float], top_k: int, filters: Optional[Dict[str, Any]] = None,
+              namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        index = self._index()
+        pinecone_filter = {
+            key: value if isinstance(value, dict) else {'$eq': value}
+            for key, value in _conditions(filters).items()
+        } or None
+
+        if namespace is not None:
+            search_results = index.query(
+                vector=vector,
+                top_k=top_k,
+                include_metadata=True,
+                filter=pinecone_filter,
+                namespace=namespace
+            )
+        else:
+            # Try default namespace first (where import_all_data.py puts data)
+            try:
+                search_results = index.query(
+                    vector=vector,
+                    top_k=top_k,
+                    include_metadata=True,
+                    filter=pinecone_filter
+                )
+            except Exception as e1:
+                # Try with namespace if default fails
+                try:
+                    search_results = index.query(
+                        vector=vector,
+                        top_k=top_k,
+                        include_metadata=True,
+                        filter=pinecone_filter,
+                        namespace=DOCS_NAMESPACE
+                    )
+                except Exception as e2:
+                    raise RuntimeError(f"Failed to query index (both namespaces): {str(e1)} / {str(e2)}")
+
+        return [
+            {
+                'id': match.get('id'),
+                'score': float(match.get('score', 0.0)),
+                'metadata': match.get('metadata') or {}
+            }
+            for match in search_results.get('matches', [])
+        ]
+
+    def health(self) -> Dict[str, Any]:
+        health = {
+            'backend': self.backend,
+            'index_exists': self.index_name in self.pc.list_indexes().names()
+        }
+        if health['index_exists']:
+            health.update(self._index_stats(force=True))
+        return health
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LOCAL (in-process, persisted to disk)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process cosine index over normalized float32 vectors
+
+    - flat: exact search (numpy matrix product), the default
+    - hnsw / ivf: approximate FAISS index, used when faiss-cpu is installed
+      and the metadata filter keeps enough candidates; exact search otherwise
+    - country / sector / category / source filters use an inverted index
+
+    Persisted in `directory` as vectors.npy (memory-mapped on load) and
+    metadata.json, written by flush().
+    """
+
+    backend = "local"
+
+    # Metadata fields with an inverted index
+    INDEXED_FIELDS = ("country", "sector", "category", "source")
+    # Below this share of candidate rows, filtered queries use exact search
+    ANN_MIN_SELECTIVITY = 0.1
+
+    def __init__(self, directory: Optional[str] = None, index_type: str = "flat"):
+        self.directory = directory
+        self.index_type = index_type.lower()
+        if self.index_type not in ("flat", "hnsw", "ivf"):
+            logger.warning(f"Unknown local index type: {index_type} - using flat")
+            self.index_type = "flat"
+        if self.index_type != "flat" and not FAISS_AVAILABLE:
+            logger.warning(f"faiss-cpu not installed - {self.index_type} index replaced by exact search")
+
+        self._lock = threading.RLock()
+        self._buffer = np.empty((0, 0), dtype=np.float32)
+        self._size = 0
+        self._ids: List[str] = []
+        self._namespaces: List[str] = []
+        self._metadata: List[Dict[str, Any]] = []
+        self._rows: Dict[Tuple[str, str], int] = {}
+        self._postings: Dict[str, Dict[Any, Set[int]]] = {field: {} for field in self.INDEXED_FIELDS}
+        self._ann = None
+        self._ann_size = 0
+        self._sorted_keys: Optional[List[Tuple[str, str]]] = None
+        self._dirty = False
+
+        if directory:
+            self._load()
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # STORAGE
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    @property
+    def _vectors(self) -> np.ndarray:
+        return self._buffer[:self._size]
+
+    def _reserve(self, rows: int, dimension: int):
+        """Grow the vector buffer (doubling), copying a read-only memmap into memory"""
+        needed = self._size + rows
+        writable = self._buffer.flags.writeable and not isinstance(self._buffer, np.memmap)
+        if needed <= self._buffer.shape[0] and writable:
+            return
+        capacity = max(needed, 2 * self._buffer.shape[0], 1024)
+        buffer = np.empty((capacity, dimension), dtype=np.float32)
+        if self._size:
+            buffer[:self._size] = self._vectors
+        self._buffer = buffer
+
+    def _index_row(self, row: int, metadata: Dict[str, Any]):
+        for field in self.INDEXED_FIELDS:
+            value = metadata.get(field)
+            if value is not None:
+                self._postings[field].setdefault(value, set()).add(row)
+
+    def _unindex_row(self, row: int, metadata: Dict[str, Any]):
+        for field in self.INDEXED_FIELDS:
+            rows = self._postings[field].get(metadata.get(field))
+            if rows is not None:
+                rows.discard(row)
+
+    def _load(self):
+        vectors_path = os.path.join(self.directory, "vectors.npy")
+        metadata_path = os.path.join(self.directory, "metadata.json")
+        if not (os.path.exists(vectors_path) and os.path.exists(metadata_path)):
+            return
+        try:
+            with open(metadata_path, encoding="utf-8") as f:
+                stored = json.load(f)
+            vectors = np.load(vectors_path, mmap_mode="r")
+            if vectors.shape[0] != len(stored["rows"]):
+                raise ValueError(f"{vectors.shape[0]} vectors for {len(stored['rows'])} metadata rows")
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Failed to load local vector index from {self.directory}: {str(e)}")
+            return
+
+        self._buffer = vectors
+        self._size = vectors.shape[0]
+        for row, entry in enumerate(stored["rows"]):
+            self._ids.append(entry["id"])
+            self._namespaces.append(entry["namespace"])
+            self._metadata.append(entry["metadata"])
+            self._rows[(entry["namespace"], entry["id"])] = row
+            self._index_row(row, entry["metadata"])
+        logger.info(f"Loaded local vector index: {self._size} vectors from {self.directory}")
+
+    def flush(self):
+        if not self.directory or not self._dirty:
+            return
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            vectors_path = os.path.join(self.directory, "vectors.npy")
+            metadata_path = os.path.join(self.directory, "metadata.json")
+            # Write-then-rename: a crash never leaves a half-written index
+            with open(vectors_path + ".tmp", "wb") as f:
+                np.save(f, self._vectors)
+            with open(metadata_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({
+                    "dimension": self.dimension(),
+                    "rows": [
+                        {"id": vector_id, "namespace": namespace, "metadata": metadata}
+                        for vector_id, namespace, metadata in zip(self._ids, self._namespaces, self._metadata)
+                    ]
+                }, f, ensure_ascii=False, default=str)
+            os.replace(vectors_path + ".tmp", vectors_path)
+            os.replace(metadata_path + ".tmp", metadata_path)
+            self._dirty = False
+            logger.info(f"Saved local vector index: {self._size} vectors to {self.directory}")
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # API
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def dimension(self) -> Optional[int]:
+        return self._buffer.shape[1] if self._buffer.shape[0] else None
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = DOCS_NAMESPACE):
+        if not vectors:
+            return
+        matrix = np.asarray([vector['values'] for vector in vectors], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1.0, norms)
+
+        with self._lock:
+            dimension = self.dimension()
+            if dimension is not None and matrix.shape[1] != dimension:
+                raise ValueError(f"Vector dimension {matrix.shape[1]} does not match local index ({dimension})")
+            self._reserve(len(vectors), matrix.shape[1])
+
+            for vector, values in zip(vectors, matrix):
+                key = (namespace, vector['id'])
+                metadata = dict(vector.get('metadata') or {})
+                row = self._rows.get(key)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._rows[key] = row
+                    self._sorted_keys = None
+                    self._ids.append(vector['id'])
+                    self._namespaces.append(namespace)
+                    self._metadata.append(metadata)
+                else:
+                    self._unindex_row(row, self._metadata[row])
+                    self._metadata[row] = metadata
+                    self._ann = None  # overwritten row: approximate index is stale
+                self._buffer[row] = values
+                self._index_row(row, metadata)
+            self._dirty = True
+
+    def existing_ids(self, ids: List[str], namespace: str = DOCS_NAMESPACE) -> Set[str]:
+        with self._lock:
+            return {vector_id for vector_id in ids if (namespace, vector_id) in self._rows}
+
+    def ids_with_prefix(self, prefix: str, namespace: str = DOCS_NAMESPACE) -> Set[str]:
+        with self._lock:
+            # Sorted (namespace, id) keys, rebuilt after inserts and deletes
+            if self._sorted_keys is None:
+                self._sorted_keys = sorted(self._rows)
+            ids = set()
+            for key_namespace, vector_id in self._sorted_keys[bisect.bisect_left(self._sorted_keys, (namespace, prefix)):]:
+                if key_namespace != namespace or not vector_id.startswith(prefix):
+                    break
+                ids.add(vector_id)
+            return ids
+
+    def delete(self, ids: List[str], namespace: str = DOCS_NAMESPACE):
+        with self._lock:
+            rows = sorted({self._rows[(namespace, vector_id)] for vector_id in ids
+                           if (namespace, vector_id) in self._rows}, reverse=True)
+            if not rows:
+                return
+            self._reserve(0, self._buffer.shape[1])  # writable copy of a memory-mapped index
+            # Highest rows first: the last row moved into a freed slot is never one to delete
+            for row in rows:
+                self._unindex_row(row, self._metadata[row])
+                del self._rows[(self._namespaces[row], self._ids[row])]
+                last = self._size - 1
+                if row != last:
+                    self._unindex_row(last, self._metadata[last])
+                    self._buffer[row] = self._buffer[last]
+                    self._ids[row] = self._ids[last]
+                    self._namespaces[row] = self._namespaces[last]
+                    self._metadata[row] = self._metadata[last]
+                    self._rows[(self._namespaces[row], self._ids[row])] = row
+                    self._index_row(row, self._metadata[row])
+                self._ids.pop()
+                self._namespaces.pop()
+                self._metadata.pop()
+                self._size -= 1
+            self._sorted_keys = None
+            self._ann = None  # moved rows: approximate index is stale
+            self._dirty = True
+
+    def _candidates(self, filters: Dict[str, Any], namespace: Optional[str]) -> Optional[np.ndarray]:
+        """Rows matching the filters and namespace (None = every row)"""
+        rows: Optional[Set[int]] = None
+        scanned = {}
+        for field, condition in filters.items():
+            if field not in self.INDEXED_FIELDS:
+                scanned[field] = condition
+                continue
+            matching = set()
+            for value in _accepted_values(condition):
+                matching |= self._postings[field].get(value, set())
+            rows = matching if rows is None else rows & matching
+
+        if rows is None and not scanned and namespace is None:
+            return None
+        if rows is None:
+            rows = range(self._size)
+        selected = [
+            row for row in rows
+            if (namespace is None or self._namespaces[row] == namespace)
+            and matches_filters(self._metadata[row], scanned)
+        ]
+        return np.asarray(sorted(selected), dtype=np.int64)
+
+    def _ann_index(self):
+        """FAISS index over the current rows, rebuilt after overwrites and extended after appends"""
+        if self._ann is not None and self._ann_size == self._size:
+            return self._ann
+        vectors = np.ascontiguousarray(self._vectors)
+        dimension = vectors.shape[1]
+        if self._ann is not None and self.index_type == "hnsw":
+            self._ann.add(vectors[self._ann_size:])
+        else:
+            if self.index_type == "ivf" and self._size >= 1024:
+                nlist = int(np.sqrt(self._size))
+                quantizer = faiss.IndexFlatIP(dimension)
+                index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+                index.train(vectors)
+                index.nprobe = min(nlist, 16)
+            elif self.index_type == "hnsw":
+                index = faiss.IndexHNSWFlat(dimension, 32, faiss.METRIC_INNER_PRODUCT)
+                index.hnsw.efSearch = 64
+            else:
+                index = faiss.IndexFlatIP(dimension)
+            index.add(vectors)
+            self._ann = index
+        self._ann_size = self._size
+        return self._ann
+
+    def query(self, vector: List[float], top_k: int, filters: Optional[Dict[str, Any]] = None,
+              namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        query_vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        if norm:
+            query_vector = query_vector / norm
+
+        with self._lock:
+            if not self._size:
+                return []
+            if query_vector.shape[0] != self.dimension():
+                raise ValueError(f"Query dimension {query_vector.shape[0]} does not match local index ({self.dimension()})")
+
+            candidates = self._candidates(_conditions(filters), namespace)
+            if candidates is not None and not len(candidates):
+                return []
+
+            use_ann = (
+                self.index_type != "flat" and FAISS_AVAILABLE
+                and (candidates is None or len(candidates) >= self.ANN_MIN_SELECTIVITY * self._size)
+            )
+            if use_ann:
+                # Oversample, then keep the hits that pass the filter
+                k = top_k if candidates is None else min(self._size, top_k * 10)
+                scores, rows = self._ann_index().search(query_vector[None, :], k)
+                allowed = None if candidates is None else set(candidates.tolist())
+                hits = [
+                    (int(row), float(score)) for row, score in zip(rows[0], scores[0])
+                    if row >= 0 and (allowed is None or row in allowed)
+                ][:top_k]
+                if len(hits) == min(top_k, self._size if candidates is None else len(candidates)):
+                    return self._format(hits)
+
+            # Exact search over the candidate rows
+            matrix = self._vectors if candidates is None else self._vectors[candidates]
+            scores = matrix @ query_vector
+            k = min(top_k, len(scores))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            rows = best if candidates is None else candidates[best]
+            return self._format([(int(row), float(scores[i])) for row, i in zip(rows, best)])
+
+    def _format(self, hits: List[Tuple[int, float]]) -> List[Dict[str, Any]]:
+        return [
+            {'id': self._ids[row], 'score': score, 'metadata': self._metadata[row]}
+            for row, score in hits
+        ]
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            'backend': self.backend,
+            'index_exists': True,
+            'vectors': self._size,
+            'dimension': self.dimension(),
+            'index_type': self.index_type,
+            'faiss_available': FAISS_AVAILABLE,
+            'directory': self.directory
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FACTORY
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def create_vector_store(backend: Optional[str] = None) -> Optional[VectorStore]:
+    """
+    Instantiate the configured vector store (RAG_VECTOR_BACKEND).
+    Returns None when Pinecone is selected but unavailable (RAG disabled).
+    """
+    backend = (backend or settings.RAG_VECTOR_BACKEND).lower()
+
+    if backend == "local":
+        store = LocalVectorStore(settings.RAG_LOCAL_INDEX_DIR or None, settings.RAG_LOCAL_INDEX_TYPE)
+        logger.info(f"Vector store: local {store.index_type} index ({store.directory or 'in memory'})")
+        return store
+
+    if backend != "pinecone":
+        logger.warning(f"Unknown vector backend: {backend} - using Pinecone")
+
+    if not (settings.PINECONE_API_KEY and settings.PINECONE_ENVIRONMENT):
+        logger.warning("Pinecone credentials not configured - RAG disabled")
+        return None
+    if not PINECONE_AVAILABLE:
+        logger.warning("pinecone not installed - RAG disabled")
+        return None
+    try:
+        store = PineconeVectorStore(
+            settings.PINECONE_API_KEY,
+            settings.PINECONE_ENVIRONMENT,
+            settings.PINECONE_INDEX_NAME,
+            settings.PINECONE_STATS_REFRESH_SECONDS
+        )
+        logger.info(f"Vector store: Pinecone index {settings.PINECONE_INDEX_NAME}")
+        return store
+    except Exception as e:
+        logger.warning(f"Failed to initialize Pinecone: {str(e)}")
+        return None
@@ -0,0 +1,211 @@
+"""
+Benchmark du JSONCleaner : extracteur en une passe vs ancien pipeline
+(regex multiples + boucle caractère par caractère).
+
+Usage :
+    python bench_json_cleaner.py                  # corpus synthétique (60-150 Ko)
+    python bench_json_cleaner.py --corpus DIR     # réponses brutes d'assistants (*.txt, *.json, *.md)
+    python bench_json_cleaner.py --repeat 20
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import statistics
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.json_cleaner import json_cleaner
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ANCIEN PIPELINE (référence)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def legacy_remove_comments(content: str) -> str:
+    result = []
+    i = 0
+    length = len(content)
+    in_string = False
+    string_delim = ''
+    while i < length:
+        char = content[i]
+        if in_string:
+            result.append(char)
+            if char == '\\':
+                if i + 1 < length:
+                    result.append(content[i + 1])
+                    i += 1
+            elif char == string_delim:
+                in_string = False
+            i += 1
+            continue
+        if char in ('"', "'"):
+            in_string = True
+            string_delim = char
+            result.append(char)
+            i += 1
+            continue
+        if char == '/' and i + 1 < length and content[i + 1] == '/':
+            i += 2
+            while i < length and content[i] not in ('\n', '\r'):
+                i += 1
+            continue
+        if char == '/' and i + 1 < length and content[i + 1] == '*':
+            i += 2
+            while i + 1 < length and not (content[i] == '*' and content[i + 1] == '/'):
+                i += 1
+            i += 2
+            continue
+        result.append(char)
+        i += 1
+    return ''.join(result)
+
+
+def legacy_clean(json_str: str) -> str:
+    json_str = legacy_remove_comments(json_str)
+    json_str = re.sub(r',\s*}', '}', json_str)
+    json_str = re.sub(r',\s*]', ']', json_str)
+    json_str = re.sub(r',\s*,+', ',', json_str)
+    json_str = re.sub(r'\n\s*\n+', '\n', json_str)
+    open_braces, close_braces = json_str.count('{'), json_str.count('}')
+    open_brackets, close_brackets = json_str.count('['), json_str.count(']')
+    if open_braces > close_braces:
+        json_str += '}' * (open_braces - close_braces)
+    if open_brackets > close_brackets:
+        json_str += ']' * (open_brackets - close_brackets)
+    json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
+    return json_str.strip()
+
+
+def legacy_extract_and_parse(content: str):
+    match = re.search(r'```json\s*(.*?)\s*```', content, re.DOTALL)
+    if match:
+        json_str = match.group(1).strip()
+    else:
+        match = re.search(r'```\s*(.*?)\s*```', content, re.DOTALL)
+        if match:
+            json_str = match.group(1).strip()
+        else:
+            start, end = content.find('{'), content.rfind('}')
+            if start == -1 or end <= start:
+                raise Exception("Aucun JSON trouvé dans le contenu")
+            json_str = content[start:end + 1]
+    json_str = legacy_clean(json_str)
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        aggressive = re.sub(r'//.*', '', json_str)
+        aggressive = re.sub(r'/\*.*?\*/', '', aggressive, flags=re.DOTALL)
+        aggressive = '\n'.join(line for line in aggressive.split('\n') if line.strip())
+        aggressive = re.sub(r',\s*([}\]])', r'\1', aggressive)
+        aggressive = re.sub(r',\s*,+', ',', aggressive)
+        return json.loads(aggressive)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CORPUS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+DIMENSIONS = ["politique", "economique", "social", "technologique", "environnemental", "legal", "durabilite", "gouvernance"]
+
+PHRASE = (
+    "L'analyse du contexte \\\"{pays}\\\" montre une dynamique contrastée : croissance de {n}% "
+    "portée par les investissements publics, voir https://data.worldbank.org/country/{pays} "
+    "et le rapport 2024 de la BAD. Les {{risques}} [majeurs] restent la dette, l'inflation "
+    "et la dépendance aux importations d'énergie. "
+)
+
+
+def synthetic_output(seed: int, target_kb: int) -> str:
+    """Réponse d'assistant proche d'un BLOC1 : indicateurs, longues analyses, commentaires"""
+    rng = random.Random(seed)
+    pays = rng.choice(["senegal", "cote-d-ivoire", "kenya", "maroc", "nigeria"])
+    lines = ["Voici l'analyse demandée.", "", "```json", "{", '  "indices": {']
+    size = 0
+    index = 0
+    while size < target_kb * 1024:
+        dimension = DIMENSIONS[index % len(DIMENSIONS)]
+        text = "".join(PHRASE.format(pays=pays, n=rng.randint(1, 9)) for _ in range(rng.randint(2, 6)))
+        block = [
+            f'    "{dimension}_{index}": {{  // indicateur {index}',
+            f'      "score": {rng.randint(0, 100)},',
+            f'      "tendance": "{rng.choice(["hausse", "stable", "baisse"])}",',
+            f'      "analyse": "{text}",',
+            '      "sources": ["https://www.afdb.org", "https://www.imf.org/fr",],',
+            "    },",
+        ]
+        if index % 7 == 0:
+            block.insert(1, "      /* valeur estimée */")
+        lines.extend(block)
+        size += sum(len(line) for line in block)
+        index += 1
+    lines.extend(["  },", '  "synthese_strategique": "Synthèse: priorités // à court terme",', "}", "```", "Fin."])
+    return "\n".join(lines)
+
+
+def load_corpus(directory: str):
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith((".txt", ".json", ".md")):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                corpus.append((name, f.read()))
+    return corpus
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MESURE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def measure(fn, content: str, repeat: int):
+    timings = []
+    result = error = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        try:
+            result = fn(content)
+        except Exception as e:
+            error = str(e)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result, error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSONCleaner")
+    parser.add_argument("--corpus", help="Répertoire de réponses brutes d'assistants")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = [(f"synthetic_{kb}k", synthetic_output(kb, kb)) for kb in (60, 90, 120, 150)]
+
+    print(f"{'fichier':<28}{'taille':>10}{'ancien (ms)':>14}{'une passe (ms)':>16}{'gain':>8}  résultat")
+    total_old = total_new = 0.0
+    for name, content in corpus:
+        old_ms, old_result, old_error = measure(legacy_extract_and_parse, content, args.repeat)
+        new_ms, new_result, new_error = measure(json_cleaner.extract_and_parse, content, args.repeat)
+        total_old += old_ms
+        total_new += new_ms
+        if new_error:
+            verdict = f"ÉCHEC: {new_error[:40]}"
+        elif old_error:
+            verdict = "parsé (ancien en échec)"
+        else:
+            verdict = "identique" if old_result == new_result else "DIFFÉRENT"
+        print(f"{name[:27]:<28}{len(content) // 1024:>8}Ko{old_ms:>14.2f}{new_ms:>16.2f}{old_ms / new_ms:>7.1f}x  {verdict}")
+
+    if corpus:
+        print(f"\nTotal : {total_old:.1f} ms → {total_new:.1f} ms ({total_old / total_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark du démarrage du service RAG : import des modules, premier
+chargement (modèle d'embeddings, vector store, index lexical) et première
+recherche, chacun mesuré dans un processus Python neuf (démarrage à froid,
+comme un worker uvicorn recyclé).
+
+Usage :
+    python bench_rag_startup.py                 # import + chargement + 1re recherche
+    python bench_rag_startup.py --import-only   # sans charger le modèle ni joindre l'index
+    python bench_rag_startup.py --repeat 5
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Exécuté dans chaque processus neuf : temps de chaque étape en ms (JSON sur stdout)
+PROBE = r"""
+import sys, json, time, asyncio, logging
+logging.disable(logging.CRITICAL)
+timings = {}
+
+started = time.perf_counter()
+from app.services.rag_service import rag_service
+timings["import rag_service"] = time.perf_counter() - started
+
+started = time.perf_counter()
+import app.services.ai_service
+timings["import ai_service"] = time.perf_counter() - started
+
+if not IMPORT_ONLY:
+    async def first_use():
+        started = time.perf_counter()
+        await rag_service.initialize()
+        timings["premier chargement"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await rag_service.search_context("test", top_k=1)
+        timings["première recherche"] = time.perf_counter() - started
+    asyncio.run(first_use())
+
+print(json.dumps({step: seconds * 1000 for step, seconds in timings.items()}))
+"""
+
+
+def run_probe(import_only: bool):
+    code = f"IMPORT_ONLY = {import_only}\n{PROBE}"
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else "échec")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du démarrage RAG")
+    parser.add_argument("--import-only", action="store_true", help="Mesurer uniquement les imports")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    samples = {}
+    for run in range(args.repeat):
+        try:
+            timings = run_probe(args.import_only)
+        except RuntimeError as e:
+            print(f"❌ Exécution {run + 1} en échec : {e}")
+            return
+        for step, ms in timings.items():
+            samples.setdefault(step, []).append(ms)
+
+    print(f"{'étape':<24}{'médiane (ms)':>14}{'min (ms)':>12}{'max (ms)':>12}")
+    for step, values in samples.items():
+        print(f"{step:<24}{statistics.median(values):>14.1f}{min(values):>12.1f}{max(values):>12.1f}")
+
+    imports = [a + b for a, b in zip(samples["import rag_service"], samples["import ai_service"])]
+    print(f"\nCoût au démarrage du worker (imports) : {statistics.median(imports):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+Configuration pytest : rend le package app importable depuis backend/
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,37 @@
+"""
+Tests of the OpenRouter calls of EnhancedAIService
+"""
+import httpx
+import pytest
+
+from app.services import ai_service as module
+from app.services.ai_service import EnhancedAIService
+
+
+class FakeClient:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    async def post(self, url, json):
+        return self.responses.pop(0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [
+    "<html><body>429 Too Many Requests</body></html>",
+    '{"error": "Rate limit exceeded"}',
+])
+async def test_rate_limit_with_unexpected_body_is_retried(monkeypatch, body):
+    penalties = []
+    monkeypatch.setattr(module.rate_limiter, "penalize",
+                        lambda provider, retry_after, model=None: penalties.append((provider, retry_after)))
+    service = EnhancedAIService()
+    service.client = FakeClient([
+        httpx.Response(429, headers={"retry-after": "0"}, text=body),
+        httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}], "usage": {}}),
+    ])
+
+    answer = await service._call_openrouter("model", [{"role": "user", "content": "question"}])
+
+    assert answer == "ok"
+    assert penalties == [("openrouter", 0.0)]
@@ -0,0 +1,37 @@
+"""
+Tests du broker d'événements des sessions d'analyse (flux SSE)
+"""
+import asyncio
+
+import pytest
+
+from app.services.analysis_events import AnalysisEventBroker, format_sse
+
+
+@pytest.mark.asyncio
+async def test_notify_wakes_waiters():
+    broker = AnalysisEventBroker()
+    waiter = asyncio.create_task(broker.wait("s1", broker.version("s1"), timeout=1))
+    await asyncio.sleep(0)
+
+    broker.notify("s1")
+    assert await waiter
+    assert broker.version("s1") == 1
+    assert not await broker.wait("s1", 1, timeout=0.01)
+
+
+@pytest.mark.asyncio
+async def test_forget_wakes_waiters_and_releases_session():
+    broker = AnalysisEventBroker()
+    broker.notify("s1")
+    waiter = asyncio.create_task(broker.wait("s1", 1, timeout=1))
+    await asyncio.sleep(0)
+
+    broker.forget("s1")
+    assert await waiter
+    assert broker._versions == {}
+    assert broker._events == {}
+
+
+def test_format_sse():
+    assert format_sse("done", {"status": "terminé"}) == 'event: done\ndata: {"status": "terminé"}\n\n'
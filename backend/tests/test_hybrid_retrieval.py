@@ -0,0 +1,113 @@
+"""
+Tests de la recherche lexicale (BM25Index) et de la fusion des résultats
+"""
+import pytest
+
+from app.services.hybrid_retrieval import BM25Index, reciprocal_rank_fusion, tokenize
+from app.services.rag_service import RAGService
+
+
+def _corpus(size=40):
+    chunks = [
+        {'id': f'c{i}', 'content': f"Secteur agricole en Afrique, rapport {i}", 'metadata': {'country': 'SN'}}
+        for i in range(size)
+    ]
+    chunks.append({'id': 'ndgain', 'content': "Indice ND-GAIN du Sénégal en Afrique", 'metadata': {'country': 'SN'}})
+    return chunks
+
+
+def test_rare_match_only_for_specific_terms():
+    index = BM25Index()
+    index.add(_corpus())
+
+    common = index.search("Tendances secteur Afrique", 50)
+    assert common and not any(match['rare_match'] for match in common)
+
+    specific = {match['id']: match for match in index.search("Score ND-GAIN Afrique", 50)}
+    assert specific['ndgain']['rare_match']
+    assert not specific['c0']['rare_match']
+
+
+def test_common_lexical_hits_do_not_bypass_score_cutoff():
+    weak_common = {'score': 0.2, 'lexical_score': 1.3, 'lexical_rare': False}
+    weak_rare = {'score': -0.1, 'lexical_score': 4.0, 'lexical_rare': True}
+    strong = {'score': 0.8}
+
+    assert not RAGService._confident(weak_common, 0.7)
+    assert RAGService._confident(weak_rare, 0.7)
+    assert RAGService._confident(strong, 0.7)
+
+
+def test_bm25_ranks_by_term_specificity_and_filters():
+    index = BM25Index()
+    index.add([
+        {'id': 'wgi', 'content': "Indicateurs WGI de gouvernance", 'metadata': {'country': 'SN'}},
+        {'id': 'gov', 'content': "Gouvernance et gouvernance locale", 'metadata': {'country': 'SN'}},
+        {'id': 'ci', 'content': "Gouvernance en Côte d'Ivoire", 'metadata': {'country': 'CI'}},
+    ])
+
+    assert [match['id'] for match in index.search("WGI gouvernance", 3)][0] == 'wgi'
+    assert [match['id'] for match in index.search("gouvernance", 3, {'country': 'CI'})] == ['ci']
+    assert index.search("inconnu", 3) == []
+    assert index.search("de la", 3) == []  # mots vides uniquement
+
+
+def test_bm25_tokenizer_folds_accents_and_splits_hyphens():
+    assert tokenize("Énergie ND-GAIN") == ['energie', 'nd-gain', 'nd', 'gain']
+
+    index = BM25Index()
+    index.add([{'id': 'a', 'content': "Indice ND-GAIN", 'metadata': {}}])
+    assert [match['id'] for match in index.search("gain", 1)] == ['a']
+    assert [match['id'] for match in index.search("energie indice", 1)] == ['a']
+
+
+def test_bm25_reindex_replaces_content():
+    index = BM25Index()
+    index.add([{'id': 'a', 'content': "agriculture", 'metadata': {}}])
+    index.add([{'id': 'a', 'content': "energie solaire", 'metadata': {}}])
+
+    assert index.search("agriculture", 1) == []
+    assert [match['id'] for match in index.search("solaire", 1)] == ['a']
+    assert index.stats()['chunks'] == 1
+
+
+def test_bm25_persists_chunks(tmp_path):
+    path = str(tmp_path / "lexical.db")
+    index = BM25Index(path)
+    index.add([{'id': 'a', 'content': "Indice ND-GAIN", 'metadata': {'country': 'SN'}}])
+    index.close()
+
+    reloaded = BM25Index(path)
+    assert reloaded.stats() == {'chunks': 1, 'terms': 4, 'persistent': True}
+    assert reloaded.search("nd-gain", 1)[0]['metadata'] == {'country': 'SN'}
+    reloaded.close()
+
+
+def test_bm25_remove_by_prefix(tmp_path):
+    path = str(tmp_path / "lexical.db")
+    index = BM25Index(path)
+    index.add([
+        {'id': 'doc1_a', 'content': "agriculture cacao", 'metadata': {}},
+        {'id': 'doc1_b', 'content': "energie solaire", 'metadata': {}},
+        {'id': 'doc2_a', 'content': "agriculture coton", 'metadata': {}},
+    ])
+
+    assert index.ids_with_prefix('doc1_') == {'doc1_a', 'doc1_b'}
+    index.remove(['doc1_a', 'unknown'])
+    assert index.ids_with_prefix('doc1_') == {'doc1_b'}
+    assert [match['id'] for match in index.search("agriculture", 5)] == ['doc2_a']
+    index.close()
+
+    reloaded = BM25Index(path)
+    assert reloaded.ids_with_prefix('doc') == {'doc1_b', 'doc2_a'}
+    reloaded.close()
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['c', 'a']], k=60)
+
+    assert fused['a'] == pytest.approx(1 / 61 + 1 / 62)
+    assert fused['b'] == pytest.approx(1 / 62)
+    assert fused['c'] == pytest.approx(1 / 63 + 1 / 61)
+    assert sorted(fused, key=fused.get, reverse=True) == ['a', 'c', 'b']
+    assert reciprocal_rank_fusion([]) == {}
@@ -0,0 +1,53 @@
+"""
+Tests de l'extraction et de la réparation des JSON de blocs (JSONCleaner)
+"""
+import json
+
+import pytest
+
+from app.services.json_cleaner import JSONCleaner, JSONParseError
+
+
+SAMPLE = {
+    "indices": {
+        "stabilite": {"score": 72, "commentaire": "Chemin C:\\data\\bloc \"cité\" \u00e9t\u00e9"},
+        "climat": {"score": 41.5, "actif": True, "source": None},
+    },
+    "listes": [1, -2.5, "a\\", "b\\\\", "\\u0041"],
+    "synthese": "Fin de l'analyse",
+}
+
+
+def test_complete_json_with_surrounding_text():
+    content = "Voici l'analyse :\n```json\n" + json.dumps(SAMPLE, ensure_ascii=False) + "\n```\nFin."
+    assert JSONCleaner.extract_and_parse(content) == SAMPLE
+
+
+@pytest.mark.parametrize("ensure_ascii", [False, True])
+def test_every_truncation_point_is_repaired(ensure_ascii):
+    text = json.dumps(SAMPLE, ensure_ascii=ensure_ascii)
+    start = text.index("{", 1)
+    for cut in range(start + 1, len(text)):
+        try:
+            result = JSONCleaner.extract_and_parse(text[:cut])
+        except JSONParseError as e:
+            pytest.fail(f"coupure à {cut} ({text[max(0, cut - 12):cut]!r}): {e}")
+        assert isinstance(result, dict)
+
+
+@pytest.mark.parametrize("truncated, value", [
+    ('{"a": "x\\\\', "x\\"),        # \\ complet conservé
+    ('{"a": "x\\', "x"),             # \ seul retiré
+    ('{"a": "x\\\\\\', "x\\"),      # \\ + \ coupé
+    ('{"a": "x\\u00', "x"),          # \u incomplet retiré
+    ('{"a": "x\\\\u00', "x\\u00"),  # \\ suivi du texte u00
+])
+def test_trailing_backslashes_in_truncated_string(truncated, value):
+    result = JSONCleaner.extract_and_parse(truncated)
+    assert result["a"] == value
+    assert result["_repair"]["structural"]
+
+
+def test_no_json_raises():
+    with pytest.raises(JSONParseError):
+        JSONCleaner.extract_and_parse("Aucune donnée")
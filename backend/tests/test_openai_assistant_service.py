@@ -0,0 +1,216 @@
+"""
+Tests du streaming des runs Assistants (OpenAIAssistantService._stream_run)
+"""
+from types import SimpleNamespace
+
+import pytest
+from openai.types.beta.threads import Run
+from openai.types.beta.threads.runs import RunStep, RunStepDeltaEvent
+
+from app.services.openai_assistant_service import OpenAIAssistantService
+
+
+def _event(kind, data):
+    return SimpleNamespace(event=kind, data=data)
+
+
+def _run(status):
+    return Run.model_construct(id="run_1", thread_id="thread_1", status=status, usage=None)
+
+
+def _step():
+    return RunStep.model_construct(id="step_1", run_id="run_1", thread_id="thread_1", status="in_progress")
+
+
+def _step_delta():
+    # file_search : les deltas d'étape n'ont pas de thread_id
+    return RunStepDeltaEvent.model_construct(id="step_1", object="thread.run.step.delta", delta=None)
+
+
+def _message(text):
+    return SimpleNamespace(
+        role="assistant",
+        content=[SimpleNamespace(text=SimpleNamespace(value=text))]
+    )
+
+
+class FakeStream:
+    """Flux d'événements ; lève `error` une fois les événements épuisés"""
+
+    def __init__(self, events, error=None):
+        self.events = events
+        self.error = error
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for event in self.events:
+            yield event
+        if self.error:
+            raise self.error
+
+
+def _service(stream):
+    async def create_and_run(**kwargs):
+        return stream
+
+    service = OpenAIAssistantService()
+    service.client = SimpleNamespace(
+        beta=SimpleNamespace(threads=SimpleNamespace(create_and_run=create_and_run))
+    )
+    return service
+
+
+@pytest.mark.asyncio
+async def test_step_events_do_not_replace_active_run():
+    stream = FakeStream([
+        _event("thread.run.created", _run("queued")),
+        _event("thread.run.step.created", _step()),
+        _event("thread.run.step.delta", _step_delta()),
+        _event("thread.message.completed", _message('{"ok": true}')),
+        _event("thread.run.step.completed", _step()),
+        _event("thread.run.completed", _run("completed")),
+    ])
+    active = {}
+    run, content = await _service(stream)._stream_run({}, "asst_1", "BLOC1", active=active)
+
+    assert active == {"thread_id": "thread_1", "run_id": "run_1"}
+    assert run.id == "run_1"
+    assert content == '{"ok": true}'
+
+
+@pytest.mark.asyncio
+async def test_interrupted_stream_falls_back_on_run_not_step():
+    stream = FakeStream([
+        _event("thread.run.created", _run("queued")),
+        _event("thread.run.in_progress", _run("in_progress")),
+        _event("thread.run.step.created", _step()),
+        _event("thread.run.step.delta", _step_delta()),
+    ], error=ConnectionError("flux coupé"))
+    run, content = await _service(stream)._stream_run({}, "asst_1", "BLOC1", active={})
+
+    # Le polling de repli interroge le run, pas l'étape
+    assert isinstance(run, Run)
+    assert run.id == "run_1"
+    assert content is None
+
+
+
+def _delta(text):
+    return SimpleNamespace(delta=SimpleNamespace(content=[SimpleNamespace(text=SimpleNamespace(value=text))]))
+
+
+@pytest.mark.asyncio
+async def test_progress_reports_estimated_then_real_tokens():
+    completed = Run.model_construct(
+        id="run_1", thread_id="thread_1", status="completed",
+        usage=SimpleNamespace(prompt_tokens=50, completion_tokens=7, total_tokens=57)
+    )
+    stream = FakeStream([
+        _event("thread.run.created", _run("queued")),
+        _event("thread.message.delta", _delta('{"a": "1234567890')),
+        _event("thread.message.delta", _delta('"}')),
+        _event("thread.run.completed", completed),
+    ])
+    updates = []
+    await _service(stream)._stream_run(
+        {}, "asst_1", "BLOC1", on_progress=lambda bloc_id, progress: updates.append(progress), active={}
+    )
+
+    # Tokens estimés sur le texte reçu (16 caractères, un seul delta), l'usage réel à la fin
+    assert updates[0]["estimated_tokens"] == 4
+    assert "completion_tokens" not in updates[0]
+    assert updates[-1]["done"] and updates[-1]["completion_tokens"] == 7
+
+class FakeCache:
+    def __init__(self):
+        self.stored = {}
+
+    async def get(self, key):
+        return None
+
+    async def set(self, key, bloc_id, result):
+        self.stored[key] = result
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("repair, cached", [
+    (None, True),
+    ({"structural": [], "synthesized": [], "clamped": ["indices.x.score"]}, True),
+    ({"structural": ["closed 2 brackets"], "synthesized": [], "clamped": []}, False),
+    ({"structural": [], "synthesized": ["indices.x"], "clamped": []}, False),
+])
+async def test_repaired_results_are_not_cached(monkeypatch, repair, cached):
+    from app.services import openai_assistant_service as module
+
+    cache = FakeCache()
+    monkeypatch.setattr(module, "bloc_cache", cache)
+    monkeypatch.setattr(module.settings, "BLOC_CACHE_ENABLED", True)
+    service = OpenAIAssistantService()
+
+    async def execute_bloc(*args):
+        return {"indices": {}, "_metadata": {"repair": repair}}
+
+    monkeypatch.setattr(service, "_execute_bloc", execute_bloc)
+    await service._run_bloc("BLOC1", {}, {})
+
+    assert bool(cache.stored) is cached
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("session_deadline, recorded", [(None, True), (0.05, False)])
+async def test_timed_out_runs_feed_the_latency_budget(monkeypatch, session_deadline, recorded):
+    import asyncio
+    import time
+
+    from app.services.resilience import DeadlineExceeded
+
+    service = OpenAIAssistantService()
+    service.latency.default_budget = 0.1
+    cancelled = []
+
+    async def hanging_run(bloc_id, assistant_id, user_message, on_progress, active):
+        active.update(thread_id="thread_1", run_id="run_1")
+        await asyncio.sleep(10)
+
+    async def cancel_run(bloc_id, active):
+        cancelled.append(active["run_id"])
+
+    monkeypatch.setattr(service, "_run_to_completion", hanging_run)
+    monkeypatch.setattr(service, "_cancel_run", cancel_run)
+
+    deadline = None if session_deadline is None else time.monotonic() + session_deadline
+    with pytest.raises(DeadlineExceeded):
+        await service._execute_bloc("BLOC1", "asst_1", "message", None, 5, deadline=deadline)
+
+    assert cancelled == ["run_1"]
+    samples = service.latency._samples.get("BLOC1", ())
+    assert bool(samples) is recorded
+    if recorded:
+        assert samples[0] >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_runs_pause_the_openai_budget(monkeypatch):
+    import httpx
+    from openai import RateLimitError
+
+    from app.services import openai_assistant_service as module
+
+    penalties = []
+    monkeypatch.setattr(module.rate_limiter, "penalize",
+                        lambda provider, retry_after, model=None: penalties.append((provider, retry_after)))
+    service = OpenAIAssistantService()
+
+    async def rate_limited_run(bloc_id, assistant_id, user_message, on_progress, active):
+        request = httpx.Request("POST", "https://api.openai.com/v1/threads/runs")
+        response = httpx.Response(429, headers={"retry-after": "7"}, request=request)
+        raise RateLimitError("Rate limit reached", response=response, body=None)
+
+    monkeypatch.setattr(service, "_run_to_completion", rate_limited_run)
+
+    with pytest.raises(RateLimitError):
+        await service._execute_bloc("BLOC1", "asst_1", "message", None, 5)
+
+    assert penalties == [("openai", 7.0)]
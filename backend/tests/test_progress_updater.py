@@ -0,0 +1,82 @@
+"""
+Tests du suivi des blocs d'une session (main_simple : progression, fin en erreur)
+"""
+import pytest
+
+from app import main_simple
+from app.services.session_store import InMemorySessionStore
+
+
+class RecordingStore(InMemorySessionStore):
+    def __init__(self):
+        super().__init__(ttl_seconds=60, max_entries=10)
+        self.writes = []
+
+    async def update_bloc(self, session_id, bloc_id, bloc_state):
+        self.writes.append(("full", bloc_state.get("result")))
+        await super().update_bloc(session_id, bloc_id, bloc_state)
+
+    async def update_bloc_state(self, session_id, bloc_id, bloc_state):
+        self.writes.append(("state", None))
+        await super().update_bloc_state(session_id, bloc_id, bloc_state)
+
+
+@pytest.mark.asyncio
+async def test_partial_result_written_only_when_sections_change(monkeypatch):
+    store = RecordingStore()
+    monkeypatch.setattr(main_simple, "session_store", store)
+    await store.create("s1", {"status": "running", "blocs": {"BLOC2": {"status": "pending"}}})
+    state = {"status": "running"}
+    update = main_simple._progress_updater("s1", state)
+
+    await update("BLOC2", {"chars": 10, "partial_text": "{", "partial_result": {}})
+    await update("BLOC2", {"chars": 20, "partial_text": '{"a": 1', "partial_result": {}})
+    await update("BLOC2", {"chars": 30, "partial_text": '{"a": 1,', "partial_result": {"a": 1}})
+    await update("BLOC2", {"chars": 40, "partial_text": '{"a": 1, "b"', "partial_result": {"a": 1}})
+
+    assert [kind for kind, _ in store.writes] == ["state", "state", "full", "state"]
+    assert await store.get_bloc_result("s1", "BLOC2") == {"a": 1}
+    assert (await store.get("s1", include_results=False))["blocs"]["BLOC2"]["progress"]["chars"] == 40
+
+
+@pytest.mark.asyncio
+async def test_retry_clears_partial_result(monkeypatch):
+    store = RecordingStore()
+    monkeypatch.setattr(main_simple, "session_store", store)
+    await store.create("s1", {"status": "running", "blocs": {"BLOC2": {"status": "pending"}}})
+    state = {"status": "running"}
+    update = main_simple._progress_updater("s1", state)
+
+    await update("BLOC2", {"chars": 30, "partial_text": '{"a": 1,', "partial_result": {"a": 1}})
+    await update("BLOC2", {"retry": 1, "retry_in_seconds": 2.0, "last_error": "timeout"})
+
+    assert "result" not in state
+    assert await store.get_bloc_result("s1", "BLOC2") is None
+    progress = (await store.get("s1"))["blocs"]["BLOC2"]["progress"]
+    assert progress["retry"] == 1 and "sections" not in progress
+
+    # Les sections de la nouvelle tentative sont publiées à nouveau
+    await update("BLOC2", {"chars": 12, "partial_text": '{"a": 2,', "partial_result": {"a": 2}})
+    assert await store.get_bloc_result("s1", "BLOC2") == {"a": 2}
+
+
+@pytest.mark.asyncio
+async def test_unexpected_failure_closes_unfinished_blocs(monkeypatch):
+    store = InMemorySessionStore(ttl_seconds=60, max_entries=10)
+    monkeypatch.setattr(main_simple, "session_store", store)
+    await store.create("s1", {
+        "status": "running",
+        "questionnaire_data": {},
+        "blocs": {"BLOC2": {"status": "running"}, "BLOC3": {"status": "pending"}}
+    })
+
+    async def broken_scheduler(*args, **kwargs):
+        raise RuntimeError("scheduler crashed")
+
+    monkeypatch.setattr(main_simple.bloc_scheduler, "run", broken_scheduler)
+    await main_simple._run_remaining_blocs("s1")
+
+    session = await store.get("s1")
+    assert session["status"] == "error"
+    for bloc_id in ("BLOC2", "BLOC3"):
+        assert session["blocs"][bloc_id] == {"status": "error", "error": "scheduler crashed"}
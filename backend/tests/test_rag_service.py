@@ -0,0 +1,64 @@
+"""
+Tests of RAGService indexing checks
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.rag_service import RAGService
+
+
+def _service(index_dimension, model_dimension=384):
+    service = RAGService()
+    service.store = SimpleNamespace(dimension=lambda: index_dimension)
+    service.embedder = SimpleNamespace(dimension=model_dimension)
+    return service
+
+
+@pytest.mark.parametrize("index_dimension", [256, 768])
+def test_dimension_mismatch_disables_rag(index_dimension):
+    service = _service(index_dimension)
+    service._check_dimension()
+
+    assert service.dimension_error
+    assert str(index_dimension) in service.dimension_error
+
+
+@pytest.mark.parametrize("index_dimension", [None, 384])
+def test_matching_or_empty_index_is_accepted(index_dimension):
+    service = _service(index_dimension)
+    service._check_dimension()
+
+    assert service.dimension_error is None
+
+
+def test_reimported_document_loses_its_stale_chunks():
+    from app.services.hybrid_retrieval import BM25Index
+    from app.services.vector_store import LocalVectorStore, DOCS_NAMESPACE
+
+    service = RAGService()
+    service.store = LocalVectorStore()
+    service.lexical_index = BM25Index()
+    doc = {'source': 'database_regulatory', 'category': 'regulatory', 'metadata': {'doc_id': '7'}}
+    other = {'source': 'database_regulatory', 'category': 'regulatory', 'metadata': {'doc_id': '8'}}
+
+    old_ids = [service._vector_id(doc, "ancien texte"), service._vector_id(doc, "texte commun")]
+    other_id = service._vector_id(other, "ancien texte")
+    ids = old_ids + [other_id]
+    service.store.upsert([{'id': vector_id, 'values': [1.0, 0.0], 'metadata': {}} for vector_id in ids])
+    service.lexical_index.add([{'id': vector_id, 'content': "texte", 'metadata': {}} for vector_id in ids])
+
+    # New content keeps "texte commun" and drops "ancien texte"
+    prefix = service._document_prefix(doc)
+    produced = {prefix: {service._vector_id(doc, "texte commun"), service._vector_id(doc, "nouveau texte")}}
+    assert service._remove_stale_chunks(produced, DOCS_NAMESPACE) == 1
+
+    assert service.store.existing_ids(ids) == {old_ids[1], other_id}
+    assert service.lexical_index.ids_with_prefix("database_regulatory_") == {old_ids[1], other_id}
+
+
+def test_documents_without_doc_id_have_no_shared_prefix():
+    doc = {'source': 'manual', 'category': 'general', 'metadata': {}}
+
+    assert RAGService._document_prefix(doc) is None
+    assert RAGService._vector_id(doc, "a") != RAGService._vector_id(doc, "b")
@@ -0,0 +1,66 @@
+"""
+Tests du limiteur de débit des appels LLM (RateLimiter)
+"""
+import asyncio
+
+import pytest
+
+from app.services.rate_limiter import RateLimiter, PRIORITY_INTERACTIVE, PRIORITY_NORMAL
+
+
+@pytest.mark.asyncio
+async def test_admit_does_not_hold_an_in_flight_slot():
+    limiter = RateLimiter()
+    limiter.configure("openai", max_in_flight=1)
+
+    permit = await limiter.admit("openai", tokens=100)
+    assert limiter.stats()["scopes"]["openai"]["in_flight"] == 0
+
+    permit.record_tokens(250)
+    assert permit.estimated_tokens == 250
+
+
+@pytest.mark.asyncio
+async def test_long_runs_do_not_block_interactive_calls():
+    limiter = RateLimiter()
+    limiter.configure("openai", max_in_flight=1)
+    limiter.configure("openai_runs", max_in_flight=2)
+    release = asyncio.Event()
+
+    async def run():
+        async with limiter.limit("openai_runs", priority=PRIORITY_NORMAL):
+            await limiter.admit("openai", tokens=100, priority=PRIORITY_NORMAL)
+            await release.wait()
+
+    runs = [asyncio.create_task(run()) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    async def chat():
+        async with limiter.limit("openai", tokens=10, priority=PRIORITY_INTERACTIVE):
+            return True
+
+    assert await asyncio.wait_for(chat(), timeout=1)
+    assert limiter.stats()["scopes"]["openai_runs"]["in_flight"] == 2
+
+    release.set()
+    await asyncio.gather(*runs)
+    assert limiter.stats()["scopes"]["openai_runs"]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_waiters_served_by_priority():
+    limiter = RateLimiter()
+    limiter.configure("openai", max_in_flight=1)
+    order = []
+
+    async def call(name, priority):
+        async with limiter.limit("openai", priority=priority):
+            order.append(name)
+
+    async with limiter.limit("openai"):
+        background = asyncio.create_task(call("background", PRIORITY_NORMAL))
+        interactive = asyncio.create_task(call("interactive", PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0)
+    await asyncio.gather(background, interactive)
+
+    assert order == ["interactive", "background"]
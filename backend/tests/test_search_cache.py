@@ -0,0 +1,33 @@
+"""
+Tests du cache des résultats de recherche RAG (SearchResultCache)
+"""
+import pytest
+
+from app.services.search_cache import SearchResultCache, search_cache_key
+
+
+@pytest.mark.asyncio
+async def test_hit_after_set_under_same_generation():
+    cache = SearchResultCache()
+    key = search_cache_key("Tendances  Agriculture", {"country": "SN"}, 5)
+    generation, found = await cache.get_many([key])
+    assert found == {}
+
+    await cache.set_many(generation, {key: [{"id": "a"}]})
+    _, found = await cache.get_many([search_cache_key("tendances agriculture", {"country": "SN"}, 5)])
+    assert found == {key: [{"id": "a"}]}
+
+
+@pytest.mark.asyncio
+async def test_write_from_older_generation_is_dropped():
+    cache = SearchResultCache()
+    key = search_cache_key("q", None, 5)
+    generation, _ = await cache.get_many([key])
+
+    # add_documents pendant la recherche
+    await cache.invalidate()
+    await cache.set_many(generation, {key: [{"id": "stale"}]})
+
+    _, found = await cache.get_many([key])
+    assert found == {}
+    assert cache.stats()["stale_writes"] == 1
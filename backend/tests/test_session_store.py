@@ -0,0 +1,200 @@
+"""
+Tests des stockages de sessions d'analyse (mémoire, SQLite, Redis local)
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.session_store import (
+    SessionStore, InMemorySessionStore, SQLiteSessionStore, RedisSessionStore, LocalRedis,
+    create_session_store
+)
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield InMemorySessionStore(ttl_seconds=60, max_entries=10)
+    elif request.param == "sqlite":
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl_seconds=60)
+        yield store
+        asyncio.run(store.close())
+    else:
+        yield RedisSessionStore(LocalRedis(), ttl_seconds=60)
+
+
+def _session():
+    return {
+        "status": "running",
+        "started_at": "2026-01-01T00:00:00",
+        "metadata": {"secteur": "C10"},
+        "blocs": {
+            "BLOC1": {"status": "pending"},
+            "BLOC2": {"status": "pending"},
+        }
+    }
+
+
+@pytest.mark.asyncio
+async def test_create_and_get(store):
+    await store.create("s1", _session())
+
+    session = await store.get("s1")
+    assert session["status"] == "running"
+    assert session["metadata"] == {"secteur": "C10"}
+    assert session["blocs"] == {"BLOC1": {"status": "pending"}, "BLOC2": {"status": "pending"}}
+    assert await store.exists("s1")
+    assert await store.get("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_bloc_results_are_stored_apart(store):
+    await store.create("s1", _session())
+    await store.update_bloc("s1", "BLOC1", {"status": "completed", "result": {"indices": {"a": 1}}})
+
+    light = await store.get("s1", include_results=False)
+    assert light["blocs"]["BLOC1"] == {"status": "completed"}
+    full = await store.get("s1")
+    assert full["blocs"]["BLOC1"]["result"] == {"indices": {"a": 1}}
+    assert await store.get_bloc_result("s1", "BLOC1") == {"indices": {"a": 1}}
+
+    # Un état sans résultat supprime le résultat précédent (nouvelle tentative)
+    await store.update_bloc("s1", "BLOC1", {"status": "running"})
+    assert await store.get_bloc_result("s1", "BLOC1") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_updates_keep_every_field(store):
+    await store.create("s1", _session())
+
+    await asyncio.gather(
+        store.update("s1", status="completed"),
+        store.update("s1", error=None, finished_at="2026-01-01T00:10:00"),
+        store.update_bloc("s1", "BLOC1", {"status": "completed"}),
+        store.update_bloc("s1", "BLOC2", {"status": "error"}),
+    )
+
+    session = await store.get("s1")
+    assert session["status"] == "completed"
+    assert session["error"] is None
+    assert session["finished_at"] == "2026-01-01T00:10:00"
+    assert session["started_at"] == "2026-01-01T00:00:00"
+    assert session["blocs"]["BLOC1"] == {"status": "completed"}
+    assert session["blocs"]["BLOC2"] == {"status": "error"}
+
+
+@pytest.mark.asyncio
+async def test_updates_of_unknown_session_are_ignored(store):
+    await store.update("missing", status="completed")
+    await store.update_bloc("missing", "BLOC1", {"status": "completed"})
+    assert await store.get("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_create_replaces_previous_session(store):
+    await store.create("s1", _session())
+    await store.update("s1", status="error")
+    await store.update_bloc("s1", "BLOC1", {"status": "error", "result": {"x": 1}})
+
+    await store.create("s1", _session())
+    session = await store.get("s1")
+    assert session["status"] == "running"
+    assert session["blocs"]["BLOC1"] == {"status": "pending"}
+
+
+@pytest.mark.asyncio
+async def test_delete(store):
+    await store.create("s1", _session())
+    await store.delete("s1")
+    assert await store.get("s1") is None
+    assert not await store.exists("s1")
+
+
+@pytest.mark.asyncio
+async def test_expired_sessions_are_not_served(store, monkeypatch):
+    await store.create("s1", _session())
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+
+    assert await store.get("s1") is None
+    await store.purge_expired()
+    assert await store.get("s1") is None
+
+
+@pytest.mark.asyncio
+async def test_memory_store_evicts_least_recently_used():
+    store = InMemorySessionStore(ttl_seconds=60, max_entries=2)
+    for session_id in ("s1", "s2"):
+        await store.create(session_id, _session())
+    await store.update("s1", status="completed")
+    await store.create("s3", _session())
+
+    assert await store.get("s2") is None
+    assert (await store.get("s1"))["status"] == "completed"
+    assert await store.get("s3") is not None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_survives_reopening(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    store = SQLiteSessionStore(path, ttl_seconds=60)
+    await store.create("s1", _session())
+    await store.update_bloc("s1", "BLOC1", {"status": "completed", "result": {"ok": True}})
+    await store.close()
+
+    reopened = SQLiteSessionStore(path, ttl_seconds=60)
+    assert await reopened.get_bloc_result("s1", "BLOC1") == {"ok": True}
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_update_bloc_state_keeps_result(store):
+    await store.create("s1", _session())
+    await store.update_bloc("s1", "BLOC1", {"status": "running", "result": {"section": 1}})
+
+    await store.update_bloc_state("s1", "BLOC1", {"status": "running", "progress": {"chars": 10}})
+    session = await store.get("s1")
+    assert session["blocs"]["BLOC1"] == {"status": "running", "progress": {"chars": 10}, "result": {"section": 1}}
+
+    await store.update_bloc_state("s1", "BLOC2", {"status": "running"})
+    assert (await store.get("s1"))["blocs"]["BLOC2"] == {"status": "running"}
+    await store.update_bloc_state("missing", "BLOC1", {"status": "running"})
+    assert await store.get("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_updates_from_two_workers_keep_both_fields(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    worker_a = SQLiteSessionStore(path, ttl_seconds=60)
+    worker_b = SQLiteSessionStore(path, ttl_seconds=60)
+    await worker_a.create("s1", _session())
+
+    await asyncio.gather(
+        worker_a.update("s1", status="cancelled"),
+        worker_b.update("s1", finished_at="2026-01-01T00:10:00"),
+    )
+
+    for store in (worker_a, worker_b):
+        session = await store.get("s1")
+        assert session["status"] == "cancelled"
+        assert session["finished_at"] == "2026-01-01T00:10:00"
+    await worker_a.close()
+    await worker_b.close()
+
+
+def test_redis_backend_without_url_falls_back_to_memory(monkeypatch):
+    monkeypatch.setattr(settings, "REDIS_URL", None)
+    store = create_session_store("redis")
+    assert isinstance(store, InMemorySessionStore)
+    assert store.is_local
+
+
+def test_incomplete_store_cannot_be_instantiated():
+    class Partial(SessionStore):
+        async def get(self, session_id, include_results=True):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial(ttl_seconds=60)
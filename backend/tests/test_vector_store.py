@@ -0,0 +1,149 @@
+"""
+Tests de l'index vectoriel local (LocalVectorStore)
+"""
+import numpy as np
+import pytest
+
+from app.services.vector_store import LocalVectorStore, DOCS_NAMESPACE, matches_filters
+
+
+def _vector(vector_id, values, **metadata):
+    return {'id': vector_id, 'values': values, 'metadata': metadata}
+
+
+def _store(directory=None):
+    store = LocalVectorStore(directory)
+    store.upsert([
+        _vector('sn-agri', [1.0, 0.0, 0.0], country='Sénégal', sector='agriculture', content='a'),
+        _vector('sn-energy', [0.8, 0.6, 0.0], country='Sénégal', sector='energie', content='b'),
+        _vector('ci-agri', [0.0, 1.0, 0.0], country="Côte d'Ivoire", sector='agriculture', content='c'),
+        _vector('ke-tech', [0.0, 0.0, 2.0], country='Kenya', sector='tech', content='d'),
+    ])
+    return store
+
+
+def test_exact_query_orders_by_cosine_similarity():
+    store = _store()
+
+    hits = store.query([1.0, 0.0, 0.0], top_k=3)
+    assert [hit['id'] for hit in hits] == ['sn-agri', 'sn-energy', 'ci-agri']
+    assert hits[0]['score'] == pytest.approx(1.0)
+    assert hits[1]['score'] == pytest.approx(0.8)
+    assert hits[0]['metadata']['content'] == 'a'
+
+    # Vecteurs normalisés : la norme n'influe pas sur le score
+    assert store.query([0.0, 0.0, 5.0], top_k=1)[0]['score'] == pytest.approx(1.0)
+
+
+def test_filtered_query():
+    store = _store()
+
+    hits = store.query([1.0, 0.0, 0.0], top_k=5, filters={'sector': 'agriculture'})
+    assert [hit['id'] for hit in hits] == ['sn-agri', 'ci-agri']
+
+    hits = store.query([1.0, 0.0, 0.0], top_k=5, filters={'country': {'$in': ['Kenya', "Côte d'Ivoire"]}})
+    assert {hit['id'] for hit in hits} == {'ci-agri', 'ke-tech'}
+
+    # Champ non indexé : filtré par parcours des métadonnées
+    assert [hit['id'] for hit in store.query([1.0, 0.0, 0.0], 5, filters={'content': 'b'})] == ['sn-energy']
+    # Valeur vide = pas de filtre ; aucune ligne candidate = aucun résultat
+    assert len(store.query([1.0, 0.0, 0.0], 5, filters={'country': ''})) == 4
+    assert store.query([1.0, 0.0, 0.0], 5, filters={'country': 'Mali'}) == []
+
+
+def test_upsert_overwrites_existing_id():
+    store = _store()
+    store.upsert([_vector('sn-agri', [0.0, 0.0, 1.0], country='Kenya', sector='tech', content='a2')])
+
+    assert store.health()['vectors'] == 4
+    assert store.query([1.0, 0.0, 0.0], 5, filters={'country': 'Sénégal'})[0]['id'] == 'sn-energy'
+    hits = store.query([0.0, 0.0, 1.0], 5, filters={'country': 'Kenya'})
+    assert {hit['id'] for hit in hits} == {'sn-agri', 'ke-tech'}
+    assert next(hit for hit in hits if hit['id'] == 'sn-agri')['metadata']['content'] == 'a2'
+
+
+def test_namespaces_and_existing_ids():
+    store = _store()
+    store.upsert([_vector('sn-agri', [0.0, 1.0, 0.0])], namespace='other')
+
+    assert store.existing_ids(['sn-agri', 'unknown']) == {'sn-agri'}
+    assert store.existing_ids(['sn-agri', 'ke-tech'], namespace='other') == {'sn-agri'}
+    assert [hit['id'] for hit in store.query([0.0, 1.0, 0.0], 5, namespace='other')] == ['sn-agri']
+    assert store.query([1.0, 0.0, 0.0], 1, namespace=DOCS_NAMESPACE)[0]['id'] == 'sn-agri'
+
+
+def test_dimension_mismatch_is_rejected():
+    store = _store()
+    assert store.dimension() == 3
+    with pytest.raises(ValueError):
+        store.upsert([_vector('x', [1.0, 0.0])])
+    with pytest.raises(ValueError):
+        store.query([1.0, 0.0], 1)
+    assert LocalVectorStore().query([1.0, 0.0], 1) == []
+
+
+def test_flush_and_load_round_trip(tmp_path):
+    directory = str(tmp_path / "index")
+    store = _store(directory)
+    store.flush()
+
+    reloaded = LocalVectorStore(directory)
+    # Rechargé en lecture seule depuis le memmap
+    assert isinstance(reloaded._buffer, np.memmap)
+    assert reloaded.health()['vectors'] == 4
+    assert reloaded.query([1.0, 0.0, 0.0], 2, filters={'sector': 'agriculture'}) == \
+        store.query([1.0, 0.0, 0.0], 2, filters={'sector': 'agriculture'})
+
+    # Écrire après chargement copie le memmap en mémoire, puis persiste à nouveau
+    reloaded.upsert([_vector('ng-agri', [0.6, 0.8, 0.0], country='Nigeria', sector='agriculture')])
+    reloaded.upsert([_vector('ke-tech', [0.0, 1.0, 0.0], country='Kenya', sector='tech')])
+    reloaded.flush()
+
+    again = LocalVectorStore(directory)
+    assert again.health()['vectors'] == 5
+    assert again.existing_ids(['ng-agri', 'ke-tech']) == {'ng-agri', 'ke-tech'}
+    assert again.query([0.0, 1.0, 0.0], 1, filters={'country': 'Kenya'})[0]['score'] == pytest.approx(1.0)
+
+
+def test_flush_without_changes_writes_nothing(tmp_path):
+    directory = tmp_path / "index"
+    LocalVectorStore(str(directory)).flush()
+    assert not directory.exists()
+
+
+def test_ids_with_prefix_and_delete(tmp_path):
+    store = _store(str(tmp_path))
+    store.flush()
+    store = LocalVectorStore(str(tmp_path))  # index memory-mappé
+
+    assert store.ids_with_prefix('sn-') == {'sn-agri', 'sn-energy'}
+    assert store.ids_with_prefix('sn-', namespace='autre') == set()
+
+    store.delete(['sn-agri', 'inconnu'])
+    assert store.ids_with_prefix('sn-') == {'sn-energy'}
+    assert not store.existing_ids(['sn-agri'])
+    assert [hit['id'] for hit in store.query([0.0, 0.0, 1.0], top_k=3)] == ['ke-tech', 'sn-energy', 'ci-agri']
+    assert [hit['id'] for hit in store.query([1.0, 0.0, 0.0], top_k=1, filters={'country': 'Kenya'})] == ['ke-tech']
+    assert store.query([1.0, 0.0, 0.0], top_k=1, filters={'sector': 'agriculture'})[0]['id'] == 'ci-agri'
+
+    store.flush()
+    reloaded = LocalVectorStore(str(tmp_path))
+    assert reloaded.existing_ids(['sn-agri', 'sn-energy', 'ci-agri', 'ke-tech']) == {'sn-energy', 'ci-agri', 'ke-tech'}
+
+
+def test_matches_filters():
+    metadata = {'country': 'Sénégal', 'sector': 'agriculture'}
+    assert matches_filters(metadata, {'country': 'Sénégal', 'sector': ''})
+    assert matches_filters(metadata, {'sector': {'$eq': 'agriculture'}})
+    assert not matches_filters(metadata, {'country': {'$in': ['Mali', 'Niger']}})
+
+
+def test_incomplete_store_cannot_be_instantiated():
+    from app.services.vector_store import VectorStore
+
+    class Partial(VectorStore):
+        def dimension(self):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -39,10 +39,16 @@ const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 type TabType = 'overview' | 'bloc1' | 'bloc2' | 'bloc3' | 'bloc4' | 'bloc5' | 'bloc6' | 'bloc7';
 
 interface BlocStatus {
-  status: 'pending' | 'running' | 'completed' | 'error';
+  status: 'pending' | 'running' | 'completed' | 'error' | 'cancelled';
   result?: any;
 }
 
+// Fin d'analyse sans succès (statut final de la session)
+interface SessionEnd {
+  status: 'error' | 'cancelled';
+  error?: string | null;
+}
+
 const TABS = [
   { id: 'overview' as TabType, blocId: '', label: 'Vue d\'ensemble', icon: '📊' },
   { id: 'bloc1' as TabType, blocId: 'BLOC1', label: 'PESTEL+', icon: '🌍' },
@@ -325,6 +331,7 @@ export default function Dashboard() {
   const [chatOpen, setChatOpen] = useState(false);
   const [globalProgress, setGlobalProgress] = useState(0);
   const [allCompleted, setAllCompleted] = useState(false);
+  const [sessionEnd, setSessionEnd] = useState<SessionEnd | null>(null);
 
   // Polling
   const pollStatus = useCallback(async (sid: string) => {
@@ -349,6 +356,10 @@ export default function Dashboard() {
         setAllCompleted(true);
         return true;
       }
+      if (data.status === 'error' || data.status === 'cancelled') {
+        setSessionEnd({ status: data.status, error: data.error });
+        return true;
+      }
       return false;
     } catch (err) {
       console.error('Erreur polling:', err);
@@ -389,15 +400,51 @@ export default function Dashboard() {
     setLoading(false);
   }, []);
 
+  // Flux SSE (push) avec repli sur le polling si le flux est indisponible
   useEffect(() => {
-    if (!sessionId || allCompleted) return;
-    pollStatus(sessionId);
-    const interval = setInterval(async () => {
-      const isDone = await pollStatus(sessionId);
-      if (isDone) clearInterval(interval);
-    }, 3000);
-    return () => clearInterval(interval);
-  }, [sessionId, allCompleted, pollStatus]);
+    if (!sessionId || allCompleted || sessionEnd) return;
+    let interval: ReturnType<typeof setInterval> | null = null;
+    let source: EventSource | null = null;
+
+    const startPolling = () => {
+      if (interval) return;
+      pollStatus(sessionId);
+      interval = setInterval(async () => {
+        const isDone = await pollStatus(sessionId);
+        if (isDone && interval) clearInterval(interval);
+      }, 3000);
+    };
+
+    if (typeof EventSource === 'undefined') {
+      startPolling();
+    } else {
+      source = new EventSource(`${API_BASE_URL}/api/analyze/stream/${sessionId}`);
+      source.addEventListener('bloc', (event) => {
+        const data = JSON.parse((event as MessageEvent).data);
+        setBlocsStatus(prev => ({ ...prev, [data.bloc_id]: { status: data.status, result: data.result } }));
+        setGlobalProgress(data.progress || 0);
+        if (data.status === 'completed' && data.result) {
+          setBlocsData(prev => ({ ...prev, [data.bloc_id]: data.result }));
+        }
+      });
+      source.addEventListener('done', (event) => {
+        const data = JSON.parse((event as MessageEvent).data);
+        setGlobalProgress(data.progress || 0);
+        if (data.status === 'completed') setAllCompleted(true);
+        else setSessionEnd({ status: data.status, error: data.error });
+        source?.close();
+      });
+      source.onerror = () => {
+        source?.close();
+        startPolling();
+      };
+    }
+
+    return () => {
+      source?.close();
+      if (interval) clearInterval(interval);
+    };
+  }, [sessionId, allCompleted, sessionEnd, pollStatus]);
 
   // ═══════════════════════════════════════════════════════════════════════════
   // BLOC 1: PESTEL+ - STRUCTURE CORRECTE
@@ -2294,8 +2341,22 @@ export default function Dashboard() {
     
     return (
       <div className="space-y-6">
+        {/* Fin d'analyse en erreur ou annulée */}
+        {sessionEnd && (
+          <div className={`rounded-xl p-6 border ${
+            sessionEnd.status === 'cancelled' ? 'bg-amber-50 border-amber-200' : 'bg-red-50 border-red-200'
+          }`}>
+            <p className={`font-semibold ${sessionEnd.status === 'cancelled' ? 'text-amber-900' : 'text-red-900'}`}>
+              {sessionEnd.status === 'cancelled' ? '🛑 Analyse annulée' : '❌ Analyse interrompue'}
+            </p>
+            <p className={`text-sm mt-1 ${sessionEnd.status === 'cancelled' ? 'text-amber-700' : 'text-red-700'}`}>
+              {completedCount}/7 blocs complétés{sessionEnd.error ? ` — ${sessionEnd.error}` : ''}
+            </p>
+          </div>
+        )}
+
         {/* Progress */}
-        {!allCompleted && (
+        {!allCompleted && !sessionEnd && (
           <div className="bg-blue-50 border border-blue-200 rounded-xl p-6">
             <div className="flex items-center justify-between mb-3">
               <div>
@@ -2344,7 +2405,8 @@ export default function Dashboard() {
                   <p className={`text-xs mt-1 font-medium ${
                     hasData ? 'text-emerald-600' : status === 'running' ? 'text-blue-600' : 'text-slate-400'
                   }`}>
-                    {hasData ? '✓ Prêt' : status === 'running' ? '⏳ En cours' : '⏸ Attente'}
+                    {hasData ? '✓ Prêt' : status === 'running' ? '⏳ En cours' :
+                      status === 'error' ? '✕ Échec' : status === 'cancelled' ? '✕ Annulé' : '⏸ Attente'}
                   </p>
                 </button>
               );
@@ -2431,7 +2493,10 @@ export default function Dashboard() {
           <div>
             <h1 className="text-2xl font-bold text-slate-900">Africa Strategy Dashboard</h1>
             <p className="text-sm text-slate-500">
-              {allCompleted ? '✅ Analyse complète' : `⏳ Analyse en cours... ${globalProgress}%`}
+              {allCompleted ? '✅ Analyse complète' :
+                sessionEnd?.status === 'cancelled' ? '🛑 Analyse annulée' :
+                sessionEnd ? '❌ Analyse interrompue' :
+                `⏳ Analyse en cours... ${globalProgress}%`}
             </p>
           </div>
           <div className="flex gap-3">